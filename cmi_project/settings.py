@@ -96,6 +96,22 @@ DATABASES = {
 }
 
 
+# Cache
+# Las entradas por proyecto se invalidan por versión (projects.versioning).
+# En producción con varios procesos conviene un backend compartido
+# (Redis, Memcached o django.core.cache.backends.filebased.FileBasedCache).
+
+CACHES = {
+    "default": {
+        "BACKEND": env("DJANGO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": env("DJANGO_CACHE_LOCATION", "cmi-default"),
+    }
+}
+PROJECT_CACHE_TIMEOUT = int(env("DJANGO_PROJECT_CACHE_TIMEOUT", "3600"))
+# Precalentamiento del Gantt tras ediciones masivas: "thread", "sync" u "off"
+PROJECT_CACHE_PREWARM = env("DJANGO_PROJECT_CACHE_PREWARM", "thread")
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
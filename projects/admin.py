@@ -4,8 +4,10 @@ from django.contrib.auth.models import User
 from .models import (
     Project, Activity, Milestone, Seguimiento, Notification,
     ChangeRequest, ActaConstitucion, Alcance, Comunicacion,
-    Baseline, Acquisition, UserProfile, ActivityAssignment,
+    Baseline, Acquisition, UserProfile, ActivityAssignment, SeguimientoSnapshot,
+    ProjectMetrics, ReportJob,
 )
+from .outbox import requeue_dead_notifications
 
 
 class UserProfileInline(admin.StackedInline):
@@ -50,20 +52,38 @@ class MilestoneAdmin(admin.ModelAdmin):
     raw_id_fields = ('project',)
 
 
+class SeguimientoSnapshotInline(admin.TabularInline):
+    model = SeguimientoSnapshot
+    extra = 0
+    can_delete = False
+    fields = ('name', 'status', 'end_date', 'actual_end_date', 'planned_cost', 'accrued_cost')
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Seguimiento)
 class SeguimientoAdmin(admin.ModelAdmin):
     list_display = ('proyecto', 'fecha', 'pv', 'ev', 'ac', 'sv', 'cv', 'cpi', 'spi')
     list_filter = ('fecha', 'proyecto')
     date_hierarchy = 'fecha'
     readonly_fields = ('pv', 'ev', 'ac', 'sv', 'cv', 'cpi', 'spi')
+    inlines = (SeguimientoSnapshotInline,)
 
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
-    list_display = ('alert_type', 'project', 'recipient', 'sent', 'created_at')
-    list_filter = ('alert_type', 'sent')
+    list_display = ('alert_type', 'project', 'recipient', 'delivery_status', 'delivery_attempts', 'created_at')
+    list_filter = ('alert_type', 'delivery_status')
     search_fields = ('message',)
     date_hierarchy = 'created_at'
+    readonly_fields = ('delivery_attempts', 'last_error', 'sent_at')
+    actions = ('retry_delivery',)
+
+    @admin.action(description='Reencolar el envío de las descartadas')
+    def retry_delivery(self, request, queryset):
+        self.message_user(request, f"Notificaciones reencoladas: {requeue_dead_notifications(queryset)}")
 
 
 @admin.register(ChangeRequest)
@@ -110,6 +130,28 @@ class ActivityAssignmentAdmin(admin.ModelAdmin):
     raw_id_fields = ('activity', 'user')
 
 
+@admin.register(ProjectMetrics)
+class ProjectMetricsAdmin(admin.ModelAdmin):
+    list_display = ('project', 'progress', 'traffic_light', 'latest_spi', 'latest_cpi', 'open_risks', 'refreshed_at')
+    list_filter = ('traffic_light',)
+    search_fields = ('project__name',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'state', 'progress', 'project', 'requested_by', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('kind', 'state')
+    search_fields = ('project__name', 'requested_by__username')
+    raw_id_fields = ('project', 'requested_by')
+    readonly_fields = ('worker', 'started_at', 'heartbeat_at', 'finished_at', 'error')
+
+
 admin.site.unregister(User)
 admin.site.register(User, UserAdmin)
 
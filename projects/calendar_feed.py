@@ -0,0 +1,163 @@
+"""
+Feed de eventos del calendario por ventana de fechas.
+
+El calendario pide solo el rango visible (``start``/``end``) y el feed
+filtra actividades y hitos con consultas de rango sobre los índices
+(project, start_date), (project, end_date) y (project, due_date). El mismo
+feed se ofrece en iCalendar (RFC 5545) para clientes de suscripción.
+
+Los clientes de calendario (Outlook, Google, Apple) no envían la cookie de
+sesión: se suscriben a una URL firmada por usuario y proyecto. Al usarla se
+vuelve a comprobar que el usuario siga activo y pueda ver el proyecto.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.core import signing
+from django.utils.dateparse import parse_date
+
+from .services import filter_report_activities
+
+CALENDAR_VIEW = "calendar"
+ACTIVITY_COLORS = ("#007bff", "#0056b3")
+MILESTONE_COLORS = ("#dc3545", "#a71d2a")
+ICS_LINE_OCTETS = 75
+SUBSCRIPTION_SALT = "projects.calendar_feed.subscription"
+
+
+def _subscription_signer(project_id) -> signing.Signer:
+    return signing.Signer(salt=f"{SUBSCRIPTION_SALT}:{project_id}")
+
+
+def subscription_token(user, project_id) -> str:
+    """Token de la URL de suscripción .ics de ``user`` para el proyecto."""
+    return _subscription_signer(project_id).sign(str(user.pk))
+
+
+def subscription_user(token: str, project_id):
+    """
+    Usuario activo dueño del token (firmado para ese proyecto), o None si
+    el token no es válido. El permiso sobre el proyecto lo comprueba la vista.
+    """
+    from django.contrib.auth.models import User
+
+    try:
+        user_id = _subscription_signer(project_id).unsign(token)
+    except signing.BadSignature:
+        return None
+    return User.objects.filter(pk=user_id, is_active=True).first()
+
+
+def parse_feed_date(value) -> date | None:
+    """Fecha de ``start``/``end``; acepta AAAA-MM-DD o un ISO 8601 con hora."""
+    if not value:
+        return None
+    try:
+        return parse_date(value[:10])
+    except ValueError:
+        return None
+
+
+def calendar_events(project, filters, start: date | None = None, end: date | None = None) -> list:
+    """
+    Eventos (formato FullCalendar) que se solapan con [start, end). Sin
+    límites se devuelve todo el proyecto. El ``end`` de los eventos de día
+    completo es exclusivo: el día siguiente al fin de la actividad.
+    """
+    activities = filter_report_activities(project, filters)
+    milestones = project.milestone_set.all()
+    if end:
+        activities = activities.filter(start_date__lt=end)
+        milestones = milestones.filter(due_date__lt=end)
+    if start:
+        activities = activities.filter(end_date__gte=start)
+        milestones = milestones.filter(due_date__gte=start)
+
+    events = []
+    for pk, name, start_date, end_date, status in activities.order_by("start_date", "pk").values_list(
+        "pk", "name", "start_date", "end_date", "status"
+    ):
+        events.append(
+            {
+                "id": f"activity-{pk}",
+                "title": f"Actividad: {name}",
+                "start": start_date.isoformat(),
+                "end": (end_date + timedelta(days=1)).isoformat(),
+                "allDay": True,
+                "status": status,
+                "backgroundColor": ACTIVITY_COLORS[0],
+                "borderColor": ACTIVITY_COLORS[1],
+            }
+        )
+    for pk, name, due_date, completed in milestones.order_by("due_date", "pk").values_list(
+        "pk", "name", "due_date", "completed"
+    ):
+        events.append(
+            {
+                "id": f"milestone-{pk}",
+                "title": f"Hito: {name}",
+                "start": due_date.isoformat(),
+                "allDay": True,
+                "completed": completed,
+                "backgroundColor": MILESTONE_COLORS[0],
+                "borderColor": MILESTONE_COLORS[1],
+            }
+        )
+    return events
+
+
+def _ics_text(value: str) -> str:
+    return (
+        str(value).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def _ics_fold(line: str) -> str:
+    """Corta líneas de más de 75 octetos (continuación con un espacio)."""
+    encoded = line.encode()
+    if len(encoded) <= ICS_LINE_OCTETS:
+        return line
+    parts, current = [], b""
+    for char in line:
+        piece = char.encode()
+        limit = ICS_LINE_OCTETS if not parts else ICS_LINE_OCTETS - 1
+        if len(current) + len(piece) > limit:
+            parts.append(current.decode())
+            current = b""
+        current += piece
+    parts.append(current.decode())
+    return "\r\n ".join(parts)
+
+
+def _ics_date(value: str) -> str:
+    return value.replace("-", "")
+
+
+def render_ics(project, events, stamp: datetime | None = None, domain: str = "cmi") -> str:
+    """Calendario iCalendar con un VEVENT de día completo por evento."""
+    stamp = (stamp or datetime.now(dt_timezone.utc)).astimezone(dt_timezone.utc)
+    dtstamp = stamp.strftime("%Y%m%dT%H%M%SZ")
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//CMI//Calendario de proyecto//ES",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_ics_text(project.name)}",
+    ]
+    for event in events:
+        start = date.fromisoformat(event["start"])
+        end = event.get("end") or (start + timedelta(days=1)).isoformat()
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{event['id']}@{domain}",
+            f"DTSTAMP:{dtstamp}",
+            f"DTSTART;VALUE=DATE:{_ics_date(event['start'])}",
+            f"DTEND;VALUE=DATE:{_ics_date(end)}",
+            f"SUMMARY:{_ics_text(event['title'])}",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_ics_fold(line) for line in lines) + "\r\n"
@@ -0,0 +1,176 @@
+"""
+Método de la ruta crítica (CPM) sobre las dependencias de actividades.
+
+Carga las actividades del proyecto con una consulta y hace las pasadas
+hacia adelante y hacia atrás en O(V+E) sobre el grafo de predecesoras
+(fin→inicio, sin desfase). Las duraciones son días calendario inclusivos,
+igual que en el Gantt, y la fecha de inicio planificada actúa como
+restricción "no comenzar antes de": una actividad arranca al día siguiente
+del fin de su predecesora o en su fecha planificada, lo que sea más tarde.
+
+Para cada actividad se obtienen inicio/fin tempranos y tardíos y las
+holguras total y libre; las de holgura total cero forman la ruta crítica.
+Las actividades sin fechas quedan fuera del cálculo y las que forman un
+ciclo (que el modelo no permite, pero podría existir en datos viejos) se
+informan en ``cyclic_ids``.
+"""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date
+
+from .versioning import cached_project_value
+
+CPM_VIEW = "cpm"
+
+
+@dataclass(frozen=True)
+class ActivitySchedule:
+    """Fechas tempranas/tardías y holguras (en días) de una actividad."""
+
+    activity_id: int
+    duration: int
+    early_start: date
+    early_finish: date
+    late_start: date
+    late_finish: date
+    total_float: int
+    free_float: int
+
+    @property
+    def is_critical(self) -> bool:
+        return self.total_float <= 0
+
+
+@dataclass(frozen=True)
+class CriticalPathResult:
+    project_start: date | None = None
+    project_finish: date | None = None
+    activities: dict = field(default_factory=dict)
+    critical_path: tuple = ()
+    cyclic_ids: frozenset = frozenset()
+
+    def __contains__(self, activity_id) -> bool:
+        return activity_id in self.activities
+
+    def get(self, activity_id):
+        return self.activities.get(activity_id)
+
+    def is_critical(self, activity_id) -> bool:
+        schedule = self.activities.get(activity_id)
+        return schedule is not None and schedule.is_critical
+
+    def is_driving(self, predecessor_id, activity_id) -> bool:
+        """True si la predecesora determina el inicio temprano de la actividad."""
+        before = self.activities.get(predecessor_id)
+        after = self.activities.get(activity_id)
+        if before is None or after is None:
+            return False
+        return (after.early_start - before.early_finish).days == 1
+
+    @property
+    def critical_ids(self) -> frozenset:
+        return frozenset(self.critical_path)
+
+    @property
+    def duration_days(self) -> int:
+        if self.project_start is None:
+            return 0
+        return (self.project_finish - self.project_start).days + 1
+
+
+def schedule_network(nodes) -> CriticalPathResult:
+    """
+    CPM sobre ``nodes`` = [(id, inicio, fin, id_predecesora | None)].
+    Las predecesoras que no están en ``nodes`` se ignoran.
+    """
+    start_ord, duration, predecessor = {}, {}, {}
+    for pk, start, end, predecessor_id in nodes:
+        if start is None or end is None:
+            continue
+        start_ord[pk] = start.toordinal()
+        duration[pk] = max((end - start).days + 1, 1)
+        predecessor[pk] = predecessor_id
+    if not start_ord:
+        return CriticalPathResult()
+
+    successors = {pk: [] for pk in start_ord}
+    pending = dict.fromkeys(start_ord, 0)
+    for pk, predecessor_id in predecessor.items():
+        if predecessor_id in successors and predecessor_id != pk:
+            successors[predecessor_id].append(pk)
+            pending[pk] += 1
+
+    # Orden topológico (Kahn); lo que no se alcanza está en un ciclo
+    queue = deque(pk for pk, count in pending.items() if count == 0)
+    order = []
+    while queue:
+        pk = queue.popleft()
+        order.append(pk)
+        for succ in successors[pk]:
+            pending[succ] -= 1
+            if pending[succ] == 0:
+                queue.append(succ)
+    cyclic = frozenset(start_ord) - frozenset(order)
+
+    # Pasada hacia adelante
+    early_start, early_finish = {}, {}
+    for pk in order:
+        es = start_ord[pk]
+        predecessor_id = predecessor[pk]
+        if predecessor_id in early_finish:
+            es = max(es, early_finish[predecessor_id] + 1)
+        early_start[pk] = es
+        early_finish[pk] = es + duration[pk] - 1
+    if not order:
+        return CriticalPathResult(cyclic_ids=cyclic)
+    project_start = min(early_start.values())
+    project_finish = max(early_finish.values())
+
+    # Pasada hacia atrás
+    late_start, late_finish = {}, {}
+    for pk in reversed(order):
+        lf = project_finish
+        for succ in successors[pk]:
+            if succ in late_start:
+                lf = min(lf, late_start[succ] - 1)
+        late_finish[pk] = lf
+        late_start[pk] = lf - duration[pk] + 1
+
+    activities = {}
+    for pk in order:
+        next_start = min((early_start[s] for s in successors[pk] if s in early_start), default=project_finish + 1)
+        activities[pk] = ActivitySchedule(
+            activity_id=pk,
+            duration=duration[pk],
+            early_start=date.fromordinal(early_start[pk]),
+            early_finish=date.fromordinal(early_finish[pk]),
+            late_start=date.fromordinal(late_start[pk]),
+            late_finish=date.fromordinal(late_finish[pk]),
+            total_float=late_start[pk] - early_start[pk],
+            free_float=next_start - 1 - early_finish[pk],
+        )
+    critical_path = tuple(
+        sorted((pk for pk, s in activities.items() if s.is_critical), key=lambda pk: (early_start[pk], pk))
+    )
+    return CriticalPathResult(
+        project_start=date.fromordinal(project_start),
+        project_finish=date.fromordinal(project_finish),
+        activities=activities,
+        critical_path=critical_path,
+        cyclic_ids=cyclic,
+    )
+
+
+def compute_critical_path(project) -> CriticalPathResult:
+    """CPM del proyecto con una sola consulta."""
+    from .models import Activity
+
+    nodes = Activity.objects.filter(project=project).values_list("pk", "start_date", "end_date", "predecessor_id")
+    return schedule_network(nodes.order_by())
+
+
+def project_schedule(project) -> CriticalPathResult:
+    """CPM del proyecto desde el caché versionado."""
+    return cached_project_value(project.pk, CPM_VIEW, lambda: compute_critical_path(project))
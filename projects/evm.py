@@ -0,0 +1,517 @@
+"""
+Motor de cálculo EVM (Earned Value Management) basado en conjuntos.
+
+En lugar de recorrer actividades una por una (y lanzar un agregado de
+recursos por cada actividad), las métricas se obtienen con una única
+consulta agregada sobre las actividades del proyecto. EVMTimeSeries
+reutiliza esas expresiones para construir curvas S completas a partir de
+una sola carga de actividades.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.db.models import Case, DecimalField, F, FloatField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, NullIf, Round
+from django.db.models.lookups import GreaterThan
+
+MONEY_FIELD = DecimalField(max_digits=12, decimal_places=2)
+ZERO = Decimal("0")
+
+
+@dataclass(frozen=True)
+class EVMMetrics:
+    pv: Decimal = ZERO
+    ev: Decimal = ZERO
+    ac: Decimal = ZERO
+
+    @property
+    def sv(self) -> Decimal:
+        """SV = EV - PV (positivo = adelantado)."""
+        return self.ev - self.pv
+
+    @property
+    def cv(self) -> Decimal:
+        """CV = EV - AC (positivo = bajo presupuesto)."""
+        return self.ev - self.ac
+
+    @property
+    def spi(self) -> Decimal:
+        if self.pv > 0:
+            return self.ev / self.pv
+        return ZERO
+
+    @property
+    def cpi(self) -> Decimal:
+        if self.ac > 0:
+            return self.ev / self.ac
+        return ZERO
+
+
+def resources_sum_subquery():
+    """
+    Subconsulta con la suma de total_cost de los recursos de cada actividad.
+    Se usa para mantener y verificar Activity.resources_total.
+    """
+    from resources.models import Resource
+
+    totals = (
+        Resource.objects.filter(activity=OuterRef("pk"))
+        .order_by()
+        .values("activity")
+        .annotate(total=Sum("total_cost"))
+        .values("total")
+    )
+    return Subquery(totals, output_field=MONEY_FIELD)
+
+
+def planned_cost_expression():
+    """
+    Equivalente SQL de Activity.total_planned_cost: suma de recursos
+    (columna resources_total) y, si la actividad no tiene recursos (o suman
+    0), el campo cost.
+    """
+    return Coalesce(
+        NullIf(F("resources_total"), Value(ZERO)),
+        "cost",
+        Value(ZERO),
+        output_field=MONEY_FIELD,
+    )
+
+
+def actual_cost_expression():
+    """Equivalente SQL de Activity.total_actual_cost."""
+    return Coalesce("actual_cost", "cost", Value(ZERO), output_field=MONEY_FIELD)
+
+
+def earned_filter(fecha) -> Q:
+    """
+    Actividades que cuentan como ganadas a la fecha de corte: completadas con
+    fin real ≤ fecha, o completadas sin fin real cuyo fin planificado ≤ fecha.
+    """
+    return Q(status="completed") & (
+        Q(actual_end_date__lte=fecha)
+        | Q(actual_end_date__isnull=True, end_date__lte=fecha)
+    )
+
+
+def compute_evm(activities, fecha, planned=None, actual=None) -> EVMMetrics:
+    """
+    Calcula PV, EV y AC a la fecha de corte en una sola consulta agregada.
+
+    ``activities`` es un queryset de Activity (normalmente
+    ``project.activity_set.all()``) o de SeguimientoSnapshot; en ese caso
+    ``planned``/``actual`` indican las columnas congeladas a sumar.
+    """
+    planned = planned if planned is not None else planned_cost_expression()
+    actual = actual if actual is not None else actual_cost_expression()
+    earned = earned_filter(fecha)
+    totals = activities.order_by().aggregate(
+        pv=Sum(planned, filter=Q(end_date__lte=fecha), output_field=MONEY_FIELD),
+        ev=Sum(planned, filter=earned, output_field=MONEY_FIELD),
+        ac=Sum(actual, filter=earned, output_field=MONEY_FIELD),
+    )
+    return EVMMetrics(
+        pv=totals["pv"] or ZERO,
+        ev=totals["ev"] or ZERO,
+        ac=totals["ac"] or ZERO,
+    )
+
+
+def compute_project_evm(project, fecha) -> EVMMetrics:
+    return compute_evm(project.activity_set.all(), fecha)
+
+
+def compute_snapshot_evm(snapshots, fecha) -> EVMMetrics:
+    """EVM sobre las instantáneas congeladas de un Seguimiento (ver SeguimientoSnapshot)."""
+    return compute_evm(snapshots, fecha, planned=F("planned_cost"), actual=F("accrued_cost"))
+
+
+def compute_snapshot_evm_bulk(seguimientos) -> dict:
+    """
+    EVM de muchos seguimientos a la vez sobre sus instantáneas: un único
+    GROUP BY en el que cada fila se evalúa contra la fecha de su propio
+    seguimiento. Retorna {seguimiento_id: EVMMetrics}; los seguimientos sin
+    instantánea no aparecen.
+    """
+    from .models import SeguimientoSnapshot
+
+    fecha = F("seguimiento__fecha")
+    earned = earned_filter(fecha)
+    rows = (
+        SeguimientoSnapshot.objects.filter(seguimiento__in=seguimientos)
+        .order_by()
+        .values("seguimiento_id")
+        .annotate(
+            pv=Sum("planned_cost", filter=Q(end_date__lte=fecha), output_field=MONEY_FIELD),
+            ev=Sum("planned_cost", filter=earned, output_field=MONEY_FIELD),
+            ac=Sum("accrued_cost", filter=earned, output_field=MONEY_FIELD),
+        )
+    )
+    return {
+        row["seguimiento_id"]: EVMMetrics(pv=row["pv"] or ZERO, ev=row["ev"] or ZERO, ac=row["ac"] or ZERO)
+        for row in rows
+    }
+
+
+class EVMTimeSeries:
+    """
+    Serie temporal EVM precomputada para un proyecto.
+
+    Carga las actividades una sola vez y las ordena en arreglos paralelos
+    (fecha de fin planificada / fecha en que se gana el valor, con sus
+    costos). Las sumas acumuladas permiten responder PV/EV/AC para
+    cualquier fecha con una búsqueda binaria, sin volver a la base de datos.
+    """
+
+    def __init__(self, planned, earned):
+        # planned: [(end_date, planned_cost)]
+        # earned:  [(earned_date, planned_cost, actual_cost)]
+        planned = sorted(planned, key=lambda row: row[0])
+        earned = sorted(earned, key=lambda row: row[0])
+        self.pv_dates = [row[0] for row in planned]
+        self.pv_cumulative = list(accumulate(row[1] for row in planned))
+        self.ev_dates = [row[0] for row in earned]
+        self.ev_cumulative = list(accumulate(row[1] for row in earned))
+        self.ac_cumulative = list(accumulate(row[2] for row in earned))
+
+    @classmethod
+    def from_activities(cls, activities) -> "EVMTimeSeries":
+        rows = activities.order_by().annotate(
+            planned_value=planned_cost_expression(),
+            actual_value=actual_cost_expression(),
+        ).values_list("end_date", "actual_end_date", "status", "planned_value", "actual_value")
+        return cls.from_rows(rows)
+
+    @classmethod
+    def from_rows(cls, rows) -> "EVMTimeSeries":
+        """rows: (end_date, actual_end_date, status, costo planificado, costo real)."""
+        planned = []
+        earned = []
+        for end_date, actual_end_date, status, planned_value, actual_value in rows:
+            planned_value = planned_value or ZERO
+            actual_value = actual_value or ZERO
+            planned.append((end_date, planned_value))
+            if status == "completed":
+                # Misma regla que earned_filter: fin real o, si falta, el planificado
+                earned.append((actual_end_date or end_date, planned_value, actual_value))
+        return cls(planned, earned)
+
+    @classmethod
+    def for_project(cls, project) -> "EVMTimeSeries":
+        return cls.from_activities(project.activity_set.all())
+
+    @staticmethod
+    def _cumulative_at(dates, cumulative, fecha) -> Decimal:
+        index = bisect_right(dates, fecha)
+        return cumulative[index - 1] if index else ZERO
+
+    def at(self, fecha) -> EVMMetrics:
+        return EVMMetrics(
+            pv=self._cumulative_at(self.pv_dates, self.pv_cumulative, fecha),
+            ev=self._cumulative_at(self.ev_dates, self.ev_cumulative, fecha),
+            ac=self._cumulative_at(self.ev_dates, self.ac_cumulative, fecha),
+        )
+
+    def series(self, fechas) -> list[EVMMetrics]:
+        return [self.at(fecha) for fecha in fechas]
+
+
+# ── Mantenimiento incremental de seguimientos ─────────────────────────────
+
+@dataclass(frozen=True)
+class ActivityContribution:
+    """
+    Aporte de una actividad a PV/EV/AC de los seguimientos de su proyecto:
+    suma ``planned`` al PV desde ``end_date`` y, si está completada, suma
+    ``planned`` al EV y ``accrued`` al AC desde ``earned_date``.
+    """
+
+    project_id: int
+    end_date: object
+    earned_date: object  # None si la actividad no está completada
+    planned: Decimal
+    accrued: Decimal
+
+    @classmethod
+    def of(cls, activity) -> "ActivityContribution":
+        completed = activity.status == "completed"
+        return cls(
+            project_id=activity.project_id,
+            end_date=activity.end_date,
+            # Misma regla que earned_filter: fin real o, si falta, el planificado
+            earned_date=(activity.actual_end_date or activity.end_date) if completed else None,
+            planned=Decimal(activity.total_planned_cost or 0),
+            accrued=Decimal(activity.total_actual_cost or 0),
+        )
+
+    @property
+    def since(self):
+        """Primera fecha desde la que la actividad aporta a algún indicador."""
+        return min(self.end_date, self.earned_date) if self.earned_date else self.end_date
+
+    def terms(self) -> dict:
+        """{métrica: [(desde_fecha, monto)]} con los escalones que aporta."""
+        earned = [(self.earned_date, self.planned)] if self.earned_date else []
+        accrued = [(self.earned_date, self.accrued)] if self.earned_date else []
+        return {"pv": [(self.end_date, self.planned)], "ev": earned, "ac": accrued}
+
+
+def _delta_terms(before, after) -> dict:
+    """Escalones de after menos los de before, descartando los que se anulan."""
+    deltas = {}
+    for metric in ("pv", "ev", "ac"):
+        old = before.terms()[metric] if before else []
+        new = after.terms()[metric] if after else []
+        terms = [term for term in new if term not in old]
+        terms += [(fecha, -amount) for fecha, amount in old if (fecha, amount) not in new]
+        deltas[metric] = [(fecha, amount) for fecha, amount in terms if amount]
+    return deltas
+
+
+def _stepped(column, terms):
+    """column + Σ CASE WHEN fecha >= desde THEN monto ELSE 0 END."""
+    expression = F(column)
+    for fecha, amount in terms:
+        expression = expression + Case(
+            When(fecha__gte=fecha, then=Value(amount)), default=Value(ZERO), output_field=MONEY_FIELD
+        )
+    return expression
+
+
+def _ratio(numerator, denominator):
+    # División en coma flotante: en SQLite dos montos enteros se dividirían como enteros
+    quotient = Cast(numerator, FloatField()) / Cast(denominator, FloatField())
+    return Case(
+        When(GreaterThan(denominator, 0), then=Round(quotient, 2)),
+        default=Value(ZERO),
+        output_field=MONEY_FIELD,
+    )
+
+
+def _apply_delta(project_id, deltas) -> int:
+    """Un UPDATE: suma los escalones a PV/EV/AC y deriva SV/CV/SPI/CPI de esos valores."""
+    from .models import Seguimiento
+
+    fechas = [fecha for terms in deltas.values() for fecha, _ in terms]
+    if not fechas:
+        return 0
+    pv = _stepped("pv", deltas["pv"])
+    ev = _stepped("ev", deltas["ev"])
+    ac = _stepped("ac", deltas["ac"])
+    return Seguimiento.objects.filter(proyecto_id=project_id, fecha__gte=min(fechas)).update(
+        pv=Round(pv, 2),
+        ev=Round(ev, 2),
+        ac=Round(ac, 2),
+        sv=Round(ev - pv, 2),
+        cv=Round(ev - ac, 2),
+        spi=_ratio(ev, pv),
+        cpi=_ratio(ev, ac),
+    )
+
+
+def apply_activity_change(activity, before: ActivityContribution) -> int:
+    """
+    Propaga a los seguimientos guardados el cambio de una actividad ya
+    guardada (``before`` es su ActivityContribution previa al cambio), sin
+    recalcularlos por completo.
+
+    Un único UPDATE aplica el delta viejo→nuevo a PV/EV/AC de los
+    seguimientos con fecha ≥ la primera fecha afectada y recalcula
+    SV/CV/SPI/CPI a partir de esos valores. La instantánea de la actividad
+    en esos seguimientos se alinea con el nuevo estado (si cambió de
+    proyecto, sale de los seguimientos del anterior y entra en los del
+    nuevo), para que un recálculo desde instantáneas (recalculate_evm) no
+    revierta el cambio. Retorna la cantidad de seguimientos actualizados.
+    """
+    from .models import Seguimiento, SeguimientoSnapshot
+    from .portfolio import schedule_metrics_refresh
+    from .versioning import bump_project_version
+
+    after = ActivityContribution.of(activity)
+    if before == after:
+        return 0
+    if before.project_id != after.project_id:
+        # La actividad cambió de proyecto: sale de uno y entra en el otro.
+        # Las señales solo ven el proyecto nuevo; el anterior se marca aquí.
+        bump_project_version(before.project_id)
+        schedule_metrics_refresh(before.project_id)
+        updated = _apply_delta(before.project_id, _delta_terms(before, None)) + _apply_delta(
+            after.project_id, _delta_terms(None, after)
+        )
+        # Desde la primera fecha en que aporta: antes no suma en ningún proyecto
+        SeguimientoSnapshot.objects.filter(
+            activity_id=activity.pk,
+            seguimiento__proyecto_id=before.project_id,
+            seguimiento__fecha__gte=before.since,
+        ).delete()
+        captured = SeguimientoSnapshot.capture(after.project_id, activity_id=activity.pk)
+        targets = (
+            Seguimiento.objects.filter(proyecto_id=after.project_id, fecha__gte=after.since)
+            .exclude(snapshots__activity_id=activity.pk)
+            .values_list("pk", flat=True)
+        )
+        SeguimientoSnapshot.objects.bulk_create(
+            [SeguimientoSnapshot(seguimiento_id=pk, **values) for pk in targets for values in captured]
+        )
+        if updated:
+            bump_project_version(after.project_id)
+            schedule_metrics_refresh(after.project_id)
+        return updated
+
+    deltas = _delta_terms(before, after)
+    updated = _apply_delta(after.project_id, deltas)
+    if updated:
+        first = min(fecha for terms in deltas.values() for fecha, _ in terms)
+        SeguimientoSnapshot.objects.filter(
+            activity_id=activity.pk,
+            seguimiento__proyecto_id=after.project_id,
+            seguimiento__fecha__gte=first,
+        ).update(
+            status=activity.status,
+            end_date=activity.end_date,
+            actual_start_date=activity.actual_start_date,
+            actual_end_date=activity.actual_end_date,
+            actual_cost=activity.actual_cost,
+            planned_cost=after.planned,
+            accrued_cost=after.accrued,
+        )
+        # El UPDATE no dispara señales: el save() previo refrescó los
+        # indicadores y la versión con los seguimientos todavía sin cambiar
+        bump_project_version(after.project_id)
+        schedule_metrics_refresh(after.project_id)
+    return updated
+
+
+def date_grid(start, end, step_days: int = 1) -> list:
+    """Fechas desde start hasta end (inclusive) cada step_days días."""
+    if not start or not end or start > end:
+        return []
+    step = timedelta(days=max(step_days, 1))
+    fechas = []
+    current = start
+    while current < end:
+        fechas.append(current)
+        current += step
+    fechas.append(end)
+    return fechas
+
+
+# ── Métricas por corte (ProjectCut) ───────────────────────────────────────
+
+CUT_STATUS_LABELS = {
+    'green': 'En línea',
+    'yellow': 'En alerta',
+    'red': 'Crítico',
+    'no_data': 'Sin información',
+}
+
+
+def traffic_light(spi, cpi) -> str:
+    """Semáforo CMI: verde >= 0.95, amarillo >= 0.85 (SPI y CPI), rojo en otro caso."""
+    spi_val = float(spi)
+    cpi_val = float(cpi)
+    if spi_val >= 0.95 and cpi_val >= 0.95:
+        return 'green'
+    if spi_val >= 0.85 and cpi_val >= 0.85:
+        return 'yellow'
+    return 'red'
+
+
+@dataclass(frozen=True)
+class CutMetrics:
+    """Métricas de un período de revisión calculadas en memoria."""
+
+    activities: tuple = ()
+    planned_count: int = 0
+    completed_count: int = 0
+    pv: Decimal = ZERO
+    ev: Decimal = ZERO
+    ac: Decimal = ZERO
+    has_any_tracking: bool = False
+
+    @classmethod
+    def from_activities(cls, activities) -> "CutMetrics":
+        activities = tuple(activities)
+        completed = [a for a in activities if a.status == 'completed']
+        return cls(
+            activities=activities,
+            planned_count=len(activities),
+            completed_count=len(completed),
+            pv=sum((a.total_planned_cost for a in activities), ZERO),
+            ev=sum((a.total_planned_cost for a in completed), ZERO),
+            ac=sum((a.total_actual_cost for a in completed), ZERO),
+            has_any_tracking=any(
+                a.actual_start_date is not None
+                or a.actual_end_date is not None
+                or a.actual_cost is not None
+                for a in activities
+            ),
+        )
+
+    @property
+    def planned_cost(self) -> Decimal:
+        return self.pv
+
+    @property
+    def sv(self) -> Decimal:
+        return self.ev - self.pv
+
+    @property
+    def cv(self) -> Decimal:
+        return self.ev - self.ac
+
+    @property
+    def spi(self) -> Decimal:
+        if self.pv > 0:
+            return self.ev / self.pv
+        return ZERO
+
+    @property
+    def cpi(self) -> Decimal:
+        if self.ac > 0:
+            return self.ev / self.ac
+        return ZERO
+
+    @property
+    def schedule_variance_count(self) -> int:
+        return self.completed_count - self.planned_count
+
+    @property
+    def progress_percentage(self) -> float:
+        if self.planned_count == 0:
+            return 0.0
+        return round((self.completed_count / self.planned_count) * 100, 1)
+
+    @property
+    def status(self) -> str:
+        if self.planned_count == 0 or not self.has_any_tracking:
+            return 'no_data'
+        return traffic_light(self.spi, self.cpi)
+
+    @property
+    def status_label(self) -> str:
+        return CUT_STATUS_LABELS.get(self.status, 'Desconocido')
+
+
+def compute_cut_metrics(project, cuts) -> dict:
+    """
+    Calcula las métricas de todos los cortes de un proyecto con una sola
+    carga de actividades.
+
+    Las actividades se ordenan por fecha de fin planificada; cada corte toma
+    su tramo con dos búsquedas binarias (los cortes pueden solaparse si se
+    editaron a mano). Retorna {cut.pk: CutMetrics}.
+    """
+    activities = list(project.activity_set.order_by('end_date', 'pk'))
+    end_dates = [a.end_date for a in activities]
+    metrics = {}
+    for cut in cuts:
+        lo = bisect_left(end_dates, cut.start_date)
+        hi = bisect_right(end_dates, cut.end_date)
+        metrics[cut.pk] = CutMetrics.from_activities(activities[lo:hi])
+    return metrics
@@ -0,0 +1,207 @@
+"""
+Exportación masiva de la cartera: proyectos, actividades, recursos,
+seguimientos, riesgos e interesados de los proyectos visibles.
+
+Todo se genera al vuelo con generadores: cada entidad se lee con
+values_list(...).iterator(chunk_size) (cursor del lado del servidor en
+PostgreSQL) y se escribe línea a línea, ya sea dentro de un ZIP con un CSV
+por entidad, como NDJSON (un objeto JSON por línea con su "entity") o como
+libro XLSX con una hoja tipada por entidad (ver projects.xlsx). El alcance
+es un queryset de proyectos que se usa como subconsulta, sin cargar sus ids
+en memoria.
+"""
+from __future__ import annotations
+
+import csv
+import zipfile
+from dataclasses import dataclass
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .services import EchoBuffer
+from .xlsx import XLSX_CONTENT_TYPE, XlsxWriter
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = ("zip", "ndjson", "xlsx")
+
+
+@dataclass(frozen=True)
+class ExportEntity:
+    """Una entidad exportable: nombre, columnas y cómo filtrarla por proyectos."""
+
+    name: str
+    model: str
+    fields: tuple
+    project_lookup: str
+
+    def queryset(self, projects):
+        from django.apps import apps
+
+        model = apps.get_model(self.model)
+        return model.objects.filter(**{f"{self.project_lookup}__in": projects.values("pk")}).order_by("pk")
+
+    def rows(self, projects, chunk_size: int = EXPORT_CHUNK_SIZE):
+        return self.queryset(projects).values_list(*self.fields).iterator(chunk_size=chunk_size)
+
+    @property
+    def columns(self) -> tuple:
+        return tuple(field.replace("__", "_") for field in self.fields)
+
+
+ENTITIES = (
+    ExportEntity(
+        "projects", "projects.Project",
+        ("id", "name", "status", "start_date", "end_date", "budget", "created_by__username", "created_at"),
+        "pk",
+    ),
+    ExportEntity(
+        "activities", "projects.Activity",
+        (
+            "id", "project_id", "name", "status", "start_date", "end_date", "actual_start_date",
+            "actual_end_date", "cost", "actual_cost", "resources_total", "predecessor_id",
+            "assigned_to__username",
+        ),
+        "project",
+    ),
+    ExportEntity(
+        "resources", "resources.Resource",
+        ("id", "activity__project_id", "activity_id", "name", "type", "quantity", "cost_per_unit", "total_cost"),
+        "activity__project",
+    ),
+    ExportEntity(
+        "seguimientos", "projects.Seguimiento",
+        ("id", "proyecto_id", "fecha", "pv", "ev", "ac", "sv", "cv", "spi", "cpi", "observacion"),
+        "proyecto",
+    ),
+    ExportEntity(
+        "risks", "risks.Risk",
+        ("id", "project_id", "description", "probability", "impact", "status", "identified_by", "identified_date"),
+        "project",
+    ),
+    # Una fila por (interesado, proyecto): se recorre la tabla intermedia del M2M
+    ExportEntity(
+        "stakeholders", "stakeholders.Stakeholder_projects",
+        (
+            "stakeholder_id", "project_id", "stakeholder__name", "stakeholder__email", "stakeholder__role",
+            "stakeholder__interest_level", "stakeholder__power_level",
+        ),
+        "project",
+    ),
+)
+
+# Hojas del libro XLSX: las entidades con fechas y montos que se analizan en Excel
+XLSX_SHEETS = (
+    ("activities", "Actividades"),
+    ("resources", "Recursos"),
+    ("seguimientos", "Seguimientos"),
+)
+
+
+class _StreamBuffer:
+    """
+    Destino no posicionable para zipfile: acumula lo escrito hasta que el
+    generador lo retira con ``drain``. zipfile detecta que no admite seek y
+    usa descriptores de datos, así que nunca reescribe lo ya entregado.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_zip(projects, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """ZIP con un CSV por entidad, en trozos de bytes a medida que se generan."""
+    buffer = _StreamBuffer()
+    writer = csv.writer(EchoBuffer())
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for entity in ENTITIES:
+            with archive.open(f"{entity.name}.csv", mode="w", force_zip64=True) as member:
+                member.write(writer.writerow(entity.columns).encode())
+                pending = []
+                for row in entity.rows(projects, chunk_size):
+                    pending.append(writer.writerow(row))
+                    if len(pending) >= chunk_size:
+                        member.write("".join(pending).encode())
+                        pending = []
+                        data = buffer.drain()
+                        if data:
+                            yield data
+                if pending:
+                    member.write("".join(pending).encode())
+            yield buffer.drain()
+    # Directorio central del ZIP
+    yield buffer.drain()
+
+
+def iter_ndjson(projects, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """Un objeto JSON por línea: {"entity": <entidad>, <columna>: <valor>, ...}."""
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for entity in ENTITIES:
+        columns = entity.columns
+        pending = []
+        for row in entity.rows(projects, chunk_size):
+            pending.append(encoder.encode({"entity": entity.name, **dict(zip(columns, row))}) + "\n")
+            if len(pending) >= chunk_size:
+                yield "".join(pending).encode()
+                pending = []
+        if pending:
+            yield "".join(pending).encode()
+
+
+def write_xlsx(projects, fileobj, chunk_size: int = EXPORT_CHUNK_SIZE) -> dict:
+    """
+    Escribe en ``fileobj`` un libro con una hoja por entidad de XLSX_SHEETS.
+    Devuelve las filas escritas por entidad.
+    """
+    entities = {entity.name: entity for entity in ENTITIES}
+    written = {}
+    with XlsxWriter(fileobj) as book:
+        for name, title in XLSX_SHEETS:
+            entity = entities[name]
+            written[name] = book.write_sheet(title, entity.columns, entity.rows(projects, chunk_size))
+    return written
+
+
+def iter_xlsx(projects, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """
+    XLSX en trozos de bytes a medida que se generan, igual que iter_zip: el
+    libro se escribe sobre un _StreamBuffer y se entrega tras cada lote de
+    filas, sin archivo temporal.
+    """
+    buffer = _StreamBuffer()
+    entities = {entity.name: entity for entity in ENTITIES}
+    with XlsxWriter(buffer, batch_rows=chunk_size) as book:
+        for name, title in XLSX_SHEETS:
+            entity = entities[name]
+            for _ in book.iter_sheet(title, entity.columns, entity.rows(projects, chunk_size)):
+                data = buffer.drain()
+                if data:
+                    yield data
+    # Libro, estilos, relaciones y directorio central del ZIP
+    yield buffer.drain()
+
+
+def iter_portfolio_export(projects, export_format: str = "zip", chunk_size: int = EXPORT_CHUNK_SIZE):
+    if export_format == "ndjson":
+        return iter_ndjson(projects, chunk_size)
+    if export_format == "xlsx":
+        return iter_xlsx(projects, chunk_size)
+    return iter_zip(projects, chunk_size)
+
+
+def content_type_for(export_format: str) -> str:
+    if export_format == "xlsx":
+        return XLSX_CONTENT_TYPE
+    return "application/x-ndjson" if export_format == "ndjson" else "application/zip"
+
@@ -0,0 +1,168 @@
+"""
+Pronósticos EVM por seguimiento: EAC (varios métodos), ETC, VAC, TCPI y
+Earned Schedule (ES, SPI(t)).
+
+Todo el pronóstico de un proyecto sale de dos cargas: la serie ordenada de
+seguimientos (con BAC y estimación bottom-up agregadas desde sus
+instantáneas en la misma consulta) y la curva PV de la línea base
+(EVMTimeSeries). Luego se resuelve en una sola pasada en memoria.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Case, F, Sum, When
+from django.db.models.functions import Greatest
+
+from .evm import MONEY_FIELD, ZERO, EVMTimeSeries
+
+EAC_METHODS = {
+    "cpi": "EAC = BAC / CPI",
+    "cpi_spi": "EAC = AC + (BAC - EV) / (CPI x SPI)",
+    "bottom_up": "EAC = AC + estimación vigente de lo pendiente",
+}
+
+
+def _div(numerator, denominator):
+    """División segura: None si el denominador es 0 (indicador indefinido)."""
+    if not denominator:
+        return None
+    return numerator / denominator
+
+
+@dataclass(frozen=True)
+class EVMForecast:
+    fecha: object
+    pv: Decimal
+    ev: Decimal
+    ac: Decimal
+    bac: Decimal
+    eac_cpi: Decimal | None
+    eac_cpi_spi: Decimal | None
+    eac_bottom_up: Decimal
+    tcpi: Decimal | None
+    es_days: Decimal
+    at_days: int
+    planned_days: int
+    project_start: object
+
+    @property
+    def cpi(self):
+        return _div(self.ev, self.ac)
+
+    @property
+    def spi(self):
+        return _div(self.ev, self.pv)
+
+    @property
+    def eac(self):
+        """EAC de referencia: basado en CPI, o bottom-up si CPI está indefinido."""
+        return self.eac_cpi if self.eac_cpi is not None else self.eac_bottom_up
+
+    @property
+    def etc(self) -> Decimal:
+        return self.eac - self.ac
+
+    @property
+    def vac(self) -> Decimal:
+        return self.bac - self.eac
+
+    @property
+    def spi_t(self):
+        """SPI(t) = ES / AT."""
+        return _div(self.es_days, Decimal(self.at_days))
+
+    @property
+    def earned_schedule_date(self):
+        return self.project_start + timedelta(days=int(self.es_days))
+
+    @property
+    def forecast_end_date(self):
+        """Fin pronosticado por Earned Schedule: inicio + duración planificada / SPI(t)."""
+        spi_t = self.spi_t
+        if not spi_t or self.project_start is None:
+            return None
+        return self.project_start + timedelta(days=int(round(self.planned_days / spi_t)))
+
+
+def earned_schedule_days(pv_dates, pv_cumulative, ev, start) -> Decimal:
+    """
+    ES: días desde el inicio en que la curva PV de la línea base alcanzó el
+    EV actual, interpolando linealmente entre los escalones de la curva.
+    """
+    if ev <= 0 or not pv_cumulative or start is None:
+        return ZERO
+    index = bisect_left(pv_cumulative, ev)
+    if index >= len(pv_cumulative):
+        return Decimal((pv_dates[-1] - start).days)
+    prev_date = pv_dates[index - 1] if index else start
+    prev_pv = pv_cumulative[index - 1] if index else ZERO
+    step = pv_cumulative[index] - prev_pv
+    span = (pv_dates[index] - prev_date).days
+    fraction = (ev - prev_pv) / step if step else ZERO
+    return Decimal((prev_date - start).days) + fraction * span
+
+
+def build_forecasts(rows, baseline: EVMTimeSeries, start, end) -> list[EVMForecast]:
+    """
+    rows: (fecha, pv, ev, ac, bac, bottom_up) ordenadas por fecha; bac y
+    bottom_up pueden ser None (seguimientos sin instantánea). baseline
+    aporta la curva PV para Earned Schedule y el BAC de respaldo.
+    """
+    baseline_bac = baseline.pv_cumulative[-1] if baseline.pv_cumulative else ZERO
+    planned_days = (end - start).days if start and end else 0
+    forecasts = []
+    for fecha, pv, ev, ac, bac, bottom_up in rows:
+        bac = bac if bac is not None else baseline_bac
+        cpi = _div(ev, ac)
+        spi = _div(ev, pv)
+        remaining = bac - ev
+        forecasts.append(EVMForecast(
+            fecha=fecha,
+            pv=pv,
+            ev=ev,
+            ac=ac,
+            bac=bac,
+            eac_cpi=_div(bac, cpi) if cpi else None,
+            eac_cpi_spi=ac + remaining / (cpi * spi) if cpi and spi else None,
+            # Sin instantánea: lo pendiente se estima al costo planificado
+            eac_bottom_up=bottom_up if bottom_up is not None else ac + remaining,
+            tcpi=_div(remaining, bac - ac),
+            es_days=earned_schedule_days(baseline.pv_dates, baseline.pv_cumulative, ev, start),
+            at_days=(fecha - start).days if start else 0,
+            planned_days=planned_days,
+            project_start=start,
+        ))
+    return forecasts
+
+
+def project_forecasts(project, baseline: EVMTimeSeries | None = None) -> list[EVMForecast]:
+    """
+    Pronósticos de todos los seguimientos del proyecto (ordenados por fecha)
+    con dos consultas: seguimientos + agregados de sus instantáneas, y la
+    curva PV de la línea base (que puede pasarse ya cargada).
+
+    BAC es el costo planificado total congelado en cada seguimiento; la
+    estimación bottom-up suma, por actividad, el costo real si ya está
+    completada y, si no, lo gastado más lo que resta del planificado
+    (el mayor entre costo real y planificado).
+    """
+    from .models import Seguimiento
+
+    estimate = Case(
+        When(snapshots__status="completed", then=F("snapshots__accrued_cost")),
+        default=Greatest("snapshots__accrued_cost", "snapshots__planned_cost"),
+        output_field=MONEY_FIELD,
+    )
+    rows = (
+        Seguimiento.objects.filter(proyecto=project)
+        .annotate(bac=Sum("snapshots__planned_cost"), estimate=Sum(estimate))
+        .order_by("fecha", "pk")
+        .values_list("fecha", "pv", "ev", "ac", "bac", "estimate")
+    )
+    if baseline is None:
+        baseline = EVMTimeSeries.for_project(project)
+    return build_forecasts(rows, baseline, project.start_date, project.end_date)
@@ -238,6 +238,9 @@ class SeguimientoForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         if "proyecto" in self.initial:
             self.fields["proyecto"].widget = forms.HiddenInput()
+        if self.instance.pk:
+            # La instantánea pertenece al proyecto original: no se reasigna al editar
+            self.fields["proyecto"].disabled = True
 
 
 class ActaConstitucionForm(forms.ModelForm):
@@ -0,0 +1,338 @@
+"""
+Contexto calculado del diagrama de Gantt.
+
+``gantt_payload`` arma marcas de meses y semanas, geometría de filas,
+trazos SVG de dependencias y la ruta crítica (projects.cpm) con un
+número fijo de consultas, y guarda el resultado en el caché versionado
+(projects.versioning) por proyecto y filtros: una segunda apertura del
+mismo Gantt no recalcula nada hasta que cambien los datos del proyecto.
+
+Tras ediciones masivas, ``schedule_gantt_prewarm`` reconstruye en segundo
+plano la vista sin filtros, que es la que se abre primero.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from .cpm import compute_critical_path
+from .services import ReportFilters, filter_report_activities
+from .versioning import cached_project_value
+
+logger = logging.getLogger(__name__)
+
+GANTT_VIEW = "gantt"
+# Solo estos filtros cambian el Gantt; el resto de ReportFilters no forma parte de la clave
+GANTT_FILTER_FIELDS = ("activity_status", "owner_id", "date_from", "date_to")
+MIN_TIMELINE_WIDTH = 960
+PX_PER_WEEK = 56
+ROW_HEIGHT = 60
+# Filas por ventana del renderizador virtualizado (y primera ventana renderizada en el servidor)
+WINDOW_ROWS = 100
+MAX_WINDOW_ROWS = 500
+
+
+def gantt_cache_filters(filters: ReportFilters) -> dict:
+    return {name: getattr(filters, name) for name in GANTT_FILTER_FIELDS}
+
+
+def _month_markers(timeline_start, timeline_end, px_per_day):
+    markers = []
+    current = timeline_start.replace(day=1)
+    while current <= timeline_end:
+        next_month = current.replace(year=current.year + (1 if current.month == 12 else 0), month=1 if current.month == 12 else current.month + 1, day=1)
+        marker_start = max(current, timeline_start)
+        marker_end = min(next_month, timeline_end)
+        offset_days = (marker_start - timeline_start).days
+        width_days = max((marker_end - marker_start).days, 1)
+        markers.append(
+            {
+                "label": current.strftime("%b %Y"),
+                "offset_px": round(offset_days * px_per_day, 2),
+                "width_px": round(max(width_days * px_per_day, 72), 2),
+            }
+        )
+        current = next_month
+    return markers
+
+
+def _week_markers(timeline_start, timeline_end, px_per_day, total_weeks):
+    markers = []
+    week_cursor = timeline_start
+    week_index = 0
+    label_every = 1 if total_weeks <= 12 else (2 if total_weeks <= 24 else 4)
+    while week_cursor <= timeline_end:
+        offset_days = (week_cursor - timeline_start).days
+        width_days = min(7, (timeline_end - week_cursor).days + 1)
+        markers.append(
+            {
+                "label": week_cursor.strftime("%d %b"),
+                "offset_px": round(offset_days * px_per_day, 2),
+                "width_px": round(max(width_days * px_per_day, 28), 2),
+                "show_label": week_index % label_every == 0,
+            }
+        )
+        week_cursor = week_cursor + timedelta(days=7)
+        week_index += 1
+    return markers
+
+
+def build_gantt_payload(project, filters: ReportFilters) -> dict:
+    """
+    Calcula el contexto del Gantt sin caché: tres consultas (actividades
+    filtradas con responsable y predecesor, hitos y la red del proyecto
+    para la ruta crítica) sin importar el tamaño del cronograma.
+    """
+    activity_rows = list(filter_report_activities(project, filters).select_related("predecessor"))
+    milestones = list(project.milestone_set.all())
+
+    timeline_start = project.start_date
+    timeline_end = project.end_date
+    starts = [activity.start_date for activity in activity_rows if activity.start_date]
+    ends = [activity.end_date for activity in activity_rows if activity.end_date]
+    if starts and (timeline_start is None or min(starts) < timeline_start):
+        timeline_start = min(starts)
+    if ends and (timeline_end is None or max(ends) > timeline_end):
+        timeline_end = max(ends)
+
+    payload = {
+        "activity_count": len(activity_rows),
+        "milestone_count": len(milestones),
+        "gantt_rows": [],
+        "month_markers": [],
+        "week_markers": [],
+        "milestone_markers": [],
+        "dependency_lines": [],
+        "timeline_width_px": MIN_TIMELINE_WIDTH,
+        "timeline_height_px": 0,
+        "row_height": ROW_HEIGHT,
+        "timeline_start": timeline_start,
+        "timeline_end": timeline_end,
+        "px_per_day": None,
+        "critical_count": 0,
+        "cpm_finish": None,
+    }
+    if not (timeline_start and timeline_end):
+        return payload
+
+    total_days = max((timeline_end - timeline_start).days + 1, 1)
+    total_weeks = max((total_days + 6) // 7, 1)
+    timeline_width_px = max(total_weeks * PX_PER_WEEK, MIN_TIMELINE_WIDTH)
+    px_per_day = timeline_width_px / total_days
+
+    # Ruta crítica sobre todo el proyecto: puede pasar por actividades que el filtro oculta
+    schedule = compute_critical_path(project)
+
+    gantt_rows = []
+    row_lookup = {}
+    for activity in activity_rows:
+        if not activity.start_date or not activity.end_date:
+            continue
+        # Posición entre las filas dibujadas (las actividades sin fechas no ocupan fila)
+        index = len(gantt_rows)
+        duration_days = max((activity.end_date - activity.start_date).days + 1, 1)
+        start_px = round((activity.start_date - timeline_start).days * px_per_day, 2)
+        width_px = round(max(duration_days * px_per_day, 24), 2)
+        finish_px = round(start_px + width_px, 2)
+        progress = 100 if activity.status == "completed" else (55 if activity.status == "in_progress" else 10)
+        cpm = schedule.get(activity.pk)
+        row_lookup[activity.pk] = {
+            "start_px": start_px,
+            "finish_px": finish_px,
+            "center_y": round(index * ROW_HEIGHT + (ROW_HEIGHT / 2), 2),
+        }
+        gantt_rows.append(
+            {
+                "id": activity.pk,
+                "row_index": index,
+                "name": activity.name,
+                "status": activity.get_status_display(),
+                "owner": activity.assigned_to.get_full_name() if activity.assigned_to else "Sin responsable",
+                "start_date": activity.start_date,
+                "end_date": activity.end_date,
+                "offset_px": start_px,
+                "width_px": width_px,
+                "duration_days": duration_days,
+                "progress": progress,
+                "bar_class": (
+                    "is-complete"
+                    if activity.status == "completed"
+                    else ("is-active" if activity.status == "in_progress" else "is-pending")
+                ),
+                "predecessor": activity.predecessor.name if activity.predecessor else "",
+                "predecessor_id": activity.predecessor_id,
+                "is_critical": schedule.is_critical(activity.pk),
+                "total_float": cpm.total_float if cpm else None,
+                "free_float": cpm.free_float if cpm else None,
+            }
+        )
+
+    dependency_lines = []
+    for row in gantt_rows:
+        predecessor_id = row["predecessor_id"]
+        if predecessor_id and predecessor_id in row_lookup and row["id"] in row_lookup:
+            source = row_lookup[predecessor_id]
+            target = row_lookup[row["id"]]
+            dependency_lines.append(
+                {
+                    "predecessor_id": predecessor_id,
+                    "activity_id": row["id"],
+                    "path": (
+                        f"M {source['finish_px']} {source['center_y']} "
+                        f"L {source['finish_px'] + 18} {source['center_y']} "
+                        f"L {source['finish_px'] + 18} {target['center_y']} "
+                        f"L {max(target['start_px'] - 8, source['finish_px'] + 18)} {target['center_y']}"
+                    ),
+                    "is_critical": (
+                        row["is_critical"]
+                        and schedule.is_critical(predecessor_id)
+                        and schedule.is_driving(predecessor_id, row["id"])
+                    ),
+                }
+            )
+
+    payload.update(
+        gantt_rows=gantt_rows,
+        month_markers=_month_markers(timeline_start, timeline_end, px_per_day),
+        week_markers=_week_markers(timeline_start, timeline_end, px_per_day, total_weeks),
+        milestone_markers=[
+            {
+                "name": milestone.name,
+                "date": milestone.due_date,
+                "offset_px": round((milestone.due_date - timeline_start).days * px_per_day, 2),
+                "completed": milestone.completed,
+            }
+            for milestone in milestones
+            if milestone.due_date
+        ],
+        dependency_lines=dependency_lines,
+        timeline_width_px=timeline_width_px,
+        timeline_height_px=max(len(gantt_rows) * ROW_HEIGHT, ROW_HEIGHT),
+        px_per_day=px_per_day,
+        critical_count=len(schedule.critical_path),
+        cpm_finish=schedule.project_finish,
+    )
+    return payload
+
+
+def gantt_payload(project, filters: ReportFilters) -> dict:
+    """Contexto del Gantt desde el caché versionado (lo calcula si falta)."""
+    return cached_project_value(
+        project.pk, GANTT_VIEW, lambda: build_gantt_payload(project, filters), filters=gantt_cache_filters(filters),
+    )
+
+
+def gantt_window(payload: dict, offset: int = 0, limit: int = WINDOW_ROWS, window_start=None, window_end=None) -> dict:
+    """
+    Recorte del Gantt para el renderizador virtualizado: filas
+    ``[offset, offset + limit)`` y, si se indica, solo lo que cae entre
+    ``window_start`` y ``window_end`` (barras, marcas de meses y semanas e
+    hitos). Las posiciones siguen siendo absolutas (``row_index`` y píxeles
+    desde el inicio del cronograma) para que el cliente ubique cada ventana
+    sin recalcular nada.
+    """
+    rows = payload["gantt_rows"][offset:offset + limit]
+    months, weeks, milestones = payload["month_markers"], payload["week_markers"], payload["milestone_markers"]
+    if payload["px_per_day"] is not None and (window_start or window_end):
+        start = window_start or payload["timeline_start"]
+        end = window_end or payload["timeline_end"]
+        left = (start - payload["timeline_start"]).days * payload["px_per_day"]
+        right = ((end - payload["timeline_start"]).days + 1) * payload["px_per_day"]
+
+        def visible(marker):
+            # Medio píxel de tolerancia: las posiciones vienen redondeadas a dos decimales
+            return marker["offset_px"] < right - 0.5 and marker["offset_px"] + marker.get("width_px", 0) > left + 0.5
+
+        rows = [row for row in rows if row["start_date"] <= end and row["end_date"] >= start]
+        months = [m for m in months if visible(m)]
+        weeks = [w for w in weeks if visible(w)]
+        milestones = [m for m in milestones if start <= m["date"] <= end]
+
+    ids = {row["id"] for row in rows}
+    return {
+        "total_rows": len(payload["gantt_rows"]),
+        "offset": offset,
+        "limit": limit,
+        "row_height": payload["row_height"],
+        "timeline_start": payload["timeline_start"],
+        "timeline_end": payload["timeline_end"],
+        "timeline_width_px": payload["timeline_width_px"],
+        "timeline_height_px": payload["timeline_height_px"],
+        "rows": rows,
+        "dependencies": [
+            line for line in payload["dependency_lines"]
+            if line["activity_id"] in ids or line["predecessor_id"] in ids
+        ],
+        "month_markers": months,
+        "week_markers": weeks,
+        "milestone_markers": milestones,
+    }
+
+
+def today_offset(payload: dict, today: date | None = None):
+    """Posición de la línea de hoy; se calcula por petición porque no depende de los datos."""
+    start, end, px_per_day = payload["timeline_start"], payload["timeline_end"], payload["px_per_day"]
+    today = today or date.today()
+    if px_per_day is None or not (start <= today <= end):
+        return None
+    return round((today - start).days * px_per_day, 2)
+
+
+# ── Precalentamiento tras ediciones masivas ──────────────────────────────
+
+def prewarm_gantt_cache(project_ids) -> int:
+    """Reconstruye el Gantt sin filtros de los proyectos indicados. Devuelve cuántos."""
+    from .models import Project
+
+    warmed = 0
+    for project in Project.objects.filter(pk__in=[pk for pk in project_ids if pk]):
+        gantt_payload(project, ReportFilters())
+        warmed += 1
+    return warmed
+
+
+def _prewarm_in_thread(project_ids):
+    try:
+        prewarm_gantt_cache(project_ids)
+    except Exception:
+        logger.exception("Error al precalentar el Gantt de los proyectos %s", sorted(project_ids))
+    finally:
+        connections.close_all()
+
+
+_pending = threading.local()
+
+
+def _pending_ids() -> set:
+    if not hasattr(_pending, "ids"):
+        _pending.ids = set()
+    return _pending.ids
+
+
+def _flush_pending():
+    ids = _pending_ids()
+    if not ids:
+        return
+    project_ids = set(ids)
+    ids.clear()
+    mode = getattr(settings, "PROJECT_CACHE_PREWARM", "thread")
+    if mode == "sync":
+        prewarm_gantt_cache(project_ids)
+    elif mode == "thread":
+        threading.Thread(target=_prewarm_in_thread, args=(project_ids,), daemon=True).start()
+
+
+def schedule_gantt_prewarm(project_id):
+    """
+    Encola el proyecto para precalentar su Gantt al confirmar la
+    transacción (un solo hilo por transacción, como schedule_metrics_refresh).
+    PROJECT_CACHE_PREWARM elige "thread" (por defecto), "sync" u "off".
+    """
+    if not project_id or getattr(settings, "PROJECT_CACHE_PREWARM", "thread") == "off":
+        return
+    _pending_ids().add(project_id)
+    transaction.on_commit(_flush_pending)
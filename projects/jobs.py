@@ -0,0 +1,244 @@
+"""
+Cola de trabajos de reportes sobre la base de datos (sin broker externo).
+
+Las vistas encolan un ReportJob y responden de inmediato; el comando
+run_report_worker toma los trabajos en cola bloqueando las filas
+(SELECT ... FOR UPDATE SKIP LOCKED donde el motor lo admite, y en todo caso
+con un UPDATE condicional sobre el estado, de modo que dos workers nunca
+ejecutan el mismo trabajo) y los corre en un pool de hilos o procesos.
+
+Cada tipo de trabajo tiene un manejador que escribe su resultado en un
+archivo temporal, informa el avance y devuelve el nombre del archivo (o
+ninguno, si el trabajo no produce archivo). Mientras corre, el worker
+renueva ``heartbeat_at`` (en cada avance y cada
+``REPORT_JOB_HEARTBEAT_SECONDS``); los trabajos sin latido durante
+``REPORT_JOB_STALE_SECONDS`` (worker caído) vuelven a la cola hasta
+``REPORT_JOB_MAX_ATTEMPTS`` intentos. El resultado final solo se guarda si
+el trabajo sigue en manos del mismo worker: un worker que termina tarde no
+pisa un trabajo ya reencolado o dado por fallido.
+"""
+from __future__ import annotations
+
+import logging
+import tempfile
+import threading
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from functools import partial
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connection, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+JOB_STALE_SECONDS = 30 * 60
+JOB_HEARTBEAT_SECONDS = 60
+JOB_MAX_ATTEMPTS = 3
+
+
+class ReportJobError(Exception):
+    """Trabajo inválido: tipo desconocido o faltan datos para ejecutarlo."""
+
+
+@dataclass(frozen=True)
+class JobOutput:
+    filename: str = ""
+    message: str = ""
+
+
+def _owned(job_id, worker):
+    """Filtro del trabajo mientras siga en ejecución en manos de ``worker``."""
+    from .models import ReportJob
+
+    return ReportJob.objects.filter(pk=job_id, state="running", worker=worker)
+
+
+def update_report_job_progress(job_id, worker: str, progress: int, message: str = "") -> None:
+    """Guarda el avance (0-100) y renueva el latido con un UPDATE, sin recargar el trabajo."""
+    _owned(job_id, worker).update(
+        progress=max(0, min(int(progress), 100)), message=message[:255], heartbeat_at=timezone.now()
+    )
+
+
+def _beat(job_id, worker, interval, stop):
+    # Hilo de latido: renueva heartbeat_at aunque el manejador no informe avance
+    try:
+        while not stop.wait(interval):
+            _owned(job_id, worker).update(heartbeat_at=timezone.now())
+    except Exception:
+        logger.exception("Report job %s heartbeat failed", job_id)
+    finally:
+        connections.close_all()
+
+
+# ── Manejadores ───────────────────────────────────────────────────────────
+
+def _status_report(job, handle, progress) -> JobOutput:
+    from .reporting import build_status_report
+    from .services import filter_report_activities, parse_report_filters
+    from .xlsx import XlsxWriter
+
+    if job.project is None:
+        raise ReportJobError("El informe de estado requiere un proyecto.")
+    filters = parse_report_filters(job.params)
+    progress(10, "Calculando el informe")
+    report = build_status_report(job.project, filter_report_activities(job.project, filters))
+    progress(60, "Escribiendo el archivo")
+    columns = (
+        "name", "status", "progress", "planned_cost", "actual_cost", "cost_diff",
+        "planned_days", "actual_days", "time_diff",
+    )
+    with XlsxWriter(handle) as book:
+        book.write_sheet("Resumen", ("indicador", "valor"), [
+            ("Proyecto", job.project.name),
+            ("Progreso (%)", Decimal(str(round(report.progress, 1)))),
+            ("Actividades completadas", report.completed),
+            ("Actividades", report.total),
+            ("Costo planificado", report.planned_cost),
+            ("Costo actual", report.actual_cost),
+            ("Diferencia de costo", report.cost_difference),
+            ("Dias planificados", report.planned_days),
+            ("Dias transcurridos", report.actual_days),
+            ("Diferencia de tiempo", report.time_difference),
+        ])
+        book.write_sheet("Actividades", columns, ([row[c] for c in columns] for row in report.activities))
+    return JobOutput(
+        filename=f"estado_{job.project.pk}_{date.today():%Y%m%d}.xlsx",
+        message=f"{report.total} actividad(es)",
+    )
+
+
+def _portfolio_export(job, handle, progress) -> JobOutput:
+    from .exports import EXPORT_FORMATS, iter_portfolio_export, write_xlsx
+    from .services import filter_report_projects, parse_report_filters
+
+    filters = parse_report_filters(job.params)
+    export_format = filters.export_format if filters.export_format in EXPORT_FORMATS else "zip"
+    projects = filter_report_projects(job.requested_by, filters)
+    progress(10, "Exportando la cartera")
+    if export_format == "xlsx":
+        write_xlsx(projects, handle)
+    else:
+        for chunk in iter_portfolio_export(projects, export_format):
+            handle.write(chunk)
+    return JobOutput(filename=f"cartera_{date.today():%Y%m%d}.{export_format}")
+
+
+def _recalculate_seguimientos(job, handle, progress) -> JobOutput:
+    from .services import recalculate_project_seguimientos
+
+    if job.project is None:
+        raise ReportJobError("El recálculo requiere un proyecto.")
+    progress(10, "Recalculando seguimientos")
+    result = recalculate_project_seguimientos(job.project.pk, from_live=bool(job.params.get("from_live")))
+    return JobOutput(message=f"Seguimientos: {result.rows} | Con desvío: {result.changed} | Omitidos: {result.skipped}")
+
+
+JOB_HANDLERS = {
+    "status_report": _status_report,
+    "portfolio_export": _portfolio_export,
+    "recalculate_seguimientos": _recalculate_seguimientos,
+}
+
+
+# ── Cola ──────────────────────────────────────────────────────────────────
+
+def enqueue_report_job(kind: str, user, project=None, params=None):
+    from .models import ReportJob
+
+    if kind not in JOB_HANDLERS:
+        raise ReportJobError(f"Tipo de trabajo desconocido: {kind}")
+    return ReportJob.objects.create(kind=kind, requested_by=user, project=project, params=params or {})
+
+
+def claim_report_jobs(worker: str, limit: int = 1) -> list:
+    """
+    Toma hasta ``limit`` trabajos en cola (los más antiguos) para ``worker``
+    y los pasa a "en ejecución". Devuelve los ids tomados.
+    """
+    from .models import ReportJob
+
+    claimed = []
+    with transaction.atomic():
+        queued = ReportJob.objects.filter(state="queued").order_by("created_at", "pk")
+        if connection.features.has_select_for_update_skip_locked:
+            queued = queued.select_for_update(skip_locked=True)
+        candidates = list(queued.values_list("pk", flat=True)[:limit])
+        now = timezone.now()
+        for pk in candidates:
+            # El filtro por estado hace la toma atómica aunque el motor no bloquee filas
+            taken = ReportJob.objects.filter(pk=pk, state="queued").update(
+                state="running", worker=worker[:100], started_at=now, heartbeat_at=now, finished_at=None,
+                progress=0, message="", error="", attempts=F("attempts") + 1,
+            )
+            if taken:
+                claimed.append(pk)
+    return claimed
+
+
+def recover_stale_report_jobs(stale_seconds: int | None = None) -> int:
+    """Devuelve a la cola (o da por fallidos) los trabajos de workers caídos."""
+    from .models import ReportJob
+
+    if stale_seconds is None:
+        stale_seconds = getattr(settings, "REPORT_JOB_STALE_SECONDS", JOB_STALE_SECONDS)
+    max_attempts = getattr(settings, "REPORT_JOB_MAX_ATTEMPTS", JOB_MAX_ATTEMPTS)
+    stale = ReportJob.objects.filter(
+        state="running", heartbeat_at__lt=timezone.now() - timedelta(seconds=stale_seconds)
+    )
+    failed = stale.filter(attempts__gte=max_attempts).update(
+        state="failed", finished_at=timezone.now(), error="El worker dejó de dar señales de vida."
+    )
+    requeued = stale.filter(attempts__lt=max_attempts).update(state="queued", worker="", message="Reintento")
+    return failed + requeued
+
+
+def run_report_job(job_id) -> str:
+    """
+    Ejecuta un trabajo ya tomado y guarda su resultado; devuelve el estado
+    final, o "lost" si entretanto se reencoló o se dio por fallido.
+    """
+    from .models import ReportJob
+
+    job = ReportJob.objects.select_related("project", "requested_by").get(pk=job_id)
+    progress = partial(update_report_job_progress, job.pk, job.worker)
+    stop = threading.Event()
+    interval = getattr(settings, "REPORT_JOB_HEARTBEAT_SECONDS", JOB_HEARTBEAT_SECONDS)
+    heartbeat = threading.Thread(target=_beat, args=(job.pk, job.worker, interval, stop), daemon=True)
+    heartbeat.start()
+    try:
+        handler = JOB_HANDLERS.get(job.kind)
+        if handler is None:
+            raise ReportJobError(f"Tipo de trabajo desconocido: {job.kind}")
+        with tempfile.TemporaryFile() as handle:
+            output = handler(job, handle, progress)
+            if output.filename:
+                handle.seek(0)
+                job.result.save(output.filename, File(handle), save=False)
+                job.result_name = output.filename
+    except Exception as exc:
+        logger.exception("Report job %s failed", job_id)
+        finished = _owned(job.pk, job.worker).update(
+            state="failed", finished_at=timezone.now(), error=f"{type(exc).__name__}: {exc}"[:2000],
+        )
+        state = "failed"
+    else:
+        finished = _owned(job.pk, job.worker).update(
+            state="succeeded", progress=100, finished_at=timezone.now(), message=output.message[:255],
+            result=job.result.name or "", result_name=job.result_name,
+        )
+        state = "succeeded"
+    finally:
+        stop.set()
+        heartbeat.join()
+
+    if not finished:
+        logger.warning("Report job %s was requeued or failed while %s ran it; result discarded", job_id, job.worker)
+        if job.result:
+            job.result.delete(save=False)
+        return "lost"
+    return state
@@ -0,0 +1,53 @@
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from projects.exports import ENTITIES
+from projects.xlsx import XlsxWriter
+
+
+def synthetic_activity_rows(count):
+    """Filas con la forma de la hoja de actividades, sin tocar la base de datos."""
+    start = date(2026, 1, 1)
+    for i in range(count):
+        begin = start + timedelta(days=i % 365)
+        yield (
+            i + 1, 1 + i % 50, f"Actividad {i}", "in_progress", begin, begin + timedelta(days=10),
+            begin, None, Decimal("1500.00") + i % 100, Decimal("1320.50"), Decimal("980.25"),
+            i or None, f"usuario{i % 20}",
+        )
+
+
+class Command(BaseCommand):
+    help = "Mide el escritor XLSX en flujo: segundos por 100k filas y memoria pico"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200000, help="Filas a escribir")
+
+    def handle(self, *args, **options):
+        rows = max(1, options["rows"])
+        columns = next(entity.columns for entity in ENTITIES if entity.name == "activities")
+
+        # Tiempo y memoria en pasadas separadas: tracemalloc frena la escritura
+        started = time.perf_counter()
+        size = self._write(columns, rows)
+        elapsed = time.perf_counter() - started
+
+        tracemalloc.start()
+        self._write(columns, rows)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.stdout.write(f"Filas: {rows} en {elapsed:.2f} s ({elapsed * 100000 / rows:.2f} s por 100k filas)")
+        self.stdout.write(f"Archivo: {size / 1024 / 1024:.1f} MB; memoria pico: {peak / 1024 / 1024:.1f} MB")
+        self.stdout.write(self.style.SUCCESS("Benchmark completado."))
+
+    def _write(self, columns, rows):
+        with tempfile.TemporaryFile() as handle:
+            with XlsxWriter(handle) as book:
+                book.write_sheet("Actividades", columns, synthetic_activity_rows(rows))
+            return handle.tell()
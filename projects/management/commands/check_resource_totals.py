@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+
+from projects.evm import MONEY_FIELD, resources_sum_subquery
+from projects.models import Activity
+from resources.models import Resource, refresh_activity_totals
+
+
+class Command(BaseCommand):
+    help = "Verifica (y opcionalmente repara) los totales desnormalizados de recursos por actividad"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repair", action="store_true", help="Corrige los desvíos encontrados")
+        parser.add_argument("--project", type=int, help="Limitar a un proyecto (id)")
+
+    def handle(self, *args, **options):
+        resources = Resource.objects.all()
+        activities = Activity.objects.all()
+        if options["project"]:
+            resources = resources.filter(activity__project_id=options["project"])
+            activities = activities.filter(project_id=options["project"])
+
+        # 1. Recursos cuyo total_cost no coincide con quantity * cost_per_unit
+        resource_drift = resources.exclude(total_cost=F("quantity") * F("cost_per_unit"))
+        resource_drift_ids = list(resource_drift.values_list("pk", flat=True))
+
+        # 2. Actividades cuyo resources_total no coincide con la suma real,
+        #    o cuyo cost no quedó sincronizado con sus recursos
+        expected = Coalesce(resources_sum_subquery(), Value(Decimal("0")), output_field=MONEY_FIELD)
+        activity_drift = activities.annotate(expected_total=expected).filter(
+            ~Q(resources_total=F("expected_total"))
+            | (Q(expected_total__gt=0) & (Q(cost__isnull=True) | ~Q(cost=F("expected_total"))))
+        )
+        drift_rows = list(activity_drift.values_list("pk", "name", "resources_total", "expected_total"))
+
+        for pk, name, stored, real in drift_rows:
+            self.stdout.write(f"Actividad {pk} ({name}): resources_total={stored} esperado={real}")
+        self.stdout.write(
+            f"Recursos con total_cost desviado: {len(resource_drift_ids)} | "
+            f"Actividades con total desviado: {len(drift_rows)}"
+        )
+
+        if not resource_drift_ids and not drift_rows:
+            self.stdout.write(self.style.SUCCESS("Sin desvíos."))
+            return
+
+        if not options["repair"]:
+            self.stdout.write(self.style.WARNING("Ejecute con --repair para corregir los desvíos."))
+            return
+
+        with transaction.atomic():
+            # ResourceQuerySet.update también refresca las actividades afectadas
+            Resource.objects.filter(pk__in=resource_drift_ids).update(
+                total_cost=F("quantity") * F("cost_per_unit")
+            )
+            refresh_activity_totals(pk for pk, *_ in drift_rows)
+
+        self.stdout.write(self.style.SUCCESS("Desvíos corregidos."))
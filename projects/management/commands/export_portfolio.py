@@ -0,0 +1,51 @@
+import sys
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, iter_portfolio_export
+from projects.models import Project
+from projects.permissions import get_user_projects
+
+
+class Command(BaseCommand):
+    help = "Exporta la cartera (proyectos, actividades, recursos, seguimientos, riesgos e interesados) en ZIP, NDJSON o XLSX"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Archivo de salida ('-' para la salida estándar)")
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="zip", help="zip (un CSV por entidad), ndjson o xlsx (una hoja por actividades, recursos y seguimientos)")
+        parser.add_argument("--user", help="Limitar a los proyectos visibles para este usuario")
+        parser.add_argument("--project", type=int, action="append", help="Limitar a un proyecto (id); repetible")
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE, help="Filas por lectura")
+
+    def handle(self, *args, **options):
+        if options["user"]:
+            try:
+                user = User.objects.get(username=options["user"])
+            except User.DoesNotExist:
+                raise CommandError(f"Usuario inexistente: {options['user']}")
+            projects = get_user_projects(user)
+        else:
+            projects = Project.objects.all()
+        if options["project"]:
+            projects = projects.filter(pk__in=options["project"])
+
+        chunks = iter_portfolio_export(projects, options["format"], max(1, options["chunk_size"]))
+        started = time.perf_counter()
+        written = 0
+        if options["output"] == "-":
+            out = sys.stdout.buffer
+            for chunk in chunks:
+                out.write(chunk)
+                written += len(chunk)
+            out.flush()
+            return
+        with open(options["output"], "wb") as out:
+            for chunk in chunks:
+                out.write(chunk)
+                written += len(chunk)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(f"Bytes escritos: {written} en {elapsed:.2f} s")
+        self.stdout.write(self.style.SUCCESS(f"Cartera exportada en {options['output']}."))
@@ -0,0 +1,125 @@
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from functools import partial
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils.dateparse import parse_date
+
+# Los modelos se importan dentro de las funciones: los procesos del pool
+# pueden arrancar con "spawn" y cargar este módulo antes de django.setup().
+
+
+def _init_worker():
+    django.setup()
+    # Con "fork" el hijo hereda las conexiones del padre: no deben compartirse
+    connections.close_all()
+
+
+def _recalculate(project_id, **options):
+    from projects.services import recalculate_project_seguimientos
+
+    return recalculate_project_seguimientos(project_id, **options)
+
+
+def _parse_date(value):
+    fecha = parse_date(value)
+    if fecha is None:
+        raise CommandError(f"Fecha inválida: {value} (use AAAA-MM-DD)")
+    return fecha
+
+
+class Command(BaseCommand):
+    help = "Recalcula en lote las métricas EVM guardadas de los seguimientos (en paralelo por proyecto)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--project", type=int, action="append", help="Limitar a un proyecto (id); repetible")
+        parser.add_argument("--status", help="Limitar a proyectos con este estado")
+        parser.add_argument("--from", dest="date_from", type=_parse_date, help="Seguimientos desde (AAAA-MM-DD)")
+        parser.add_argument("--to", dest="date_to", type=_parse_date, help="Seguimientos hasta (AAAA-MM-DD)")
+        parser.add_argument(
+            "--workers", type=int, default=min(4, os.cpu_count() or 1),
+            help="Procesos en paralelo (1 = en este proceso)",
+        )
+        parser.add_argument("--batch-size", type=int, default=500, help="Filas por bulk_update")
+        parser.add_argument(
+            "--from-live", action="store_true",
+            help="Recalcular contra el estado actual de las actividades y volver a congelar la instantánea del último seguimiento",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Solo informar el desvío, sin escribir")
+
+    def handle(self, *args, **options):
+        from projects.models import Project, Seguimiento
+
+        projects = Project.objects.all()
+        if options["project"]:
+            projects = projects.filter(pk__in=options["project"])
+        if options["status"]:
+            valid = {code for code, _ in Project.STATUS_CHOICES}
+            if options["status"] not in valid:
+                raise CommandError(f"Estado inválido: {options['status']} (opciones: {', '.join(sorted(valid))})")
+            projects = projects.filter(status=options["status"])
+        seguimientos = Seguimiento.objects.filter(proyecto__in=projects)
+        if options["date_from"]:
+            seguimientos = seguimientos.filter(fecha__gte=options["date_from"])
+        if options["date_to"]:
+            seguimientos = seguimientos.filter(fecha__lte=options["date_to"])
+        project_ids = sorted(set(seguimientos.values_list("proyecto_id", flat=True)))
+
+        if not project_ids:
+            self.stdout.write("No hay seguimientos que recalcular.")
+            return
+
+        task = partial(
+            _recalculate,
+            date_from=options["date_from"],
+            date_to=options["date_to"],
+            from_live=options["from_live"],
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+        )
+        workers = max(1, min(options["workers"], len(project_ids)))
+        started = time.perf_counter()
+        if workers == 1:
+            results = [task(project_id) for project_id in project_ids]
+        else:
+            # Cada proceso abre su propia conexión; se cierran las del padre antes de crear el pool
+            connections.close_all()
+            chunksize = max(1, math.ceil(len(project_ids) / (workers * 4)))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                results = list(pool.map(task, project_ids, chunksize=chunksize))
+        elapsed = time.perf_counter() - started
+
+        self._report(results, elapsed, workers, options["dry_run"])
+
+    def _report(self, results, elapsed, workers, dry_run):
+        from projects.services import SEGUIMIENTO_METRIC_FIELDS
+
+        rows = sum(r.rows for r in results)
+        changed = sum(r.changed for r in results)
+        skipped = sum(r.skipped for r in results)
+        throughput = rows / elapsed if elapsed else float(rows)
+
+        self.stdout.write(
+            f"Proyectos: {len(results)} | Seguimientos: {rows} | Con desvío: {changed} | "
+            f"Sin instantánea (omitidos): {skipped}"
+        )
+        self.stdout.write(f"Tiempo: {elapsed:.2f} s con {workers} proceso(s) ({throughput:.1f} seguimientos/s)")
+
+        if changed:
+            self.stdout.write("Desvío (anterior → nuevo):")
+            for name in SEGUIMIENTO_METRIC_FIELDS:
+                worst = max((r.drift[name][0] for r in results if r.drift), default=Decimal("0.00"))
+                total = sum((r.drift[name][1] for r in results if r.drift), Decimal("0.00"))
+                self.stdout.write(f"  {name.upper()}: máximo {worst} | acumulado {total}")
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING("Simulación: no se escribieron cambios."))
+        elif changed:
+            self.stdout.write(self.style.SUCCESS(f"{changed} seguimiento(s) actualizados."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Sin desvíos."))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from projects.models import Project
+from projects.portfolio import refresh_project_metrics
+
+
+class Command(BaseCommand):
+    help = "Recalcula por completo los indicadores materializados (ProjectMetrics) de los proyectos"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--project", type=int, action="append", help="Limitar a un proyecto (id); repetible")
+        parser.add_argument("--batch-size", type=int, default=500, help="Proyectos por consulta agregada")
+
+    def handle(self, *args, **options):
+        projects = Project.objects.order_by("pk")
+        if options["project"]:
+            projects = projects.filter(pk__in=options["project"])
+        project_ids = list(projects.values_list("pk", flat=True))
+        batch_size = max(1, options["batch_size"])
+
+        started = time.perf_counter()
+        refreshed = 0
+        for offset in range(0, len(project_ids), batch_size):
+            refreshed += refresh_project_metrics(project_ids[offset:offset + batch_size])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(f"Proyectos actualizados: {refreshed} en {elapsed:.2f} s")
+        self.stdout.write(self.style.SUCCESS("Indicadores actualizados."))
@@ -0,0 +1,93 @@
+import os
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+
+# Los modelos se importan dentro de las funciones: los procesos del pool
+# pueden arrancar con "spawn" y cargar este módulo antes de django.setup().
+
+
+def _init_process():
+    django.setup()
+    # Con "fork" el hijo hereda las conexiones del padre: no deben compartirse
+    connections.close_all()
+
+
+def _run_job(job_id):
+    from projects.jobs import run_report_job
+
+    return job_id, run_report_job(job_id)
+
+
+def _run_job_in_thread(job_id):
+    # Cada hilo abre su propia conexión; se cierra al terminar el trabajo
+    try:
+        return _run_job(job_id)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = "Ejecuta los trabajos de reportes en cola (informes, exportaciones, recálculos) usando la base de datos como cola"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=min(4, os.cpu_count() or 1),
+            help="Trabajos en paralelo (1 = en este proceso)",
+        )
+        parser.add_argument("--mode", choices=("thread", "process"), default="thread", help="Pool de hilos o de procesos")
+        parser.add_argument("--poll-interval", type=float, default=5.0, help="Segundos de espera con la cola vacía")
+        parser.add_argument("--once", action="store_true", help="Salir cuando la cola quede vacía")
+        parser.add_argument("--max-jobs", type=int, default=0, help="Salir tras ejecutar esta cantidad (0 = sin límite)")
+
+    def handle(self, *args, **options):
+        from projects.jobs import claim_report_jobs, recover_stale_report_jobs
+
+        workers = max(1, options["workers"])
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        pool = None
+        if workers > 1:
+            if options["mode"] == "process":
+                # Cada proceso abre su propia conexión; se cierran las del padre antes de crear el pool
+                connections.close_all()
+                pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_process)
+            else:
+                pool = ThreadPoolExecutor(max_workers=workers)
+
+        started = time.perf_counter()
+        processed = failed = 0
+        try:
+            while True:
+                recovered = recover_stale_report_jobs()
+                if recovered:
+                    self.stdout.write(self.style.WARNING(f"Trabajos recuperados de workers caídos: {recovered}"))
+                limit = workers
+                if options["max_jobs"]:
+                    limit = min(limit, options["max_jobs"] - processed)
+                job_ids = claim_report_jobs(worker_id, limit) if limit > 0 else []
+                if not job_ids:
+                    if options["once"] or (options["max_jobs"] and processed >= options["max_jobs"]):
+                        break
+                    time.sleep(options["poll_interval"])
+                    continue
+
+                if pool is None:
+                    results = [_run_job(job_id) for job_id in job_ids]
+                else:
+                    runner = _run_job if options["mode"] == "process" else _run_job_in_thread
+                    results = list(pool.map(runner, job_ids))
+                for job_id, state in results:
+                    processed += 1
+                    failed += state == "failed"
+                    self.stdout.write(f"Trabajo #{job_id}: {state}")
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(f"Trabajos ejecutados: {processed} (fallidos: {failed}) en {elapsed:.2f} s")
+        self.stdout.write(self.style.SUCCESS("Worker detenido."))
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from projects.outbox import OUTBOX_BATCH_SIZE, drain_outbox, requeue_dead_notifications
+
+
+class Command(BaseCommand):
+    help = "Envía por lotes el correo de las notificaciones pendientes (bandeja de salida) con una conexión por lote"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=OUTBOX_BATCH_SIZE, help="Notificaciones por lote")
+        parser.add_argument("--max-batches", type=int, default=0, help="Lotes por pasada (0 = hasta vaciar la cola)")
+        parser.add_argument("--loop", action="store_true", help="Seguir esperando notificaciones nuevas")
+        parser.add_argument("--poll-interval", type=float, default=10.0, help="Segundos de espera con la cola vacía")
+        parser.add_argument("--retry-dead", action="store_true", help="Reencolar antes las notificaciones descartadas")
+
+    def handle(self, *args, **options):
+        if options["retry_dead"]:
+            self.stdout.write(f"Notificaciones reencoladas: {requeue_dead_notifications()}")
+
+        batch_size = max(1, options["batch_size"])
+        totals = {"sent": 0, "skipped": 0, "retried": 0, "dead": 0}
+        batches = 0
+        started = time.perf_counter()
+        while True:
+            for result in drain_outbox(batch_size, options["max_batches"]):
+                batches += 1
+                for name in totals:
+                    totals[name] += getattr(result, name)
+                self.stdout.write(
+                    f"Lote {batches}: tomadas {result.claimed} | enviadas {result.sent} | "
+                    f"sin destinatario {result.skipped} | reintento {result.retried} | "
+                    f"descartadas {result.dead} | {result.elapsed:.2f} s"
+                )
+            if not options["loop"]:
+                break
+            time.sleep(options["poll_interval"])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"Lotes: {batches} | Enviadas: {totals['sent']} | Sin destinatario: {totals['skipped']} | "
+            f"Reintentos: {totals['retried']} | Descartadas: {totals['dead']} en {elapsed:.2f} s"
+        )
+        self.stdout.write(self.style.SUCCESS("Bandeja de salida procesada."))
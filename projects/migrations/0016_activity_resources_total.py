@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:24
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_resources_total(apps, schema_editor):
+    Activity = apps.get_model('projects', 'Activity')
+    Resource = apps.get_model('resources', 'Resource')
+    totals = (
+        Resource.objects.filter(activity=OuterRef('pk'))
+        .order_by()
+        .values('activity')
+        .annotate(total=Sum('total_cost'))
+        .values('total')
+    )
+    money = models.DecimalField(max_digits=12, decimal_places=2)
+    Activity.objects.update(
+        resources_total=Coalesce(Subquery(totals, output_field=money), Value(Decimal('0')), output_field=money)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0015_projectcut_model'),
+        ('resources', '0003_remove_resource_project_resource_activity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='resources_total',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=0, editable=False, max_digits=12, verbose_name='Total de Recursos'),
+        ),
+        migrations.RunPython(populate_resources_total, migrations.RunPython.noop),
+    ]
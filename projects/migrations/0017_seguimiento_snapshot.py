@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:35
+
+import django.db.models.deletion
+import projects.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0016_activity_resources_total'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeguimientoSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='Nombre')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('in_progress', 'En Progreso'), ('completed', 'Completada')], max_length=20, verbose_name='Estado')),
+                ('start_date', models.DateField(verbose_name='Fecha de Inicio Planificada')),
+                ('end_date', models.DateField(verbose_name='Fecha de Fin Planificada')),
+                ('actual_start_date', models.DateField(blank=True, null=True, verbose_name='Fecha de Inicio Real')),
+                ('actual_end_date', models.DateField(blank=True, null=True, verbose_name='Fecha de Fin Real')),
+                ('actual_cost', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Costo Real Registrado')),
+                ('planned_cost', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Costo Planificado')),
+                ('accrued_cost', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Costo Real')),
+                ('predecessor_name', models.CharField(blank=True, max_length=200, verbose_name='Actividad Predecesora')),
+                ('activity', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='snapshots', to='projects.activity', verbose_name='Actividad')),
+                ('seguimiento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='projects.seguimiento', verbose_name='Seguimiento')),
+            ],
+            options={
+                'verbose_name': 'Instantánea de Actividad',
+                'verbose_name_plural': 'Instantáneas de Actividades',
+                'ordering': ['start_date', 'name'],
+            },
+            bases=(projects.models.ActivityTrackingMixin, models.Model),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0017_seguimiento_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_activities', models.PositiveIntegerField(default=0, verbose_name='Actividades')),
+                ('completed_activities', models.PositiveIntegerField(default=0, verbose_name='Actividades completadas')),
+                ('progress', models.DecimalField(decimal_places=1, default=0, max_digits=5, verbose_name='Avance (%)')),
+                ('planned_cost', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Costo planificado')),
+                ('actual_cost', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Costo real')),
+                ('resource_cost', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Costo de recursos')),
+                ('budget_variance', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True, verbose_name='Desviación del presupuesto')),
+                ('budget_utilization', models.DecimalField(decimal_places=1, default=0, max_digits=7, verbose_name='Utilización del presupuesto (%)')),
+                ('latest_spi', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True, verbose_name='Último SPI')),
+                ('latest_cpi', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True, verbose_name='Último CPI')),
+                ('traffic_light', models.CharField(default='gray', max_length=10, verbose_name='Semáforo')),
+                ('open_risks', models.PositiveIntegerField(default=0, verbose_name='Riesgos abiertos')),
+                ('unread_notifications', models.PositiveIntegerField(default=0, verbose_name='Notificaciones sin leer')),
+                ('refreshed_at', models.DateTimeField(verbose_name='Actualizado en')),
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='metrics', to='projects.project', verbose_name='Proyecto')),
+            ],
+            options={
+                'verbose_name': 'Indicadores del Proyecto',
+                'verbose_name_plural': 'Indicadores de Proyectos',
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_versions(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    ProjectVersion = apps.get_model('projects', 'ProjectVersion')
+    ProjectVersion.objects.bulk_create(
+        [ProjectVersion(project_id=pk) for pk in Project.objects.values_list('pk', flat=True)],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0018_project_metrics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectVersion',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='data_version', serialize=False, to='projects.project', verbose_name='Proyecto')),
+                ('version', models.PositiveBigIntegerField(default=1, verbose_name='Versión')),
+            ],
+            options={
+                'verbose_name': 'Versión de datos del Proyecto',
+                'verbose_name_plural': 'Versiones de datos de Proyectos',
+            },
+        ),
+        migrations.RunPython(create_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:34
+
+import projects.versioning
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0019_project_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='projectversion',
+            name='version',
+            field=models.PositiveBigIntegerField(default=projects.versioning.initial_version, verbose_name='Versión'),
+        ),
+    ]
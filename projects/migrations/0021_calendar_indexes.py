@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:14
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0020_project_version_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectversion',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Última modificación'),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['project', 'start_date'], name='activity_project_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['project', 'end_date'], name='activity_project_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='milestone',
+            index=models.Index(fields=['project', 'due_date'], name='milestone_project_due_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0021_calendar_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('status_report', 'Informe de estado (XLSX)'), ('portfolio_export', 'Exportación de cartera'), ('recalculate_seguimientos', 'Recálculo de seguimientos')], max_length=40, verbose_name='Tipo')),
+                ('state', models.CharField(choices=[('queued', 'En cola'), ('running', 'En ejecución'), ('succeeded', 'Completado'), ('failed', 'Fallido')], default='queued', max_length=20, verbose_name='Estado')),
+                ('params', models.JSONField(blank=True, default=dict, verbose_name='Parámetros')),
+                ('progress', models.PositiveSmallIntegerField(default=0, verbose_name='Avance (%)')),
+                ('message', models.CharField(blank=True, max_length=255, verbose_name='Mensaje')),
+                ('result', models.FileField(blank=True, upload_to='report_jobs/%Y/%m/', verbose_name='Resultado')),
+                ('result_name', models.CharField(blank=True, max_length=255, verbose_name='Nombre del archivo')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')),
+                ('worker', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Creado en')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Iniciado en')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finalizado en')),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='report_jobs', to='projects.project', verbose_name='Proyecto')),
+                ('requested_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Solicitado por')),
+            ],
+            options={
+                'verbose_name': 'Trabajo de reporte',
+                'verbose_name_plural': 'Trabajos de reportes',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['state', 'created_at'], name='reportjob_state_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:28
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_existing_notifications(apps, schema_editor):
+    # Las notificaciones anteriores ya pasaron por el envío síncrono: las
+    # enviadas quedan como tales y las demás se descartan en vez de mandar
+    # alertas viejas (se pueden reencolar con send_notifications --retry-dead)
+    Notification = apps.get_model('projects', 'Notification')
+    Notification.objects.filter(sent=True).update(delivery_status='sent')
+    Notification.objects.filter(sent=False).update(
+        delivery_status='dead', last_error='Anterior a la bandeja de salida.'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0022_report_job'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='claim_token',
+            field=models.CharField(blank=True, editable=False, max_length=32, verbose_name='Lote'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='delivery_attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Intentos de envío'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='delivery_status',
+            field=models.CharField(choices=[('pending', 'Pendiente'), ('sent', 'Enviado'), ('skipped', 'Sin destinatario'), ('dead', 'Descartado')], default='pending', max_length=20, verbose_name='Estado del envío'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='last_error',
+            field=models.TextField(blank=True, verbose_name='Último error'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Próximo intento'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='sent_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Enviado en'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['delivery_status', 'next_attempt_at'], name='notification_outbox_idx'),
+        ),
+        migrations.RunPython(mark_existing_notifications, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:51
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def seed_heartbeats(apps, schema_editor):
+    # Los trabajos en ejecución se recuperan por su último latido
+    ReportJob = apps.get_model('projects', 'ReportJob')
+    ReportJob.objects.filter(state='running').update(heartbeat_at=F('started_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0023_notification_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Último latido'),
+        ),
+        migrations.RunPython(seed_heartbeats, migrations.RunPython.noop),
+    ]
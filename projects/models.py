@@ -1,7 +1,11 @@
 from django.db import models
+from django.utils.functional import cached_property
+from django.utils import timezone
 from django.contrib.auth.models import User
 from decimal import Decimal
 
+from .versioning import initial_version
+
 
 class UserProfile(models.Model):
     ROLE_CHOICES = [
@@ -34,18 +38,9 @@ class Seguimiento(models.Model):
     cpi = models.DecimalField(max_digits=5, decimal_places=2, editable=False, verbose_name='CPI (Cost Performance Index)', default=0)
     spi = models.DecimalField(max_digits=5, decimal_places=2, editable=False, verbose_name='SPI (Schedule Performance Index)', default=0)
 
-    def _activity_total_planned(self, activity):
-        """Costo planificado de una actividad (sin incluir recursos)."""
-        return activity.total_planned_cost
-
-    def _activity_total_actual(self, activity):
-        """Costo real de una actividad (sin incluir recursos)."""
-        return activity.total_actual_cost
-
     def calculate_metrics(self):
         """
         Calcula métricas EVM usando fechas reales de las actividades.
-        Los costos NO incluyen recursos (son desglose del costo de actividad).
 
         PV (Planned Value):   Suma del costo planificado de actividades cuyo
                               fin PLANIFICADO es ≤ fecha de corte.
@@ -57,55 +52,68 @@ class Seguimiento(models.Model):
         CV (Cost Variance):      EV - AC  (positivo = bajo presupuesto)
         CPI:  EV / AC
         SPI:  EV / PV
+
+        El costo planificado de cada actividad es la suma de sus recursos
+        (o ``cost`` si no tiene). Todo se resuelve en una sola consulta
+        agregada (ver projects.evm).
         """
-        from decimal import Decimal
-        
-        activities = self.proyecto.activity_set.all()
-        
-        # PV: costo planificado (actividad + recursos) de actividades cuyo fin PLANIFICADO es ≤ fecha de corte
-        pv_activities = activities.filter(end_date__lte=self.fecha)
-        self.pv = Decimal(str(sum(self._activity_total_planned(a) for a in pv_activities)))
-        
-        # EV: costo PLANIFICADO (actividad + recursos) de actividades COMPLETADAS
-        ev_activities = activities.filter(
-            status='completed',
-            actual_end_date__lte=self.fecha
-        )
-        ev_fallback = activities.filter(
-            status='completed',
-            actual_end_date__isnull=True,
-            end_date__lte=self.fecha
-        )
-        ev_set = ev_activities | ev_fallback
-        self.ev = Decimal(str(sum(self._activity_total_planned(a) for a in ev_set.distinct())))
-        
-        # AC: costo REAL (actividad + recursos) de actividades completadas
-        ac_total = Decimal('0')
-        for a in ev_set.distinct():
-            ac_total += self._activity_total_actual(a)
-        self.ac = ac_total
-        
-        # SV = EV - PV
-        self.sv = self.ev - self.pv
-        
-        # CV = EV - AC
-        self.cv = self.ev - self.ac
-        
-        # CPI
-        if self.ac > 0:
-            self.cpi = self.ev / self.ac
-        else:
-            self.cpi = Decimal('0')
-        
-        # SPI
-        if self.pv > 0:
-            self.spi = self.ev / self.pv
-        else:
-            self.spi = Decimal('0')
+        from .evm import compute_project_evm
+
+        self._apply_metrics(compute_project_evm(self.proyecto, self.fecha))
+
+    def calculate_metrics_from_snapshot(self):
+        """
+        Recalcula las métricas sobre las instantáneas congeladas del
+        seguimiento (no sobre el estado actual de las actividades).
+        """
+        from .evm import compute_snapshot_evm
+
+        self._apply_metrics(compute_snapshot_evm(self.snapshots.all(), self.fecha))
+
+    def _apply_metrics(self, metrics):
+        self.pv = metrics.pv
+        self.ev = metrics.ev
+        self.ac = metrics.ac
+        self.sv = metrics.sv
+        self.cv = metrics.cv
+        self.cpi = metrics.cpi
+        self.spi = metrics.spi
+
+    def take_snapshot(self):
+        """
+        Congela el estado de cada actividad del proyecto (costos, estado y
+        fechas) con un único bulk_create. Reemplaza la instantánea anterior.
+        """
+        snapshots = [
+            SeguimientoSnapshot(seguimiento=self, **values)
+            for values in SeguimientoSnapshot.capture(self.proyecto_id)
+        ]
+        self.snapshots.all().delete()
+        return SeguimientoSnapshot.objects.bulk_create(snapshots)
+
+    @property
+    def has_snapshot(self):
+        return self.pk is not None and self.snapshots.exists()
 
     def save(self, *args, **kwargs):
-        self.calculate_metrics()
-        super().save(*args, **kwargs)
+        """
+        Al crearse, calcula las métricas con el estado actual y congela una
+        instantánea por actividad. Al editarse, las métricas se recalculan
+        sobre esa instantánea: el historial no cambia aunque las
+        actividades sigan avanzando. Los seguimientos anteriores a las
+        instantáneas conservan los valores guardados.
+        """
+        from django.db import transaction
+
+        creating = self._state.adding
+        with transaction.atomic():
+            if creating:
+                self.calculate_metrics()
+            elif self.has_snapshot:
+                self.calculate_metrics_from_snapshot()
+            super().save(*args, **kwargs)
+            if creating:
+                self.take_snapshot()
 
     def __str__(self):
         return f"Seguimiento {self.proyecto.name} - {self.fecha}"
@@ -189,12 +197,27 @@ class Notification(models.Model):
         ('schedule', 'Cronograma'),
         ('general', 'General'),
     ]
+    DELIVERY_STATUS_CHOICES = [
+        ('pending', 'Pendiente'),
+        ('sent', 'Enviado'),
+        ('skipped', 'Sin destinatario'),
+        ('dead', 'Descartado'),
+    ]
     project = models.ForeignKey('Project', on_delete=models.CASCADE, verbose_name='Proyecto')
     recipient = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='project_notifications', verbose_name='Destinatario')
     alert_type = models.CharField(max_length=20, choices=ALERT_TYPES, verbose_name='Tipo de Alerta')
     message = models.TextField(verbose_name='Mensaje')
     sent = models.BooleanField(default=False, verbose_name='Enviado')
     read_at = models.DateTimeField(null=True, blank=True, verbose_name='Leído en')
+    # ── Bandeja de salida del correo (ver projects.outbox) ──
+    delivery_status = models.CharField(
+        max_length=20, choices=DELIVERY_STATUS_CHOICES, default='pending', verbose_name='Estado del envío'
+    )
+    delivery_attempts = models.PositiveSmallIntegerField(default=0, verbose_name='Intentos de envío')
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name='Próximo intento')
+    claim_token = models.CharField(max_length=32, blank=True, editable=False, verbose_name='Lote')
+    last_error = models.TextField(blank=True, verbose_name='Último error')
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name='Enviado en')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -204,6 +227,9 @@ class Notification(models.Model):
     class Meta:
         verbose_name = 'Notificación'
         verbose_name_plural = 'Notificaciones'
+        indexes = [
+            models.Index(fields=['delivery_status', 'next_attempt_at'], name='notification_outbox_idx'),
+        ]
 
 class ChangeRequest(models.Model):
     STATUS_CHOICES = [
@@ -308,14 +334,9 @@ class Project(models.Model):
 
     @property
     def total_resources_cost(self):
-        """Suma de costos de todos los recursos del proyecto"""
-        from django.db.models import Sum, F, DecimalField
-        from resources.models import Resource
-        result = Resource.objects.filter(
-            activity__project=self
-        ).aggregate(
-            total=Sum(F('quantity') * F('cost_per_unit'), output_field=DecimalField())
-        )
+        """Suma de costos de todos los recursos del proyecto (vía Activity.resources_total)."""
+        from django.db.models import Sum
+        result = self.activity_set.aggregate(total=Sum('resources_total'))
         return result['total'] or 0
 
     @property
@@ -414,8 +435,159 @@ class Milestone(models.Model):
     class Meta:
         verbose_name = 'Hito'
         verbose_name_plural = 'Hitos'
+        indexes = [
+            models.Index(fields=['project', 'due_date'], name='milestone_project_due_idx'),
+        ]
+
+class ActivityTrackingMixin:
+    """
+    Escenario y varianzas de seguimiento de una actividad.
+
+    Lo comparten Activity (estado vivo, evaluado contra hoy) y
+    SeguimientoSnapshot (estado congelado, evaluado contra la fecha del
+    seguimiento). Requiere start_date, end_date, actual_start_date,
+    actual_end_date, status, total_planned_cost y total_actual_cost.
+    """
+
+    @property
+    def tracking_reference_date(self):
+        """Fecha contra la que se evalúan las actividades en curso."""
+        from datetime import date
+        return date.today()
+
+    # ── Escenario de seguimiento ─────────────────────────────────────────
+
+    @property
+    def tracking_scenario(self):
+        """
+        Clasifica el escenario de seguimiento segun fechas planificadas vs reales.
+        Retorna un dict: {'code': str, 'label': str, 'color': str, 'detail': str}
+        """
+        p_start = self.start_date
+        p_end = self.end_date
+        a_start = self.actual_start_date
+        a_end = self.actual_end_date
+
+        if not a_start and not a_end:
+            return {'code': 'sin_datos', 'label': 'Sin seguimiento', 'color': 'secondary', 'detail': 'Aun no se registraron datos reales.'}
+
+        # Comparar inicios
+        if a_start and p_start:
+            if a_start < p_start:
+                start_status = 'temprano'
+            elif a_start > p_start:
+                start_status = 'tardio'
+            else:
+                start_status = 'a_tiempo'
+        else:
+            start_status = 'desconocido'
+
+        # Comparar fines
+        if a_end and p_end:
+            if a_end < p_end:
+                end_status = 'temprano'
+            elif a_end > p_end:
+                end_status = 'tardio'
+            else:
+                end_status = 'a_tiempo'
+        elif a_end is None and self.status == 'completed':
+            end_status = 'sin_fecha_real'
+        else:
+            end_status = 'pendiente'
+
+        # Determinar escenario
+        if end_status == 'tardio':
+            if start_status == 'tardio':
+                return {'code': 'atrasado_inicio_fin', 'label': 'Atrasado', 'color': 'danger',
+                        'detail': f'Inicio tardio ({(a_start - p_start).days} dia(s)) y finalizacion tardia ({(a_end - p_end).days} dia(s)).'}
+            elif start_status == 'a_tiempo':
+                return {'code': 'atrasado_fin', 'label': 'Atrasado', 'color': 'danger',
+                        'detail': f'Inicio a tiempo pero finalizacion tardia ({(a_end - p_end).days} dia(s) de atraso).'}
+            else:
+                return {'code': 'atrasado_fin', 'label': 'Atrasado', 'color': 'danger',
+                        'detail': f'Finalizacion tardia ({(a_end - p_end).days} dia(s) de atraso).'}
+
+        if end_status == 'temprano':
+            if start_status == 'temprano':
+                return {'code': 'adelantado_inicio_fin', 'label': 'Adelantado', 'color': 'success',
+                        'detail': f'Inicio temprano ({(p_start - a_start).days} dia(s)) y finalizacion anticipada ({(p_end - a_end).days} dia(s)).'}
+            elif start_status == 'a_tiempo':
+                return {'code': 'adelantado_fin', 'label': 'Adelantado', 'color': 'success',
+                        'detail': f'Inicio a tiempo y finalizacion anticipada ({(p_end - a_end).days} dia(s)).'}
+            else:
+                return {'code': 'adelantado_fin', 'label': 'Adelantado', 'color': 'success',
+                        'detail': f'Finalizacion anticipada ({(p_end - a_end).days} dia(s)).'}
 
-class Activity(models.Model):
+        if end_status == 'a_tiempo':
+            if start_status == 'tardio':
+                return {'code': 'recuperado', 'label': 'Recuperado', 'color': 'warning',
+                        'detail': f'Inicio tardio pero recuperado: finalizo a tiempo.'}
+            elif start_status == 'temprano':
+                return {'code': 'ventaja_perdida', 'label': 'Sin cambio neto', 'color': 'info',
+                        'detail': f'Inicio temprano pero finalizo en fecha planificada.'}
+            else:
+                return {'code': 'en_linea', 'label': 'En linea', 'color': 'success',
+                        'detail': 'Cumplido exactamente en fecha planificada.'}
+
+        # Para actividades en progreso sin fecha real de fin
+        if self.status == 'in_progress':
+            today = self.tracking_reference_date
+            if today > p_end:
+                return {'code': 'en_curso_atrasado', 'label': 'En curso (atrasado)', 'color': 'warning',
+                        'detail': f'Actividad en progreso y ya pasó su fecha planificada de fin ({(today - p_end).days} dia(s) de atraso).'}
+            return {'code': 'en_curso', 'label': 'En curso', 'color': 'info',
+                    'detail': 'Actividad en progreso dentro del plazo planificado.'}
+
+        return {'code': 'pendiente', 'label': 'Pendiente', 'color': 'secondary', 'detail': 'Actividad pendiente de ejecucion.'}
+
+    # ── Propiedades de varianza ──────────────────────────────────────────
+
+    @property
+    def schedule_variance_days(self):
+        """
+        Días de diferencia entre lo planificado y lo real.
+        Negativo = atrasado, Positivo = adelantado.
+        Usa actual_end_date si está completa; si no, compara con hoy.
+        """
+        planned_end = self.end_date
+        if not planned_end:
+            return None
+        actual_end = self.actual_end_date
+        if not actual_end and self.status == 'completed':
+            actual_end = self.end_date  # si se completó pero sin fecha real, asumimos planificada
+        if not actual_end:
+            actual_end = self.tracking_reference_date  # en progreso: contra hoy (o la fecha del corte)
+        return (planned_end - actual_end).days
+
+    @property
+    def cost_variance(self):
+        """
+        Diferencia entre costo planificado y real de la actividad.
+        Positivo = gasté menos de lo planificado (bajo presupuesto).
+        Negativo = gasté más de lo planificado (sobrepresupuesto).
+        """
+        planned = self.total_planned_cost
+        actual = self.total_actual_cost
+        if planned is None:
+            return None
+        return planned - actual
+
+    @property
+    def is_behind_schedule(self):
+        sv = self.schedule_variance_days
+        if sv is None:
+            return False
+        return sv < 0
+
+    @property
+    def is_over_budget(self):
+        cv = self.cost_variance
+        if cv is None:
+            return False
+        return cv < 0
+
+
+class Activity(ActivityTrackingMixin, models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pendiente'),
         ('in_progress', 'En Progreso'),
@@ -435,6 +607,9 @@ class Activity(models.Model):
     # ── Costos ──
     cost = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name='Costo Planificado')
     actual_cost = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name='Costo Real')
+    # Suma desnormalizada de Resource.total_cost; la mantienen Resource.save/delete
+    # y ResourceQuerySet (ver check_resource_totals para detectar desvíos)
+    resources_total = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False, db_index=True, verbose_name='Total de Recursos')
     time_estimate = models.PositiveIntegerField(help_text="Horas estimadas", null=True, blank=True, verbose_name='Estimación de Tiempo')
     predecessor = models.ForeignKey(
         'self',
@@ -516,6 +691,13 @@ class Activity(models.Model):
     def save(self, *args, **kwargs):
         # Ejecutar validaciones antes de guardar
         self.full_clean()
+        # resources_total solo lo escriben refresh_activity_totals y
+        # update_cost_from_resources: una instancia vieja no debe pisarlo
+        if not self._state.adding and not kwargs.get('force_insert'):
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                update_fields = [f.name for f in self._meta.concrete_fields if not f.primary_key]
+            kwargs['update_fields'] = [name for name in update_fields if name != 'resources_total']
         super().save(*args, **kwargs)
         
         # Notificaciones de costo elevado
@@ -538,136 +720,30 @@ class Activity(models.Model):
                 message=f'Desviación en cronograma: {self.name} - Fecha límite {self.end_date}'
             )
 
-    # ── Escenario de seguimiento ─────────────────────────────────────────
-
-    @property
-    def tracking_scenario(self):
-        """
-        Clasifica el escenario de seguimiento segun fechas planificadas vs reales.
-        Retorna un dict: {'code': str, 'label': str, 'color': str, 'detail': str}
-        """
-        from datetime import date as dt_date
-        p_start = self.start_date
-        p_end = self.end_date
-        a_start = self.actual_start_date
-        a_end = self.actual_end_date
-
-        if not a_start and not a_end:
-            return {'code': 'sin_datos', 'label': 'Sin seguimiento', 'color': 'secondary', 'detail': 'Aun no se registraron datos reales.'}
-
-        # Comparar inicios
-        if a_start and p_start:
-            if a_start < p_start:
-                start_status = 'temprano'
-            elif a_start > p_start:
-                start_status = 'tardio'
-            else:
-                start_status = 'a_tiempo'
-        else:
-            start_status = 'desconocido'
-
-        # Comparar fines
-        if a_end and p_end:
-            if a_end < p_end:
-                end_status = 'temprano'
-            elif a_end > p_end:
-                end_status = 'tardio'
-            else:
-                end_status = 'a_tiempo'
-        elif a_end is None and self.status == 'completed':
-            end_status = 'sin_fecha_real'
-        else:
-            end_status = 'pendiente'
-
-        # Determinar escenario
-        if end_status == 'tardio':
-            if start_status == 'tardio':
-                return {'code': 'atrasado_inicio_fin', 'label': 'Atrasado', 'color': 'danger',
-                        'detail': f'Inicio tardio ({(a_start - p_start).days} dia(s)) y finalizacion tardia ({(a_end - p_end).days} dia(s)).'}
-            elif start_status == 'a_tiempo':
-                return {'code': 'atrasado_fin', 'label': 'Atrasado', 'color': 'danger',
-                        'detail': f'Inicio a tiempo pero finalizacion tardia ({(a_end - p_end).days} dia(s) de atraso).'}
-            else:
-                return {'code': 'atrasado_fin', 'label': 'Atrasado', 'color': 'danger',
-                        'detail': f'Finalizacion tardia ({(a_end - p_end).days} dia(s) de atraso).'}
-
-        if end_status == 'temprano':
-            if start_status == 'temprano':
-                return {'code': 'adelantado_inicio_fin', 'label': 'Adelantado', 'color': 'success',
-                        'detail': f'Inicio temprano ({(p_start - a_start).days} dia(s)) y finalizacion anticipada ({(p_end - a_end).days} dia(s)).'}
-            elif start_status == 'a_tiempo':
-                return {'code': 'adelantado_fin', 'label': 'Adelantado', 'color': 'success',
-                        'detail': f'Inicio a tiempo y finalizacion anticipada ({(p_end - a_end).days} dia(s)).'}
-            else:
-                return {'code': 'adelantado_fin', 'label': 'Adelantado', 'color': 'success',
-                        'detail': f'Finalizacion anticipada ({(p_end - a_end).days} dia(s)).'}
-
-        if end_status == 'a_tiempo':
-            if start_status == 'tardio':
-                return {'code': 'recuperado', 'label': 'Recuperado', 'color': 'warning',
-                        'detail': f'Inicio tardio pero recuperado: finalizo a tiempo.'}
-            elif start_status == 'temprano':
-                return {'code': 'ventaja_perdida', 'label': 'Sin cambio neto', 'color': 'info',
-                        'detail': f'Inicio temprano pero finalizo en fecha planificada.'}
-            else:
-                return {'code': 'en_linea', 'label': 'En linea', 'color': 'success',
-                        'detail': 'Cumplido exactamente en fecha planificada.'}
-
-        # Para actividades en progreso sin fecha real de fin
-        if self.status == 'in_progress':
-            today = dt_date.today()
-            if today > p_end:
-                return {'code': 'en_curso_atrasado', 'label': 'En curso (atrasado)', 'color': 'warning',
-                        'detail': f'Actividad en progreso y ya pasó su fecha planificada de fin ({(today - p_end).days} dia(s) de atraso).'}
-            return {'code': 'en_curso', 'label': 'En curso', 'color': 'info',
-                    'detail': 'Actividad en progreso dentro del plazo planificado.'}
-
-        return {'code': 'pendiente', 'label': 'Pendiente', 'color': 'secondary', 'detail': 'Actividad pendiente de ejecucion.'}
-
-    # ── Propiedades de varianza ──────────────────────────────────────────
-
-    @property
-    def schedule_variance_days(self):
-        """
-        Días de diferencia entre lo planificado y lo real.
-        Negativo = atrasado, Positivo = adelantado.
-        Usa actual_end_date si está completa; si no, compara con hoy.
-        """
-        planned_end = self.end_date
-        if not planned_end:
-            return None
-        actual_end = self.actual_end_date
-        if not actual_end and self.status == 'completed':
-            actual_end = self.end_date  # si se completó pero sin fecha real, asumimos planificada
-        if not actual_end:
-            from datetime import date
-            actual_end = date.today()  # en progreso: contra hoy
-        return (planned_end - actual_end).days
-
     # ── Costos totales incluyendo recursos ────────────────────────────
 
     @property
     def total_planned_cost(self):
         """Costo planificado = suma de recursos de la actividad (quantity * cost_per_unit).
-        Si no tiene recursos, usa self.cost como fallback para datos existentes."""
-        from resources.models import Resource
-        res = Resource.objects.filter(activity=self).aggregate(
-            total=models.Sum('total_cost')
-        )['total'] or 0
-        if res:
-            return res
+        Si no tiene recursos, usa self.cost como fallback para datos existentes.
+        Lee la columna desnormalizada resources_total (sin consultas)."""
+        if self.resources_total:
+            return self.resources_total
         return self.cost or 0  # fallback: actividades sin recursos
 
     def update_cost_from_resources(self):
-        """Sincroniza self.cost con la suma de recursos."""
+        """Recalcula resources_total y sincroniza self.cost con la suma de recursos."""
         from resources.models import Resource
         total = Resource.objects.filter(activity=self).aggregate(
             total=models.Sum('total_cost')
         )['total'] or 0
+        self.resources_total = total
+        fields = {'resources_total': total}
         if total:
-            # Evitar recursión: guardar sin full_clean(), solo el campo cost
-            Activity.objects.filter(pk=self.pk).update(cost=total)
+            fields['cost'] = total
             self.cost = total
+        # Evitar recursión: guardar sin full_clean(), solo los campos de costo
+        Activity.objects.filter(pk=self.pk).update(**fields)
         return self.cost or 0
 
     @property
@@ -678,41 +754,86 @@ class Activity(models.Model):
             return self.actual_cost
         return self.cost or 0
 
-    @property
-    def cost_variance(self):
+    def __str__(self):
+        return f"{self.name} - {self.project.name}"
+
+    class Meta:
+        verbose_name = 'Actividad'
+        verbose_name_plural = 'Actividades'
+        # Filtros por rango de fechas (feed del calendario, reportes por período)
+        indexes = [
+            models.Index(fields=['project', 'start_date'], name='activity_project_start_idx'),
+            models.Index(fields=['project', 'end_date'], name='activity_project_end_idx'),
+        ]
+
+
+class SeguimientoSnapshot(ActivityTrackingMixin, models.Model):
+    """
+    Estado congelado de una actividad en el momento de un Seguimiento.
+    Las vistas históricas (drill-down, comparación entre seguimientos y la
+    línea base de un seguimiento pasado) leen esta tabla en lugar de las
+    actividades vivas.
+    """
+    seguimiento = models.ForeignKey(Seguimiento, on_delete=models.CASCADE, related_name='snapshots', verbose_name='Seguimiento')
+    activity = models.ForeignKey(Activity, on_delete=models.SET_NULL, null=True, blank=True, related_name='snapshots', verbose_name='Actividad')
+    name = models.CharField(max_length=200, verbose_name='Nombre')
+    status = models.CharField(max_length=20, choices=Activity.STATUS_CHOICES, verbose_name='Estado')
+    start_date = models.DateField(verbose_name='Fecha de Inicio Planificada')
+    end_date = models.DateField(verbose_name='Fecha de Fin Planificada')
+    actual_start_date = models.DateField(null=True, blank=True, verbose_name='Fecha de Inicio Real')
+    actual_end_date = models.DateField(null=True, blank=True, verbose_name='Fecha de Fin Real')
+    actual_cost = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name='Costo Real Registrado')
+    # Valores efectivos que usa el EVM (Activity.total_planned_cost / total_actual_cost)
+    planned_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='Costo Planificado')
+    accrued_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='Costo Real')
+    predecessor_name = models.CharField(max_length=200, blank=True, verbose_name='Actividad Predecesora')
+
+    @classmethod
+    def capture(cls, project_id, activity_id=None):
         """
-        Diferencia entre costo planificado y real de la actividad.
-        Positivo = gasté menos de lo planificado (bajo presupuesto).
-        Negativo = gasté más de lo planificado (sobrepresupuesto).
+        Estado actual de las actividades de un proyecto (o solo de
+        ``activity_id``) como valores de instantánea (una consulta). Cada
+        dict sirve de kwargs para crear un SeguimientoSnapshot.
         """
-        planned = self.total_planned_cost
-        actual = self.total_actual_cost
-        if planned is None:
-            return None
-        return planned - actual
+        from django.db.models import F, Value
+        from django.db.models.functions import Coalesce
+        from .evm import actual_cost_expression, planned_cost_expression
+
+        activities = Activity.objects.filter(project_id=project_id)
+        if activity_id is not None:
+            activities = activities.filter(pk=activity_id)
+        return list(
+            activities
+            .order_by()
+            .values(
+                'name', 'status', 'start_date', 'end_date', 'actual_start_date', 'actual_end_date', 'actual_cost',
+                activity_id=F('pk'),
+                planned_cost=planned_cost_expression(),
+                accrued_cost=actual_cost_expression(),
+                predecessor_name=Coalesce(F('predecessor__name'), Value('')),
+            )
+        )
 
     @property
-    def is_behind_schedule(self):
-        sv = self.schedule_variance_days
-        if sv is None:
-            return False
-        return sv < 0
+    def tracking_reference_date(self):
+        # Las actividades en curso se evalúan contra la fecha del seguimiento
+        return self.seguimiento.fecha
 
     @property
-    def is_over_budget(self):
-        cv = self.cost_variance
-        if cv is None:
-            return False
-        return cv < 0
+    def total_planned_cost(self):
+        return self.planned_cost
 
-    # ── Fin propiedades de varianza ──────────────────────────────────────
+    @property
+    def total_actual_cost(self):
+        return self.accrued_cost
 
     def __str__(self):
-        return f"{self.name} - {self.project.name}"
+        return f"{self.name} @ {self.seguimiento_id}"
 
     class Meta:
-        verbose_name = 'Actividad'
-        verbose_name_plural = 'Actividades'
+        verbose_name = 'Instantánea de Actividad'
+        verbose_name_plural = 'Instantáneas de Actividades'
+        ordering = ['start_date', 'name']
 
 
 class ActivityAssignment(models.Model):
@@ -785,31 +906,45 @@ class ProjectCut(models.Model):
         del rango del corte. Esto define qué actividades "pertenecen" a
         este período según la planificación.
         """
-        return self.project.activity_set.filter(
+        return Activity.objects.filter(
+            project_id=self.project_id,
             end_date__gte=self.start_date,
             end_date__lte=self.end_date,
         )
 
+    # ── Capa de métricas memoizada ───────────────────────────────────────
+
+    @cached_property
+    def metrics(self):
+        """
+        Métricas del período (CutMetrics) calculadas UNA vez por instancia
+        con una sola consulta. Todas las propiedades derivadas (pv, ev, spi,
+        status...) la comparten. compute_cut_metrics() puede precargarla
+        para todos los cortes de un proyecto asignando ``cut.metrics``.
+        """
+        from .evm import CutMetrics
+        return CutMetrics.from_activities(self.activities_in_period)
+
+    def invalidate_metrics(self):
+        """Descarta las métricas memoizadas (p. ej. tras editar las fechas del corte)."""
+        self.__dict__.pop('metrics', None)
+
     # ── Métricas planificadas ────────────────────────────────────────────
 
     @property
     def planned_count(self) -> int:
         """Cantidad de actividades planificadas en este período."""
-        return self.activities_in_period.count()
+        return self.metrics.planned_count
 
     @property
     def planned_cost(self):
-        """Suma del costo planificado de las actividades del período (sin recursos)."""
-        from decimal import Decimal
-        total = Decimal('0')
-        for act in self.activities_in_period:
-            total += act.total_planned_cost
-        return total
+        """Suma del costo planificado de las actividades del período."""
+        return self.metrics.pv
 
     @property
     def pv(self):
         """PV (Planned Value) = planned_cost (alias semántico EVM)."""
-        return self.planned_cost
+        return self.metrics.pv
 
     # ── Métricas reales ──────────────────────────────────────────────────
 
@@ -821,7 +956,7 @@ class ProjectCut(models.Model):
     @property
     def completed_count(self) -> int:
         """Cuántas actividades del período se completaron realmente."""
-        return self.completed_activities.count()
+        return self.metrics.completed_count
 
     @property
     def ev(self):
@@ -829,11 +964,7 @@ class ProjectCut(models.Model):
         EV (Earned Value) = suma del costo PLANIFICADO
         de las actividades del período que YA fueron completadas.
         """
-        from decimal import Decimal
-        total = Decimal('0')
-        for act in self.completed_activities:
-            total += act.total_planned_cost
-        return total
+        return self.metrics.ev
 
     @property
     def ac(self):
@@ -841,11 +972,7 @@ class ProjectCut(models.Model):
         AC (Actual Cost) = suma del costo REAL
         de las actividades del período que fueron completadas.
         """
-        from decimal import Decimal
-        total = Decimal('0')
-        for act in self.completed_activities:
-            total += act.total_actual_cost
-        return total
+        return self.metrics.ac
 
     # ── Variaciones ──────────────────────────────────────────────────────
 
@@ -856,7 +983,7 @@ class ProjectCut(models.Model):
         Positivo = adelantado (hicimos más de lo planificado).
         Negativo = atrasado (hicimos menos de lo planificado).
         """
-        return self.ev - self.pv
+        return self.metrics.sv
 
     @property
     def cv(self):
@@ -865,23 +992,17 @@ class ProjectCut(models.Model):
         Positivo = gastamos menos de lo presupuestado.
         Negativo = gastamos más de lo presupuestado.
         """
-        return self.ev - self.ac
+        return self.metrics.cv
 
     @property
     def spi(self):
         """SPI (Schedule Performance Index). >= 1.0 = buen ritmo."""
-        from decimal import Decimal
-        if self.pv > 0:
-            return self.ev / self.pv
-        return Decimal('0')
+        return self.metrics.spi
 
     @property
     def cpi(self):
         """CPI (Cost Performance Index). >= 1.0 = eficiente en costos."""
-        from decimal import Decimal
-        if self.ac > 0:
-            return self.ev / self.ac
-        return Decimal('0')
+        return self.metrics.cpi
 
     # ── Indicadores de estado ────────────────────────────────────────────
 
@@ -891,24 +1012,17 @@ class ProjectCut(models.Model):
         Diferencia en cantidad de actividades:
         Negativo = completamos menos de lo planificado (atrasado).
         """
-        return self.completed_count - self.planned_count
+        return self.metrics.schedule_variance_count
 
     @property
     def progress_percentage(self) -> float:
         """Porcentaje de avance: completadas / planificadas."""
-        if self.planned_count == 0:
-            return 0.0
-        return round((self.completed_count / self.planned_count) * 100, 1)
+        return self.metrics.progress_percentage
 
     @property
     def has_any_tracking(self) -> bool:
         """True si al menos una actividad del período tiene datos reales cargados."""
-        from django.db.models import Q
-        return self.activities_in_period.filter(
-            Q(actual_start_date__isnull=False) |
-            Q(actual_end_date__isnull=False) |
-            Q(actual_cost__isnull=False)
-        ).exists()
+        return self.metrics.has_any_tracking
 
     @property
     def status(self):
@@ -919,29 +1033,121 @@ class ProjectCut(models.Model):
         - Rojo:      cualquier otro caso con datos (crítico, desviaciones graves)
         - Sin info:  no hay NINGUNA actividad con datos reales cargados
         """
-        if self.planned_count == 0:
-            return 'no_data'
+        return self.metrics.status
 
-        # Si ninguna actividad del período tiene datos reales → sin información
-        if not self.has_any_tracking:
-            return 'no_data'
+    @property
+    def status_label(self):
+        return self.metrics.status_label
 
-        spi_val = float(self.spi)
-        cpi_val = float(self.cpi)
 
-        if spi_val >= 0.95 and cpi_val >= 0.95:
-            return 'green'
-        elif spi_val >= 0.85 and cpi_val >= 0.85:
-            return 'yellow'
-        else:
-            return 'red'
+class ProjectMetrics(models.Model):
+    """
+    Modelo de lectura con los indicadores del proyecto ya calculados (una
+    fila por proyecto). Lo mantienen las señales de Activity, Resource,
+    Seguimiento, Risk y Notification (ver projects.portfolio) y el comando
+    refresh_project_metrics; tableros y listados lo leen sin recalcular.
+    """
+    project = models.OneToOneField(
+        Project, on_delete=models.CASCADE, related_name='metrics', verbose_name='Proyecto'
+    )
+    total_activities = models.PositiveIntegerField(default=0, verbose_name='Actividades')
+    completed_activities = models.PositiveIntegerField(default=0, verbose_name='Actividades completadas')
+    progress = models.DecimalField(max_digits=5, decimal_places=1, default=0, verbose_name='Avance (%)')
+    planned_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='Costo planificado')
+    actual_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='Costo real')
+    resource_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='Costo de recursos')
+    budget_variance = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, blank=True, verbose_name='Desviación del presupuesto'
+    )
+    budget_utilization = models.DecimalField(
+        max_digits=7, decimal_places=1, default=0, verbose_name='Utilización del presupuesto (%)'
+    )
+    latest_spi = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, verbose_name='Último SPI')
+    latest_cpi = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, verbose_name='Último CPI')
+    traffic_light = models.CharField(max_length=10, default='gray', verbose_name='Semáforo')
+    open_risks = models.PositiveIntegerField(default=0, verbose_name='Riesgos abiertos')
+    unread_notifications = models.PositiveIntegerField(default=0, verbose_name='Notificaciones sin leer')
+    refreshed_at = models.DateTimeField(verbose_name='Actualizado en')
+
+    class Meta:
+        verbose_name = 'Indicadores del Proyecto'
+        verbose_name_plural = 'Indicadores de Proyectos'
+
+    def __str__(self):
+        return f"Indicadores de {self.project.name}"
+
+
+class ProjectVersion(models.Model):
+    """
+    Contador monotónico de cambios de datos del proyecto. Las señales lo
+    incrementan ante cualquier escritura que afecte al proyecto; las vistas
+    lo usan como parte de la clave de caché (ver projects.versioning).
+    Va en su propia tabla para que guardar un Project cargado antes de un
+    incremento nunca lo haga retroceder.
+    """
+    project = models.OneToOneField(
+        Project, on_delete=models.CASCADE, primary_key=True, related_name='data_version',
+        verbose_name='Proyecto'
+    )
+    version = models.PositiveBigIntegerField(default=initial_version, verbose_name='Versión')
+    updated_at = models.DateTimeField(default=timezone.now, verbose_name='Última modificación')
+
+    class Meta:
+        verbose_name = 'Versión de datos del Proyecto'
+        verbose_name_plural = 'Versiones de datos de Proyectos'
+
+    def __str__(self):
+        return f"{self.project_id} v{self.version}"
+
+
+class ReportJob(models.Model):
+    """
+    Reporte pesado que se genera fuera de la petición. La vista lo encola,
+    el comando run_report_worker lo toma (bloqueando la fila) y lo ejecuta
+    en un pool de hilos o procesos; el usuario consulta el avance y descarga
+    el archivo resultante. Ver projects.jobs.
+    """
+    KIND_CHOICES = [
+        ('status_report', 'Informe de estado (XLSX)'),
+        ('portfolio_export', 'Exportación de cartera'),
+        ('recalculate_seguimientos', 'Recálculo de seguimientos'),
+    ]
+    STATE_CHOICES = [
+        ('queued', 'En cola'),
+        ('running', 'En ejecución'),
+        ('succeeded', 'Completado'),
+        ('failed', 'Fallido'),
+    ]
+    kind = models.CharField(max_length=40, choices=KIND_CHOICES, verbose_name='Tipo')
+    state = models.CharField(max_length=20, choices=STATE_CHOICES, default='queued', verbose_name='Estado')
+    params = models.JSONField(default=dict, blank=True, verbose_name='Parámetros')
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, null=True, blank=True, related_name='report_jobs', verbose_name='Proyecto'
+    )
+    requested_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='report_jobs', verbose_name='Solicitado por')
+    progress = models.PositiveSmallIntegerField(default=0, verbose_name='Avance (%)')
+    message = models.CharField(max_length=255, blank=True, verbose_name='Mensaje')
+    result = models.FileField(upload_to='report_jobs/%Y/%m/', blank=True, verbose_name='Resultado')
+    result_name = models.CharField(max_length=255, blank=True, verbose_name='Nombre del archivo')
+    error = models.TextField(blank=True, verbose_name='Error')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')
+    worker = models.CharField(max_length=100, blank=True, verbose_name='Worker')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Creado en')
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='Iniciado en')
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name='Último latido')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Finalizado en')
+
+    class Meta:
+        verbose_name = 'Trabajo de reporte'
+        verbose_name_plural = 'Trabajos de reportes'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['state', 'created_at'], name='reportjob_state_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.get_state_display()})"
 
     @property
-    def status_label(self):
-        labels = {
-            'green': 'En línea',
-            'yellow': 'En alerta',
-            'red': 'Crítico',
-            'no_data': 'Sin información',
-        }
-        return labels.get(self.status, 'Desconocido')
+    def is_finished(self):
+        return self.state in ('succeeded', 'failed')
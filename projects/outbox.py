@@ -0,0 +1,203 @@
+"""
+Bandeja de salida del correo de notificaciones.
+
+Crear una Notification ya la deja en cola (delivery_status="pending"):
+ninguna petición ni señal abre una conexión SMTP. El comando
+send_notifications vacía la cola por lotes: toma las pendientes cuyo
+próximo intento ya venció, abre UNA conexión con ``get_connection`` y
+envía los mensajes por ella con ``send_messages``.
+
+Los fallos se reintentan con espera exponencial (base * 2^(intentos-1),
+con tope) y, agotados los intentos, la notificación pasa a "dead" (cola de
+descarte) con el último error. Las que no tienen correo de destino quedan
+como "skipped". Tomar un lote marca las filas con un token y corre su
+próximo intento (arrendamiento): dos workers no envían la misma fila y, si
+un worker muere a mitad del lote, las filas vuelven a estar disponibles al
+vencer el arrendamiento.
+"""
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_BACKOFF_SECONDS = 60
+OUTBOX_BACKOFF_MAX_SECONDS = 6 * 3600
+OUTBOX_LEASE_SECONDS = 10 * 60
+
+
+@dataclass
+class OutboxBatchResult:
+    """Métricas de un lote."""
+
+    claimed: int = 0
+    sent: int = 0
+    skipped: int = 0
+    retried: int = 0
+    dead: int = 0
+    elapsed: float = 0.0
+
+
+def _setting(name, default):
+    return getattr(settings, f"NOTIFICATION_OUTBOX_{name}", default)
+
+
+def backoff_seconds(attempts: int) -> int:
+    """Espera antes del siguiente intento tras ``attempts`` fallos."""
+    base = _setting("BACKOFF_SECONDS", OUTBOX_BACKOFF_SECONDS)
+    return min(base * 2 ** max(attempts - 1, 0), _setting("BACKOFF_MAX_SECONDS", OUTBOX_BACKOFF_MAX_SECONDS))
+
+
+def notification_subject(notification) -> str:
+    return f"Alerta de Proyecto: {notification.get_alert_type_display()}"
+
+
+def notification_recipient_email(notification) -> str:
+    recipient = notification.recipient or notification.project.created_by
+    return recipient.email if recipient else ""
+
+
+def build_notification_message(notification, connection=None) -> EmailMessage:
+    return EmailMessage(
+        notification_subject(notification),
+        notification.message,
+        settings.DEFAULT_FROM_EMAIL,
+        [notification_recipient_email(notification)],
+        connection=connection,
+    )
+
+
+def claim_outbox_batch(limit: int, now=None) -> list:
+    """Toma hasta ``limit`` notificaciones vencidas y las arrienda a este lote."""
+    from .models import Notification
+
+    now = now or timezone.now()
+    token = uuid.uuid4().hex
+    with transaction.atomic():
+        due = Notification.objects.filter(delivery_status="pending", next_attempt_at__lte=now).order_by(
+            "next_attempt_at", "pk"
+        )
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.values_list("pk", flat=True)[:limit])
+        if not ids:
+            return []
+        # El filtro repetido hace la toma atómica aunque el motor no bloquee filas
+        Notification.objects.filter(pk__in=ids, delivery_status="pending", next_attempt_at__lte=now).update(
+            claim_token=token,
+            next_attempt_at=now + timedelta(seconds=_setting("LEASE_SECONDS", OUTBOX_LEASE_SECONDS)),
+        )
+    return list(
+        Notification.objects.filter(claim_token=token, delivery_status="pending")
+        .select_related("recipient", "project__created_by")
+        .order_by("pk")
+    )
+
+
+def deliver_outbox_batch(batch_size: int | None = None) -> OutboxBatchResult:
+    """Envía un lote por una sola conexión de correo y registra el resultado de cada fila."""
+    from .models import Notification
+
+    started = time.perf_counter()
+    result = OutboxBatchResult()
+    notifications = claim_outbox_batch(batch_size or _setting("BATCH_SIZE", OUTBOX_BATCH_SIZE))
+    result.claimed = len(notifications)
+    if not notifications:
+        return result
+
+    now = timezone.now()
+    sendable, skipped = [], []
+    for notification in notifications:
+        (sendable if notification_recipient_email(notification) else skipped).append(notification)
+    if skipped:
+        Notification.objects.filter(pk__in=[n.pk for n in skipped]).update(
+            delivery_status="skipped", claim_token="", updated_at=now
+        )
+        result.skipped = len(skipped)
+
+    sent, failed = [], []
+    if sendable:
+        mail = get_connection(fail_silently=False)
+        try:
+            mail.open()
+        except Exception as exc:
+            logger.exception("Notification outbox could not open the mail connection")
+            failed = [(notification, exc) for notification in sendable]
+        else:
+            try:
+                for notification in sendable:
+                    try:
+                        if mail.send_messages([build_notification_message(notification, mail)]):
+                            sent.append(notification)
+                        else:
+                            failed.append((notification, RuntimeError("El backend no envió el mensaje.")))
+                    except Exception as exc:
+                        failed.append((notification, exc))
+            finally:
+                mail.close()
+
+    if sent:
+        Notification.objects.filter(pk__in=[n.pk for n in sent]).update(
+            delivery_status="sent", sent=True, sent_at=now, claim_token="", last_error="", updated_at=now
+        )
+        result.sent = len(sent)
+
+    max_attempts = _setting("MAX_ATTEMPTS", OUTBOX_MAX_ATTEMPTS)
+    for notification, exc in failed:
+        notification.delivery_attempts += 1
+        notification.last_error = f"{type(exc).__name__}: {exc}"[:2000]
+        notification.claim_token = ""
+        notification.updated_at = now
+        if notification.delivery_attempts >= max_attempts:
+            notification.delivery_status = "dead"
+            result.dead += 1
+        else:
+            notification.next_attempt_at = now + timedelta(seconds=backoff_seconds(notification.delivery_attempts))
+            result.retried += 1
+    if failed:
+        Notification.objects.bulk_update(
+            [notification for notification, _ in failed],
+            ["delivery_status", "delivery_attempts", "last_error", "claim_token", "next_attempt_at", "updated_at"],
+        )
+
+    result.elapsed = time.perf_counter() - started
+    logger.info(
+        "Notification outbox batch",
+        extra={
+            "claimed": result.claimed, "sent": result.sent, "skipped": result.skipped,
+            "retried": result.retried, "dead": result.dead, "elapsed": round(result.elapsed, 3),
+        },
+    )
+    return result
+
+
+def drain_outbox(batch_size: int | None = None, max_batches: int = 0):
+    """Envía lotes hasta vaciar la cola (o ``max_batches``); genera el resultado de cada lote."""
+    batches = 0
+    while not max_batches or batches < max_batches:
+        result = deliver_outbox_batch(batch_size)
+        if not result.claimed:
+            return
+        batches += 1
+        yield result
+
+
+def requeue_dead_notifications(queryset=None) -> int:
+    """Devuelve a la cola las notificaciones descartadas (con los intentos a cero)."""
+    from .models import Notification
+
+    queryset = queryset if queryset is not None else Notification.objects.all()
+    return queryset.filter(delivery_status="dead").update(
+        delivery_status="pending", delivery_attempts=0, next_attempt_at=timezone.now(), claim_token="",
+    )
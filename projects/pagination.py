@@ -0,0 +1,228 @@
+"""
+Paginación por cursor (keyset) para los listados.
+
+En lugar de OFFSET, cada página se pide "después de" (o "antes de") la
+última fila vista, comparando la tupla (clave de orden, id). El costo de
+una página no depende de cuántas filas hay antes, y los enlaces son
+estables aunque se inserten filas nuevas. El total es opcional y, en
+tablas grandes, se estima en lugar de contarse fila por fila.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import datetime
+import json
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+
+PAGE_SIZES = (25, 50, 100)
+DEFAULT_PAGE_SIZE = 25
+# Hasta este número de filas el total es exacto; por encima se estima
+EXACT_COUNT_LIMIT = 1000
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    """Como DjangoJSONEncoder pero sin truncar microsegundos (romperían el desempate)."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps(values, cls=_CursorEncoder, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Valores del cursor o None si no es válido (se vuelve a la primera página)."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, binascii.Error):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def _keyset_filter(fields, values, forward: bool) -> Q:
+    """
+    Comparación lexicográfica de (f1, ..., fn) contra el cursor:
+    f1 > v1 OR (f1 = v1 AND f2 > v2) OR ..., con > o < según la dirección
+    de cada campo y el sentido de la página.
+    """
+    condition = Q()
+    equal = Q()
+    for name, value in zip(fields, values):
+        descending = name.startswith("-")
+        column = name.lstrip("-")
+        lookup = "lt" if descending == forward else "gt"
+        condition |= equal & Q(**{f"{column}__{lookup}": value})
+        equal &= Q(**{column: value})
+    return condition
+
+
+def estimate_count(queryset, limit: int = EXACT_COUNT_LIMIT) -> tuple[int, bool]:
+    """
+    (total, es_estimado). Cuenta exacto hasta ``limit`` filas con un COUNT
+    acotado; por encima, en PostgreSQL usa la estimación del planificador y
+    en otros motores informa el límite como cota inferior.
+    """
+    bounded = queryset.order_by()[: limit + 1].count()
+    if bounded <= limit:
+        return bounded, False
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql":
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return max(int(plan[0]["Plan"]["Plan Rows"]), bounded), True
+    return limit, True
+
+
+@dataclass
+class KeysetPage:
+    object_list: list
+    page_size: int
+    page_sizes: tuple
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+    total: int | None = None
+    total_is_estimate: bool = False
+    query: object = field(default=None, repr=False)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def __contains__(self, item):
+        return item in self.object_list
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    @property
+    def is_paginated(self) -> bool:
+        return self.has_next or self.has_previous
+
+    def _querystring(self, **params) -> str:
+        query = self.query.copy() if self.query is not None else {}
+        for key in ("after", "before"):
+            query.pop(key, None)
+        for key, value in params.items():
+            if value is None:
+                query.pop(key, None)
+            else:
+                query[key] = value
+        return query.urlencode() if hasattr(query, "urlencode") else ""
+
+    @property
+    def next_querystring(self) -> str:
+        return self._querystring(after=self.next_cursor)
+
+    @property
+    def previous_querystring(self) -> str:
+        return self._querystring(before=self.previous_cursor)
+
+    @property
+    def first_querystring(self) -> str:
+        return self._querystring()
+
+    def size_querystrings(self):
+        """[(tamaño, querystring)] para el selector de tamaño de página (vuelve al inicio)."""
+        return [(size, self._querystring(page_size=str(size))) for size in self.page_sizes]
+
+
+def paginate_keyset(
+    request,
+    queryset,
+    ordering,
+    *,
+    page_sizes=PAGE_SIZES,
+    default_size: int = DEFAULT_PAGE_SIZE,
+    with_total: bool = True,
+) -> KeysetPage:
+    """
+    Página del queryset según ``?after=`` / ``?before=`` y ``?page_size=``.
+
+    ``ordering`` es la clave de orden ("-fecha", ("name",), ...); siempre se
+    agrega el id como desempate en la misma dirección que el último campo,
+    de modo que la tupla sea única. Los campos deben ser columnas no nulas
+    del propio modelo.
+    """
+    if isinstance(ordering, str):
+        ordering = (ordering,)
+    last_desc = ordering[-1].startswith("-")
+    fields = tuple(ordering) + ("-pk" if last_desc else "pk",)
+
+    try:
+        size = int(request.GET.get("page_size", default_size))
+    except (TypeError, ValueError):
+        size = default_size
+    if size not in page_sizes:
+        size = default_size
+
+    after = decode_cursor(request.GET["after"]) if request.GET.get("after") else None
+    before = decode_cursor(request.GET["before"]) if request.GET.get("before") and after is None else None
+    cursor = after or before
+    if cursor is not None and len(cursor) != len(fields):
+        cursor = None
+    if cursor is not None:
+        opts = queryset.model._meta
+        try:
+            cursor = [
+                (opts.pk if name.lstrip("-") == "pk" else opts.get_field(name.lstrip("-"))).to_python(value)
+                for name, value in zip(fields, cursor)
+            ]
+        except ValidationError:
+            cursor = None
+
+    total, estimated = estimate_count(queryset) if with_total else (None, False)
+
+    forward = before is None or cursor is None
+    page_qs = queryset
+    if cursor is not None:
+        page_qs = page_qs.filter(_keyset_filter(fields, cursor, forward))
+    if forward:
+        page_qs = page_qs.order_by(*fields)
+    else:
+        page_qs = page_qs.order_by(*(f[1:] if f.startswith("-") else f"-{f}" for f in fields))
+    rows = list(page_qs[: size + 1])
+    has_more = len(rows) > size
+    rows = rows[:size]
+    if not forward:
+        rows.reverse()
+
+    def key_of(obj):
+        return [getattr(obj, name.lstrip("-")) for name in fields]
+
+    has_next = has_more if forward else cursor is not None
+    has_previous = (cursor is not None) if forward else has_more
+    return KeysetPage(
+        object_list=rows,
+        page_size=size,
+        page_sizes=tuple(page_sizes),
+        next_cursor=encode_cursor(key_of(rows[-1])) if rows and has_next else None,
+        previous_cursor=encode_cursor(key_of(rows[0])) if rows and has_previous else None,
+        total=total,
+        total_is_estimate=estimated,
+        query=request.GET,
+    )
@@ -0,0 +1,214 @@
+"""
+Consultas de cartera: indicadores por proyecto en una sola sentencia SQL.
+
+``with_portfolio_metrics`` anota cada proyecto con el SPI/CPI del último
+seguimiento (subconsultas), los conteos de actividades y el costo real
+total, de modo que el tablero y el listado de proyectos se resuelven en un
+número constante de consultas sin importar el tamaño de la cartera.
+
+Esos mismos indicadores se materializan en ProjectMetrics: las señales
+encolan el proyecto afectado con ``schedule_metrics_refresh`` y, al
+confirmar la transacción, ``refresh_project_metrics`` recalcula todos los
+proyectos pendientes con una consulta agregada y un upsert.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .evm import MONEY_FIELD, ZERO, traffic_light
+
+INDEX_FIELD = DecimalField(max_digits=5, decimal_places=2)
+
+
+def with_portfolio_metrics(projects):
+    """Anota el queryset de proyectos con los indicadores del tablero."""
+    from .models import Seguimiento
+
+    latest = Seguimiento.objects.filter(proyecto=OuterRef("pk")).order_by("-fecha", "-pk")
+    return projects.annotate(
+        latest_spi=Subquery(latest.values("spi")[:1], output_field=INDEX_FIELD),
+        latest_cpi=Subquery(latest.values("cpi")[:1], output_field=INDEX_FIELD),
+        activity_total=Count("activity"),
+        activity_completed=Count("activity", filter=Q(activity__status="completed")),
+        actual_cost_total=Coalesce(Sum("activity__actual_cost"), Value(ZERO), output_field=MONEY_FIELD),
+    )
+
+
+@dataclass(frozen=True)
+class ProjectStatus:
+    """Semáforo, avance y uso de presupuesto de un proyecto anotado."""
+
+    project: object
+    traffic_light: str
+    progress: float
+    budget_utilization: Decimal | int
+
+    @classmethod
+    def of(cls, project) -> "ProjectStatus":
+        """
+        Mismas reglas que Project.get_traffic_light_status,
+        get_progress_percentage y budget_utilization_percentage, pero sobre
+        las anotaciones de with_portfolio_metrics.
+        """
+        if project.latest_spi is None:
+            light = "gray"
+        else:
+            light = traffic_light(project.latest_spi, project.latest_cpi or 0)
+        total = project.activity_total
+        progress = round(project.activity_completed / total * 100, 1) if total else 0
+        actual = project.actual_cost_total
+        if project.budget and project.budget > 0 and actual:
+            utilization = round(actual / project.budget * 100, 1)
+        else:
+            utilization = 0
+        return cls(project=project, traffic_light=light, progress=progress, budget_utilization=utilization)
+
+
+def portfolio_status(projects) -> list[ProjectStatus]:
+    """Estado de cada proyecto del queryset con una sola consulta."""
+    return [ProjectStatus.of(project) for project in with_portfolio_metrics(projects)]
+
+
+# ── Modelo de lectura (ProjectMetrics) ────────────────────────────────────
+
+METRICS_FIELDS = (
+    "total_activities", "completed_activities", "progress", "planned_cost", "actual_cost",
+    "resource_cost", "budget_variance", "budget_utilization", "latest_spi", "latest_cpi",
+    "traffic_light", "open_risks", "unread_notifications", "refreshed_at",
+)
+
+
+def _count_subquery(queryset, field):
+    """Conteo correlacionado por proyecto (evita multiplicar filas con los JOIN de actividades)."""
+    counts = (
+        queryset.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def refresh_project_metrics(project_ids=None) -> int:
+    """
+    Recalcula ProjectMetrics de los proyectos indicados (todos si es None)
+    con una consulta agregada y un upsert. Devuelve las filas escritas.
+    """
+    from risks.models import Risk
+
+    from .models import Notification, Project, ProjectMetrics
+
+    projects = Project.objects.all()
+    if project_ids is not None:
+        projects = projects.filter(pk__in=[pk for pk in project_ids if pk])
+    projects = with_portfolio_metrics(projects).annotate(
+        planned_cost_total=Coalesce(Sum("activity__cost"), Value(ZERO), output_field=MONEY_FIELD),
+        resource_cost_total=Coalesce(Sum("activity__resources_total"), Value(ZERO), output_field=MONEY_FIELD),
+        open_risk_count=_count_subquery(Risk.objects.filter(status="identified"), "project"),
+        unread_count=_count_subquery(Notification.objects.filter(read_at__isnull=True), "project"),
+    )
+    now = timezone.now()
+    rows = []
+    for project in projects:
+        status = ProjectStatus.of(project)
+        rows.append(ProjectMetrics(
+            project=project,
+            total_activities=project.activity_total,
+            completed_activities=project.activity_completed,
+            progress=status.progress,
+            planned_cost=project.planned_cost_total,
+            actual_cost=project.actual_cost_total,
+            resource_cost=project.resource_cost_total,
+            budget_variance=project.budget - project.planned_cost_total if project.budget else None,
+            budget_utilization=status.budget_utilization,
+            latest_spi=project.latest_spi,
+            latest_cpi=project.latest_cpi,
+            traffic_light=status.traffic_light,
+            open_risks=project.open_risk_count,
+            unread_notifications=project.unread_count,
+            refreshed_at=now,
+        ))
+    if rows:
+        ProjectMetrics.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=["project"], update_fields=METRICS_FIELDS,
+        )
+    return len(rows)
+
+
+_pending = threading.local()
+
+
+def _pending_ids() -> set:
+    if not hasattr(_pending, "ids"):
+        _pending.ids = set()
+    return _pending.ids
+
+
+def _flush_pending():
+    ids = _pending_ids()
+    if not ids:
+        return
+    project_ids = set(ids)
+    ids.clear()
+    refresh_project_metrics(project_ids)
+
+
+def schedule_metrics_refresh(project_id):
+    """
+    Encola el proyecto para refrescar sus indicadores al confirmar la
+    transacción. Varias escrituras en la misma transacción producen un solo
+    refresco (el primer callback vacía la cola; los demás no hacen nada).
+    Fuera de una transacción se refresca en el acto.
+    """
+    if not project_id:
+        return
+    _pending_ids().add(project_id)
+    transaction.on_commit(_flush_pending)
+
+
+def project_metrics(projects) -> list:
+    """
+    ProjectMetrics de cada proyecto (en su orden), con una consulta. Acepta
+    un queryset o una lista ya cargada con ``select_related("metrics")``
+    (p. ej. una página). Los proyectos sin fila se calculan en el acto.
+    """
+    from .models import ProjectMetrics
+
+    if hasattr(projects, "select_related"):
+        projects = projects.select_related("metrics")
+    projects = list(projects)
+    missing = [project.pk for project in projects if not _has_metrics(project)]
+    if missing:
+        refresh_project_metrics(missing)
+        fresh = {m.project_id: m for m in ProjectMetrics.objects.filter(project_id__in=missing)}
+        for project in projects:
+            if project.pk in fresh:
+                project.metrics = fresh[project.pk]
+    result = []
+    for project in projects:
+        metrics = project.metrics
+        metrics.project = project
+        result.append(metrics)
+    return result
+
+
+def _has_metrics(project) -> bool:
+    from .models import ProjectMetrics
+
+    try:
+        return project.metrics is not None
+    except ProjectMetrics.DoesNotExist:
+        return False
+
+
+def oldest_refresh(metrics):
+    """Marca de actualización más antigua de los indicadores mostrados (None si no hay)."""
+    return min((m.refreshed_at for m in metrics), default=None)
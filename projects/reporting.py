@@ -0,0 +1,173 @@
+"""
+Agregaciones de los reportes por proyecto.
+
+Cada reporte se arma con un número fijo de consultas: los conteos por
+estado salen de un GROUP BY, las series de costo y el desglose por
+responsable de un único values() y los totales de la cabecera de un
+aggregate(), sin recorrer relaciones por actividad. El costo de recursos
+se lee de la columna desnormalizada Activity.resources_total.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import Count, DateField, DurationField, ExpressionWrapper, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .evm import MONEY_FIELD, ZERO
+
+UNASSIGNED_LABEL = "Sin responsable"
+
+
+def status_histogram(activities) -> dict:
+    """{estado: cantidad} con todos los estados de Activity, en un GROUP BY."""
+    from .models import Activity
+
+    histogram = dict.fromkeys((value for value, _ in Activity.STATUS_CHOICES), 0)
+    for row in activities.order_by().values("status").annotate(count=Count("pk")):
+        histogram[row["status"]] = histogram.get(row["status"], 0) + row["count"]
+    return histogram
+
+
+def progress_percent(histogram: dict) -> float:
+    total = sum(histogram.values())
+    return histogram.get("completed", 0) / total * 100 if total else 0
+
+
+@dataclass
+class OwnerBreakdown:
+    """Actividades, completadas y costo planificado de un responsable."""
+
+    owner_id: int | None
+    label: str
+    activities: int = 0
+    completed: int = 0
+    planned_cost: Decimal = ZERO
+    resource_cost: Decimal = ZERO
+
+
+@dataclass
+class CostBreakdown:
+    rows: list = field(default_factory=list)
+    owners: list = field(default_factory=list)
+    total_cost: Decimal = ZERO
+    resource_cost: Decimal = ZERO
+
+    @property
+    def labels(self) -> list:
+        return [row["name"] for row in self.rows]
+
+    @property
+    def series(self) -> list:
+        return [float(row["cost"] or 0) for row in self.rows]
+
+
+def cost_breakdown(activities) -> CostBreakdown:
+    """Serie de costo por actividad y desglose por responsable en un values()."""
+    rows = activities.values(
+        "pk", "name", "status", "cost", "resources_total",
+        "assigned_to_id", "assigned_to__username", "assigned_to__first_name", "assigned_to__last_name",
+    )
+    breakdown = CostBreakdown()
+    owners = {}
+    for row in rows:
+        cost = row["cost"] or ZERO
+        breakdown.rows.append(row)
+        breakdown.total_cost += cost
+        breakdown.resource_cost += row["resources_total"] or ZERO
+
+        owner_id = row["assigned_to_id"]
+        owner = owners.get(owner_id)
+        if owner is None:
+            full_name = " ".join(
+                part for part in (row["assigned_to__first_name"], row["assigned_to__last_name"]) if part
+            )
+            label = full_name or row["assigned_to__username"] or UNASSIGNED_LABEL
+            owner = owners[owner_id] = OwnerBreakdown(owner_id=owner_id, label=label)
+        owner.activities += 1
+        owner.completed += row["status"] == "completed"
+        owner.planned_cost += cost
+        owner.resource_cost += row["resources_total"] or ZERO
+    breakdown.owners = sorted(owners.values(), key=lambda owner: (-owner.planned_cost, owner.label))
+    return breakdown
+
+
+@dataclass
+class StatusReport:
+    completed: int = 0
+    total: int = 0
+    planned_cost: Decimal = ZERO
+    actual_cost: Decimal = ZERO
+    planned_days: int = 0
+    actual_days: int = 0
+    activities: list = field(default_factory=list)
+
+    @property
+    def progress(self) -> float:
+        return self.completed / self.total * 100 if self.total else 0
+
+    @property
+    def cost_difference(self) -> Decimal:
+        return self.actual_cost - self.planned_cost
+
+    @property
+    def time_difference(self) -> int:
+        return self.actual_days - self.planned_days
+
+
+def _days(span) -> int:
+    return span.days if span is not None else 0
+
+
+def annotate_status_metrics(activities, today: date):
+    """Anota costo de recursos y días planificados/transcurridos por actividad."""
+    return activities.annotate(
+        resource_cost=Coalesce(F("resources_total"), Value(ZERO), output_field=MONEY_FIELD),
+        planned_span=ExpressionWrapper(F("end_date") - F("start_date"), output_field=DurationField()),
+        elapsed_span=ExpressionWrapper(
+            Value(today, output_field=DateField()) - F("start_date"), output_field=DurationField()
+        ),
+    )
+
+
+def build_status_report(project, activities, today: date | None = None) -> StatusReport:
+    """Informe de estado en dos consultas: totales por SQL y filas anotadas."""
+    today = today or date.today()
+    totals = activities.order_by().aggregate(
+        total=Count("pk"),
+        completed=Count("pk", filter=Q(status="completed")),
+        planned_cost=Coalesce(Sum("cost"), Value(ZERO), output_field=MONEY_FIELD),
+        resource_cost=Coalesce(Sum("resources_total"), Value(ZERO), output_field=MONEY_FIELD),
+    )
+    rows = annotate_status_metrics(activities, today).values(
+        "name", "status", "cost", "resource_cost", "planned_span", "elapsed_span"
+    )
+
+    report = StatusReport(
+        completed=totals["completed"],
+        total=totals["total"],
+        planned_cost=totals["planned_cost"],
+        actual_cost=totals["planned_cost"] + totals["resource_cost"],
+        planned_days=(project.end_date - project.start_date).days if project.end_date and project.start_date else 0,
+        actual_days=(today - project.start_date).days if project.start_date else 0,
+    )
+    for row in rows:
+        planned_cost = row["cost"] or ZERO
+        planned_days = _days(row["planned_span"])
+        actual_days = _days(row["elapsed_span"])
+        report.activities.append(
+            {
+                "name": row["name"],
+                "status": row["status"],
+                "progress": 100 if row["status"] == "completed" else 0,
+                "planned_cost": planned_cost,
+                "actual_cost": planned_cost + row["resource_cost"],
+                "cost_diff": row["resource_cost"],
+                "planned_days": planned_days,
+                "actual_days": actual_days,
+                "time_diff": actual_days - planned_days,
+            }
+        )
+    return report
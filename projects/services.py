@@ -2,15 +2,18 @@ from __future__ import annotations
 
 import csv
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from decimal import Decimal
 
 from django.conf import settings
 from django.core.mail import send_mail
 from django.db import transaction
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.template.loader import render_to_string
+from django.utils import timezone
 
 from .models import Notification, Project
+from .outbox import notification_recipient_email, notification_subject
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +45,31 @@ def parse_report_filters(params) -> ReportFilters:
     )
 
 
+def filter_report_projects(user, filters: ReportFilters):
+    """Proyectos visibles para el usuario con los filtros del listado de reportes."""
+    from .permissions import get_user_projects
+
+    projects = get_user_projects(user)
+    if filters.project_status:
+        projects = projects.filter(status=filters.project_status)
+    if filters.owner_id:
+        projects = projects.filter(created_by_id=filters.owner_id)
+    return projects
+
+
+def filter_report_activities(project, filters: ReportFilters):
+    activities = project.activity_set.all()
+    if filters.activity_status:
+        activities = activities.filter(status=filters.activity_status)
+    if filters.date_from:
+        activities = activities.filter(start_date__gte=filters.date_from)
+    if filters.date_to:
+        activities = activities.filter(end_date__lte=filters.date_to)
+    if filters.owner_id:
+        activities = activities.filter(assigned_to_id=filters.owner_id)
+    return activities.select_related("assigned_to")
+
+
 def create_project_with_acta(*, form, acta_form, user):
     with transaction.atomic():
         project = form.save(commit=False)
@@ -90,18 +118,22 @@ def create_notification(*, project, alert_type: str, message: str, recipient=Non
 
 
 def deliver_notification(notification: Notification) -> bool:
-    recipient = notification.recipient or notification.project.created_by
-    if not recipient or not recipient.email:
+    """
+    Envía una notificación de inmediato, fuera de la bandeja de salida (uso
+    manual o administrativo). Lo habitual es dejarla pendiente y que la
+    envíe send_notifications por lotes (ver projects.outbox).
+    """
+    email = notification_recipient_email(notification)
+    if not email:
         logger.info("Skipping notification delivery without recipient email", extra={"notification_id": notification.id})
         return False
 
-    subject = f"Alerta de Proyecto: {notification.get_alert_type_display()}"
     try:
         send_mail(
-            subject,
+            notification_subject(notification),
             notification.message,
             settings.DEFAULT_FROM_EMAIL,
-            [recipient.email],
+            [email],
             fail_silently=False,
         )
     except Exception:
@@ -109,7 +141,9 @@ def deliver_notification(notification: Notification) -> bool:
         return False
 
     notification.sent = True
-    notification.save(update_fields=["sent", "updated_at"])
+    notification.delivery_status = "sent"
+    notification.sent_at = timezone.now()
+    notification.save(update_fields=["sent", "delivery_status", "sent_at", "updated_at"])
     return True
 
 
@@ -140,13 +174,43 @@ def send_automated_project_report(project: Project) -> bool:
     return True
 
 
-def export_project_csv(project: Project, activities) -> HttpResponse:
-    response = HttpResponse(content_type="text/csv")
+class EchoBuffer:
+    """Pseudo-archivo para csv.writer: devuelve la línea en vez de guardarla."""
+
+    def write(self, value):
+        return value
+
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_COLUMNS = (
+    "Activity", "Status", "Cost", "Start Date", "End Date", "Actual Start Date",
+    "Actual End Date", "Actual Cost", "Resources Total", "Assigned To",
+)
+EXPORT_FIELDS = (
+    "name", "status", "cost", "start_date", "end_date", "actual_start_date",
+    "actual_end_date", "actual_cost", "resources_total",
+    "assigned_to__first_name", "assigned_to__last_name", "assigned_to__username",
+)
+
+
+def iter_project_csv(activities, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """
+    Líneas CSV de las actividades, una a una. Lee tuplas con values_list e
+    iterator(chunk_size): el responsable llega por JOIN en la misma
+    consulta y el total de recursos es la columna desnormalizada, así que no
+    hay consultas por fila ni instancias de modelo en memoria.
+    """
+    writer = csv.writer(EchoBuffer())
+    yield writer.writerow(EXPORT_COLUMNS)
+    rows = activities.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    for *values, first_name, last_name, username in rows:
+        assignee = f"{first_name or ''} {last_name or ''}".strip() or (username or "")
+        yield writer.writerow([*values, assignee])
+
+
+def export_project_csv(project: Project, activities) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(iter_project_csv(activities), content_type="text/csv")
     response["Content-Disposition"] = f'attachment; filename="{project.name}_report.csv"'
-    writer = csv.writer(response)
-    writer.writerow(["Activity", "Status", "Cost", "Start Date", "End Date"])
-    for activity in activities:
-        writer.writerow([activity.name, activity.status, activity.cost, activity.start_date, activity.end_date])
     return response
 
 
@@ -208,4 +272,152 @@ def generate_project_cuts(project, interval_days: int = 90):
         period_num += 1
 
     ProjectCut.objects.bulk_create(cuts)
+    # bulk_create no emite post_save: se invalida el caché del proyecto aquí
+    from .versioning import bump_project_version
+    bump_project_version(project.pk)
     return list(project.cuts.all().order_by('sort_order'))
+
+
+# ── Comparación entre seguimientos (instantáneas) ─────────────────────────
+
+@dataclass(frozen=True)
+class SnapshotComparison:
+    name: str
+    before: object = None  # SeguimientoSnapshot o None si la actividad no existía
+    after: object = None
+
+    @property
+    def status_changed(self) -> bool:
+        return getattr(self.before, "status", None) != getattr(self.after, "status", None)
+
+    @property
+    def planned_cost_delta(self):
+        return getattr(self.after, "planned_cost", 0) - getattr(self.before, "planned_cost", 0)
+
+    @property
+    def actual_cost_delta(self):
+        return getattr(self.after, "accrued_cost", 0) - getattr(self.before, "accrued_cost", 0)
+
+    @property
+    def changed(self) -> bool:
+        fields = ("status", "end_date", "actual_start_date", "actual_end_date", "planned_cost", "accrued_cost")
+        return any(getattr(self.before, f, None) != getattr(self.after, f, None) for f in fields)
+
+
+def compare_seguimientos(before, after) -> list[SnapshotComparison]:
+    """
+    Empareja las instantáneas de dos seguimientos por actividad (o por
+    nombre si la actividad fue eliminada). Dos consultas en total.
+    """
+    def keyed(seguimiento):
+        return {(snap.activity_id or snap.name): snap for snap in seguimiento.snapshots.all()}
+
+    old, new = keyed(before), keyed(after)
+    rows = [
+        SnapshotComparison(name=(new.get(key) or old.get(key)).name, before=old.get(key), after=new.get(key))
+        for key in old.keys() | new.keys()
+    ]
+    rows.sort(key=lambda row: ((row.after or row.before).start_date, row.name))
+    return rows
+
+
+# ── Recálculo masivo de métricas EVM de seguimientos ──────────────────────
+
+SEGUIMIENTO_METRIC_FIELDS = ("pv", "ev", "ac", "sv", "cv", "cpi", "spi")
+CENT = Decimal("0.01")
+
+
+@dataclass(frozen=True)
+class SeguimientoRecalculation:
+    project_id: int
+    rows: int = 0
+    changed: int = 0
+    skipped: int = 0
+    # {campo: (máximo |nuevo - anterior|, suma |nuevo - anterior|)}
+    drift: dict = field(default_factory=dict)
+
+
+def recalculate_project_seguimientos(
+    project_id, *, date_from=None, date_to=None, from_live=False, batch_size=500, dry_run=False
+) -> SeguimientoRecalculation:
+    """
+    Recalcula las métricas EVM guardadas de los seguimientos de un proyecto.
+
+    Por defecto se recalculan sobre las instantáneas congeladas (p. ej. tras
+    un cambio de fórmula) con un solo GROUP BY; los seguimientos sin
+    instantánea se omiten. Con ``from_live`` se recalculan contra el estado
+    actual de las actividades (tras una corrección de datos); solo se vuelve
+    a congelar la instantánea del último seguimiento del proyecto, porque
+    las anteriores son la historia por fecha que comparan las vistas. Solo
+    se escriben las filas que cambian, con bulk_update por lotes; como no
+    hay señales, la versión y los indicadores del proyecto se marcan aquí.
+    """
+    from .evm import EVMTimeSeries, compute_snapshot_evm_bulk
+    from .models import Seguimiento, SeguimientoSnapshot
+    from .portfolio import schedule_metrics_refresh
+    from .versioning import bump_project_version
+
+    seguimientos = Seguimiento.objects.filter(proyecto_id=project_id)
+    if date_from:
+        seguimientos = seguimientos.filter(fecha__gte=date_from)
+    if date_to:
+        seguimientos = seguimientos.filter(fecha__lte=date_to)
+    seguimientos = list(seguimientos.order_by("fecha", "pk"))
+    if not seguimientos:
+        return SeguimientoRecalculation(project_id=project_id)
+
+    if from_live:
+        captured = SeguimientoSnapshot.capture(project_id)
+        series = EVMTimeSeries.from_rows(
+            (row["end_date"], row["actual_end_date"], row["status"], row["planned_cost"], row["accrued_cost"])
+            for row in captured
+        )
+        fresh = {seg.pk: series.at(seg.fecha) for seg in seguimientos}
+    else:
+        fresh = compute_snapshot_evm_bulk([seg.pk for seg in seguimientos])
+
+    drift = {name: (Decimal("0.00"), Decimal("0.00")) for name in SEGUIMIENTO_METRIC_FIELDS}
+    changed = []
+    for seg in seguimientos:
+        metrics = fresh.get(seg.pk)
+        if metrics is None:
+            continue
+        new_values = {name: Decimal(getattr(metrics, name)).quantize(CENT) for name in SEGUIMIENTO_METRIC_FIELDS}
+        if all(getattr(seg, name) == value for name, value in new_values.items()):
+            continue
+        for name, value in new_values.items():
+            delta = abs(value - getattr(seg, name))
+            worst, total = drift[name]
+            drift[name] = (max(worst, delta), total + delta)
+            setattr(seg, name, value)
+        changed.append(seg)
+
+    latest = None
+    if from_live:
+        latest_pk = (
+            Seguimiento.objects.filter(proyecto_id=project_id)
+            .order_by("-fecha", "-pk")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        latest = next((seg for seg in seguimientos if seg.pk == latest_pk), None)
+
+    if not dry_run and (changed or latest):
+        with transaction.atomic():
+            Seguimiento.objects.bulk_update(changed, SEGUIMIENTO_METRIC_FIELDS, batch_size=batch_size)
+            if latest:
+                SeguimientoSnapshot.objects.filter(seguimiento=latest).delete()
+                SeguimientoSnapshot.objects.bulk_create(
+                    [SeguimientoSnapshot(seguimiento=latest, **values) for values in captured],
+                    batch_size=batch_size,
+                )
+            bump_project_version(project_id)
+            schedule_metrics_refresh(project_id)
+
+    return SeguimientoRecalculation(
+        project_id=project_id,
+        rows=len(seguimientos),
+        changed=len(changed),
+        skipped=len(seguimientos) - len(fresh),
+        drift=drift,
+    )
@@ -1,8 +1,14 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import UserProfile, Notification
-from .services import deliver_notification
+from resources.models import Resource
+from risks.models import Risk
+from stakeholders.models import Stakeholder
+from .models import (
+    UserProfile, Notification, Activity, Project, Seguimiento, Milestone, ProjectCut, Comunicacion,
+)
+from .portfolio import schedule_metrics_refresh
+from .versioning import bump_project_version
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -13,7 +19,86 @@ def create_user_profile(sender, instance, created, **kwargs):
 def save_user_profile(sender, instance, **kwargs):
     instance.userprofile.save()
 
+# El correo de las notificaciones no se envía aquí: cada Notification nueva
+# queda pendiente en la bandeja de salida y la envía el comando
+# send_notifications por lotes (ver projects.outbox).
+
+
+# ── Indicadores materializados (ProjectMetrics) ──────────────────────────
+
+@receiver(post_save, sender=Project)
+def create_project_metrics(sender, instance, created, **kwargs):
+    if created:
+        schedule_metrics_refresh(instance.pk)
+
+@receiver(post_save, sender=Activity)
+@receiver(post_delete, sender=Activity)
+@receiver(post_save, sender=Risk)
+@receiver(post_delete, sender=Risk)
+def project_data_changed(sender, instance, **kwargs):
+    bump_project_version(instance.project_id)
+    schedule_metrics_refresh(instance.project_id)
+
 @receiver(post_save, sender=Notification)
-def send_notification_email(sender, instance, created, **kwargs):
-    if created and not instance.sent:
-        deliver_notification(instance)
+@receiver(post_delete, sender=Notification)
+def refresh_metrics_for_notification(sender, instance, **kwargs):
+    schedule_metrics_refresh(instance.project_id)
+
+@receiver(post_save, sender=Seguimiento)
+@receiver(post_delete, sender=Seguimiento)
+def seguimiento_changed(sender, instance, **kwargs):
+    bump_project_version(instance.proyecto_id)
+    schedule_metrics_refresh(instance.proyecto_id)
+
+@receiver(post_save, sender=Resource)
+@receiver(post_delete, sender=Resource)
+def resource_changed(sender, instance, **kwargs):
+    if instance.activity_id:
+        project_id = Activity.objects.filter(pk=instance.activity_id).values_list('project_id', flat=True).first()
+        bump_project_version(project_id)
+        schedule_metrics_refresh(project_id)
+
+
+# ── Versión de datos del proyecto (caché) ────────────────────────────────
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, **kwargs):
+    bump_project_version(instance.pk)
+
+@receiver(post_save, sender=Milestone)
+@receiver(post_delete, sender=Milestone)
+@receiver(post_save, sender=ProjectCut)
+@receiver(post_delete, sender=ProjectCut)
+def project_structure_changed(sender, instance, **kwargs):
+    bump_project_version(instance.project_id)
+
+@receiver(post_save, sender=Comunicacion)
+@receiver(post_delete, sender=Comunicacion)
+def comunicacion_changed(sender, instance, **kwargs):
+    bump_project_version(instance.proyecto_id)
+
+@receiver(m2m_changed, sender=Milestone.activities.through)
+def milestone_activities_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # instance es el hito o, desde el lado inverso, la actividad: ambos tienen project_id
+    if action.startswith('post_'):
+        bump_project_version(instance.project_id)
+
+@receiver(m2m_changed, sender=Stakeholder.projects.through)
+def stakeholder_projects_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and not reverse:
+        # clear() no informa pk_set: se toman los proyectos antes de borrar
+        instance._cleared_project_ids = list(instance.projects.values_list('pk', flat=True))
+        return
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        bump_project_version(instance.pk)
+        return
+    project_ids = pk_set if action != 'post_clear' else getattr(instance, '_cleared_project_ids', ())
+    for project_id in project_ids or ():
+        bump_project_version(project_id)
+
+@receiver(pre_delete, sender=Stakeholder)
+def stakeholder_deleted(sender, instance, **kwargs):
+    for project_id in instance.projects.values_list('pk', flat=True):
+        bump_project_version(project_id)
@@ -35,6 +35,7 @@ urlpatterns = [
     path('seguimiento/', views.seguimiento_list, name='seguimiento_list'),
     path('seguimiento/create/<int:project_id>/', views.seguimiento_create, name='seguimiento_create'),
     path('seguimiento/<int:pk>/edit/', views.seguimiento_edit, name='seguimiento_edit'),
+    path('seguimiento/<int:pk>/compare/<int:other_pk>/', views.seguimiento_compare, name='seguimiento_compare'),
     # Linea Base — seguimiento masivo por actividad
     path('projects/<int:project_id>/linea-base/', views.linea_base_seguimiento, name='linea_base_seguimiento'),
     # Cortes del proyecto — períodos de revisión
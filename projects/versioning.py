@@ -0,0 +1,93 @@
+"""
+Versión de datos por proyecto e invalidación de caché.
+
+Cada escritura que afecta a un proyecto (actividades, recursos, hitos,
+seguimientos, riesgos, interesados, cortes, comunicaciones) incrementa su
+ProjectVersion desde las señales de projects.signals. Las vistas guardan su
+contexto calculado en el caché de Django con una clave que incluye esa
+versión: al cambiar los datos la clave cambia y la entrada vieja
+simplemente deja de usarse (expira sola), sin borrados explícitos.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.utils import timezone
+
+CACHE_PREFIX = "project"
+
+
+def initial_version() -> int:
+    """
+    Versión inicial basada en el reloj (microsegundos): si la base se
+    restaura o se recrea, los proyectos nuevos no reutilizan claves que el
+    caché aún conserve de la base anterior.
+    """
+    return time.time_ns() // 1000
+
+
+def bump_project_version(project_id) -> None:
+    """Incrementa la versión del proyecto (un UPDATE; crea la fila si falta)."""
+    from .models import ProjectVersion
+
+    if not project_id:
+        return
+    updated = ProjectVersion.objects.filter(project_id=project_id).update(
+        version=F("version") + 1, updated_at=timezone.now()
+    )
+    if not updated:
+        ProjectVersion.objects.bulk_create([ProjectVersion(project_id=project_id)], ignore_conflicts=True)
+
+
+def get_project_version(project_id) -> int:
+    """Versión actual del proyecto con una consulta por clave primaria (0 si no existe)."""
+    from .models import ProjectVersion
+
+    version = ProjectVersion.objects.filter(project_id=project_id).values_list("version", flat=True).first()
+    return version or 0
+
+
+def get_project_version_info(project_id):
+    """(versión, fecha de la última modificación) en una consulta; (0, None) si no existe."""
+    from .models import ProjectVersion
+
+    row = ProjectVersion.objects.filter(project_id=project_id).values_list("version", "updated_at").first()
+    return row or (0, None)
+
+
+def _filters_digest(filters) -> str:
+    if filters is None:
+        return "-"
+    if hasattr(filters, "__dataclass_fields__"):
+        filters = {name: getattr(filters, name) for name in filters.__dataclass_fields__}
+    raw = json.dumps(filters, cls=DjangoJSONEncoder, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def project_cache_key(project_id, view: str, filters=None, version=None) -> str:
+    """Clave (proyecto, versión, vista, filtros) para el caché de Django."""
+    if version is None:
+        version = get_project_version(project_id)
+    return f"{CACHE_PREFIX}:{project_id}:v{version}:{view}:{_filters_digest(filters)}"
+
+
+def cached_project_value(project_id, view: str, builder, filters=None, timeout=None):
+    """
+    Devuelve el valor cacheado para (proyecto, versión, vista, filtros) o lo
+    construye con ``builder()`` y lo guarda. El valor debe ser serializable
+    con pickle (dataclasses, dicts, listas, instancias de modelos).
+    """
+    key = project_cache_key(project_id, view, filters)
+    value = cache.get(key)
+    if value is None:
+        value = builder()
+        if timeout is None:
+            timeout = getattr(settings, "PROJECT_CACHE_TIMEOUT", 3600)
+        cache.set(key, value, timeout)
+    return value
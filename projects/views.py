@@ -4,7 +4,9 @@ from functools import wraps
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
+from django.db import transaction
 from django.db.utils import OperationalError, ProgrammingError
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 
@@ -27,8 +29,16 @@ from .models import (
     Seguimiento,
     ActaConstitucion,
 )
+from .cpm import project_schedule
+from .evm import ActivityContribution, EVMTimeSeries, apply_activity_change, compute_cut_metrics, date_grid
+from .forecast import EAC_METHODS, project_forecasts
+from .gantt import schedule_gantt_prewarm
+from .pagination import paginate_keyset
+from .portfolio import oldest_refresh, project_metrics
+from .versioning import cached_project_value
 from .permissions import can_edit_project, can_view_project, get_user_projects, is_jefe_departamental
 from .services import (
+    compare_seguimientos,
     create_project_with_acta,
     generate_project_cuts,
     set_project_modified_if_needed,
@@ -65,19 +75,11 @@ def render_schema_mismatch(request, *, status=503):
 def dashboard(request):
     projects = get_user_projects(request.user)
     active_projects = projects.filter(status__in=["in_progress", "planning"])
-    pending_tasks = Activity.objects.filter(project__in=projects, status="pending")
-    latest_reports = Seguimiento.objects.filter(proyecto__in=projects).order_by("-fecha")[:5]
+    pending_tasks = Activity.objects.filter(project__in=projects, status="pending").select_related("project")
+    latest_reports = Seguimiento.objects.filter(proyecto__in=projects).select_related("proyecto").order_by("-fecha")[:5]
     user_role = request.user.userprofile.get_role_display() if hasattr(request.user, "userprofile") else "Sin rol"
 
-    projects_with_status = [
-        {
-            "project": project,
-            "traffic_light": project.get_traffic_light_status(),
-            "progress": project.get_progress_percentage(),
-            "budget_utilization": project.budget_utilization_percentage,
-        }
-        for project in projects
-    ]
+    projects_with_status = project_metrics(projects)
 
     return render(
         request,
@@ -85,6 +87,7 @@ def dashboard(request):
         {
             "projects": projects,
             "projects_with_status": projects_with_status,
+            "metrics_refreshed_at": oldest_refresh(projects_with_status),
             "active_projects": active_projects,
             "pending_tasks": pending_tasks,
             "latest_reports": latest_reports,
@@ -96,11 +99,17 @@ def dashboard(request):
 
 @login_required
 def project_list(request):
+    projects = get_user_projects(request.user)
+    page = paginate_keyset(request, projects.select_related("created_by", "metrics"), "-created_at")
+    projects_with_status = project_metrics(page.object_list)
     return render(
         request,
         "projects/project_list.html",
         {
-            "projects": get_user_projects(request.user),
+            "projects": projects,
+            "page": page,
+            "projects_with_status": projects_with_status,
+            "metrics_refreshed_at": oldest_refresh(projects_with_status),
             "is_jefe_departamental": is_jefe_departamental(request.user),
         },
     )
@@ -115,7 +124,10 @@ def project_detail(request, pk):
 
     from risks.models import Risk
 
-    activities = project.activity_set.all().prefetch_related('resource_set')
+    activities = list(project.activity_set.all().select_related('predecessor').prefetch_related('resource_set'))
+    schedule = project_schedule(project)
+    for activity in activities:
+        activity.cpm = schedule.get(activity.pk)
 
     return render(
         request,
@@ -123,10 +135,11 @@ def project_detail(request, pk):
         {
             "project": project,
             "activities": activities,
+            "schedule": schedule,
             "milestones": project.milestone_set.all(),
             "stakeholders": project.stakeholders.all(),
             "risks": Risk.objects.filter(project=project),
-            "communications": project.comunicacion_set.all(),
+            "communications": project.comunicacion_set.all().select_related("interesado"),
             "alcance": getattr(project, 'alcance', None),
             "total_activities_cost": project.total_activities_cost,
             "total_resources_cost": project.total_resources_cost,
@@ -204,7 +217,7 @@ def activity_list(request, project_id):
         messages.error(request, "No tienes permisos para ver este proyecto.")
         return redirect("project_list")
 
-    activities = project.activity_set.all().select_related("predecessor")
+    activities = paginate_keyset(request, project.activity_set.select_related("predecessor"), "start_date")
     return render(
         request,
         "projects/activity_list.html",
@@ -252,10 +265,12 @@ def activity_edit(request, project_id, pk):
         return redirect("activity_list", project_id=project.pk)
 
     if request.method == "POST":
+        # is_valid() vuelca los datos del formulario sobre la instancia: capturar antes
+        before = ActivityContribution.of(activity)
         form = ActivityForm(request.POST, instance=activity, user=request.user)
         if form.is_valid():
             try:
-                form.save()
+                apply_activity_change(form.save(), before)
                 messages.success(request, "Actividad actualizada exitosamente.")
                 return redirect("activity_list", project_id=project.pk)
             except Exception as exc:
@@ -358,7 +373,9 @@ def user_delete(request, pk):
 @login_required
 def seguimiento_list(request):
     proyectos = get_user_projects(request.user)
-    seguimientos = Seguimiento.objects.filter(proyecto__in=proyectos).order_by("-fecha").select_related("proyecto")
+    seguimientos = paginate_keyset(
+        request, Seguimiento.objects.filter(proyecto__in=proyectos).select_related("proyecto"), "-fecha"
+    )
     return render(
         request,
         "projects/seguimiento_list.html",
@@ -424,46 +441,55 @@ def linea_base_seguimiento(request, project_id):
             messages.error(request, "Fecha invalida.")
             return redirect("linea_base_seguimiento", project_id=project.pk)
 
-        # Actualizar datos reales por actividad
+        # Una transacción para todo el lote: un solo refresco de indicadores
+        # y una sola subida de versión al confirmar, no uno por actividad
         errores = 0
-        for activity in activities:
-            a_start = request.POST.get(f"actual_start_{activity.id}", "").strip()
-            a_end = request.POST.get(f"actual_end_{activity.id}", "").strip()
-            a_cost = request.POST.get(f"actual_cost_{activity.id}", "").strip()
-
-            changed = False
-            if a_start:
-                try:
-                    activity.actual_start_date = date.fromisoformat(a_start)
-                    changed = True
-                except ValueError:
-                    pass
-            if a_end:
-                try:
-                    activity.actual_end_date = date.fromisoformat(a_end)
-                    # Si tiene fecha real de fin, marcarla como completada
-                    if activity.status in ("pending", "in_progress"):
-                        activity.status = "completed"
-                    changed = True
-                except ValueError:
-                    pass
-            if a_cost:
-                try:
-                    activity.actual_cost = Decimal(a_cost)
-                    changed = True
-                except (ValueError, TypeError):
-                    pass
-
-            if changed:
-                try:
-                    activity.save()
-                except Exception as e:
-                    errores += 1
-                    logger.warning("Error al guardar actividad %s: %s", activity.id, e)
-
-        # Crear el registro de seguimiento
-        seguimiento = Seguimiento(proyecto=project, fecha=fecha, observacion=observacion)
-        seguimiento.save()  # calculate_metrics() se ejecuta automaticamente
+        with transaction.atomic():
+            for activity in activities:
+                before = ActivityContribution.of(activity)
+                a_start = request.POST.get(f"actual_start_{activity.id}", "").strip()
+                a_end = request.POST.get(f"actual_end_{activity.id}", "").strip()
+                a_cost = request.POST.get(f"actual_cost_{activity.id}", "").strip()
+
+                changed = False
+                if a_start:
+                    try:
+                        activity.actual_start_date = date.fromisoformat(a_start)
+                        changed = True
+                    except ValueError:
+                        pass
+                if a_end:
+                    try:
+                        activity.actual_end_date = date.fromisoformat(a_end)
+                        # Si tiene fecha real de fin, marcarla como completada
+                        if activity.status in ("pending", "in_progress"):
+                            activity.status = "completed"
+                        changed = True
+                    except ValueError:
+                        pass
+                if a_cost:
+                    try:
+                        activity.actual_cost = Decimal(a_cost)
+                        changed = True
+                    except (ValueError, TypeError):
+                        pass
+
+                if changed:
+                    try:
+                        # Punto de guardado: si la actividad falla no quedan deltas a medias
+                        with transaction.atomic():
+                            activity.save()
+                            # Mantener al dia los seguimientos ya guardados (delta incremental)
+                            apply_activity_change(activity, before)
+                    except Exception as e:
+                        errores += 1
+                        logger.warning("Error al guardar actividad %s: %s", activity.id, e)
+
+            # Crear el registro de seguimiento
+            seguimiento = Seguimiento(proyecto=project, fecha=fecha, observacion=observacion)
+            seguimiento.save()  # calculate_metrics() se ejecuta automaticamente
+        # Edición masiva de actividades: reconstruir el Gantt en segundo plano
+        schedule_gantt_prewarm(project.pk)
 
         if errores:
             messages.warning(request, f"Seguimiento creado con {errores} error(es) al actualizar actividades.")
@@ -480,7 +506,23 @@ def linea_base_seguimiento(request, project_id):
     # GET: mostrar linea base
     today = date.today()
     latest_seguimiento = Seguimiento.objects.filter(proyecto=project).order_by("-fecha").first()
-    all_seguimientos = Seguimiento.objects.filter(proyecto=project).order_by("-fecha")
+    all_seguimientos = list(Seguimiento.objects.filter(proyecto=project).order_by("-fecha", "-pk"))
+    # Cada seguimiento se compara con el inmediatamente anterior
+    for newer, older in zip(all_seguimientos, all_seguimientos[1:]):
+        newer.previous_seguimiento = older
+
+    # ?seguimiento=<pk>: re-render historico desde la instantanea congelada
+    historic_seguimiento = None
+    if request.GET.get("seguimiento"):
+        historic_seguimiento = next(
+            (seg for seg in all_seguimientos if str(seg.pk) == request.GET["seguimiento"]), None
+        )
+        if historic_seguimiento is None:
+            raise Http404("Seguimiento no encontrado.")
+        activities = historic_seguimiento.snapshots.order_by("start_date", "name")
+        if not historic_seguimiento.has_snapshot:
+            messages.info(request, "Este seguimiento es anterior a las instantaneas: no hay detalle por actividad.")
+
     completed_count = activities.filter(status="completed").count()
     in_progress_count = activities.filter(status="in_progress").count()
 
@@ -490,7 +532,8 @@ def linea_base_seguimiento(request, project_id):
         "today": today,
         "latest_seguimiento": latest_seguimiento,
         "all_seguimientos": all_seguimientos,
-        "can_edit": can_edit_project(request.user, project),
+        "historic_seguimiento": historic_seguimiento,
+        "can_edit": can_edit_project(request.user, project) and historic_seguimiento is None,
         "completed_count": completed_count,
         "in_progress_count": in_progress_count,
     }
@@ -516,6 +559,29 @@ def seguimiento_edit(request, pk):
     return render(request, "projects/seguimiento_form.html", {"form": form})
 
 
+@login_required
+def seguimiento_compare(request, pk, other_pk):
+    """Compara dos seguimientos del mismo proyecto a partir de sus instantaneas."""
+    seguimiento = get_object_or_404(Seguimiento.objects.select_related("proyecto"), pk=pk)
+    project = seguimiento.proyecto
+    if not can_view_project(request.user, project):
+        messages.error(request, "No tienes permisos para ver este proyecto.")
+        return redirect("seguimiento_list")
+    other = get_object_or_404(Seguimiento, pk=other_pk, proyecto=project)
+
+    before, after = sorted([seguimiento, other], key=lambda seg: (seg.fecha, seg.pk))
+    rows = compare_seguimientos(before, after)
+    context = {
+        "project": project,
+        "before": before,
+        "after": after,
+        "rows": rows,
+        "changed_count": sum(1 for row in rows if row.changed),
+        "missing_snapshot": not (before.has_snapshot and after.has_snapshot),
+    }
+    return render(request, "projects/seguimiento_compare.html", context)
+
+
 @login_required
 def change_request_list(request):
     if is_jefe_departamental(request.user):
@@ -640,9 +706,12 @@ def evm_curves(request, project_id):
         messages.error(request, "No tienes permisos para ver este proyecto.")
         return redirect("dashboard")
 
-    seguimientos = Seguimiento.objects.filter(
-        proyecto=project
-    ).order_by("fecha")
+    seguimientos = list(Seguimiento.objects.filter(proyecto=project).order_by("fecha", "pk"))
+    baseline = EVMTimeSeries.for_project(project)
+    # Mismo orden que seguimientos: cada fila recibe su pronóstico
+    forecasts = project_forecasts(project, baseline=baseline)
+    for seguimiento, forecast in zip(seguimientos, forecasts):
+        seguimiento.forecast = forecast
 
     chart_data = {
         "labels": [s.fecha.isoformat() for s in seguimientos],
@@ -651,7 +720,30 @@ def evm_curves(request, project_id):
         "ac": [float(s.ac or 0) for s in seguimientos],
     }
 
-    latest = seguimientos.last()
+    # Curva continua calculada desde las actividades (diaria o semanal) más
+    # las fechas de los seguimientos, para que ambos se alineen en el eje X.
+    granularity = request.GET.get("granularity", "")
+    if granularity not in ("daily", "weekly"):
+        span_days = (project.end_date - project.start_date).days if project.start_date and project.end_date else 0
+        granularity = "daily" if span_days <= 120 else "weekly"
+    step_days = 1 if granularity == "daily" else 7
+    curve_dates = sorted(
+        set(date_grid(project.start_date, project.end_date, step_days))
+        | {s.fecha for s in seguimientos}
+    )
+    series = baseline.series(curve_dates)
+    snapshots = {s.fecha: s for s in seguimientos}
+    curve_data = {
+        "labels": [fecha.isoformat() for fecha in curve_dates],
+        "pv": [float(point.pv) for point in series],
+        "ev": [float(point.ev) for point in series],
+        "ac": [float(point.ac) for point in series],
+        "snapshot_pv": [float(snapshots[f].pv) if f in snapshots else None for f in curve_dates],
+        "snapshot_ev": [float(snapshots[f].ev) if f in snapshots else None for f in curve_dates],
+        "snapshot_ac": [float(snapshots[f].ac) if f in snapshots else None for f in curve_dates],
+    }
+
+    latest = seguimientos[-1] if seguimientos else None
     metrics = {}
     if latest:
         metrics["sv"] = latest.sv
@@ -672,8 +764,12 @@ def evm_curves(request, project_id):
     return render(request, "projects/evm_curves.html", {
         "project": project,
         "chart_data_json": json.dumps(chart_data),
+        "curve_data_json": json.dumps(curve_data),
+        "granularity": granularity,
         "metrics": metrics,
         "seguimientos": seguimientos,
+        "forecast": forecasts[-1] if forecasts else None,
+        "eac_methods": EAC_METHODS,
         "can_edit": can_edit_project(request.user, project),
     })
 
@@ -685,6 +781,7 @@ def project_financial_summary(request, pk):
         messages.error(request, "No tienes permisos para ver este proyecto.")
         return redirect("dashboard")
 
+    forecasts = project_forecasts(project)
     return render(
         request,
         "projects/financial_summary.html",
@@ -697,6 +794,9 @@ def project_financial_summary(request, pk):
             "utilization": project.budget_utilization_percentage,
             "activities": project.activity_set.all(),
             "traffic_light": project.get_traffic_light_status(),
+            "forecasts": forecasts,
+            "forecast": forecasts[-1] if forecasts else None,
+            "eac_methods": EAC_METHODS,
         },
     )
 
@@ -751,7 +851,9 @@ def milestone_edit(request, project_id, pk):
 @login_required
 def notification_list(request):
     try:
-        notifications = Notification.objects.filter(recipient=request.user).select_related("project").order_by("-created_at")
+        notifications = paginate_keyset(
+            request, Notification.objects.filter(recipient=request.user).select_related("project"), "-created_at"
+        )
     except (OperationalError, ProgrammingError):
         return render_schema_mismatch(request)
     return render(request, "projects/notification_list.html", {"notifications": notifications})
@@ -844,11 +946,21 @@ def project_cuts(request, project_id):
                 except ValueError:
                     pass
             cut.save()
+            # Las fechas pudieron cambiar: las métricas memoizadas ya no valen
+            cut.invalidate_metrics()
             messages.success(request, f"Corte '{cut.name}' actualizado.")
         return redirect("project_cuts", project_id=project.pk)
 
     # ── GET: mostrar cortes ──
-    cuts = project.cuts.all().order_by("sort_order")
+    # Métricas de todos los cortes con una sola carga de actividades
+    cuts = list(project.cuts.all().order_by("sort_order"))
+    cut_metrics = cached_project_value(project.pk, "project_cuts", lambda: compute_cut_metrics(project, cuts))
+    schedule = project_schedule(project)
+    for cut in cuts:
+        cut.metrics = cut_metrics[cut.pk]
+        for activity in cut.metrics.activities:
+            activity.cpm = schedule.get(activity.pk)
+        cut.critical_count = sum(1 for activity in cut.metrics.activities if schedule.is_critical(activity.pk))
 
     # Totales acumulados del proyecto
     from decimal import Decimal
@@ -856,9 +968,9 @@ def project_cuts(request, project_id):
     total_ev = Decimal("0")
     total_ac = Decimal("0")
     for cut in cuts:
-        total_planned_cost += cut.planned_cost
-        total_ev += cut.ev
-        total_ac += cut.ac
+        total_planned_cost += cut.metrics.planned_cost
+        total_ev += cut.metrics.ev
+        total_ac += cut.metrics.ac
 
     if total_planned_cost > 0:
         overall_spi = total_ev / total_planned_cost
@@ -884,7 +996,7 @@ def project_cuts(request, project_id):
             "project": project,
             "cuts": cuts,
             "interval": interval,
-            "has_cuts": cuts.exists(),
+            "has_cuts": bool(cuts),
             "total_planned_cost": total_planned_cost,
             "total_ev": total_ev,
             "total_ac": total_ac,
@@ -0,0 +1,250 @@
+"""
+Escritor XLSX en flujo, sin libro en memoria.
+
+Cada hoja se escribe fila a fila dentro de su entrada del ZIP (comprimida
+al vuelo por zipfile) y se cierra antes de empezar la siguiente; solo el
+índice de hojas queda en memoria hasta el final, cuando se escriben el
+libro, los estilos y las relaciones. El consumo es constante sin importar
+cuántas filas se exporten.
+
+Los valores se tipan según su clase de Python: fechas y fechas con hora
+como números de serie con formato dd/mm/aaaa, Decimal/float como número
+con dos decimales, enteros como número y el resto como texto en línea.
+La primera fila de cada hoja es el encabezado, en negrita y fijo.
+"""
+from __future__ import annotations
+
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+XLSX_BATCH_ROWS = 1000
+
+_EPOCH = date(1899, 12, 30)
+_ILLEGAL_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+_ILLEGAL_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+# Índices en cellXfs de styles.xml
+_STYLE_DATE = 1
+_STYLE_DATETIME = 2
+_STYLE_DECIMAL = 3
+_STYLE_HEADER = 4
+
+_NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    f'<styleSheet xmlns="{_NS_MAIN}">'
+    '<numFmts count="2">'
+    '<numFmt numFmtId="164" formatCode="dd/mm/yyyy"/>'
+    '<numFmt numFmtId="165" formatCode="dd/mm/yyyy hh:mm"/>'
+    '</numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="5">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    f'<worksheet xmlns="{_NS_MAIN}" xmlns:r="{_NS_REL}">'
+    '<sheetViews><sheetView workbookViewId="0">'
+    '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+    '</sheetView></sheetViews><sheetData>'
+)
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+
+def column_letter(index: int) -> str:
+    """Letra de columna de Excel para un índice desde 0 (0 → A, 26 → AA)."""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def excel_serial(value) -> float | int:
+    """Número de serie de Excel (sistema 1900) de una fecha o fecha con hora."""
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        delta = value.replace(tzinfo=None) - datetime(1899, 12, 30)
+        return delta.days + delta.seconds / 86400
+    return (value - _EPOCH).days
+
+
+def _text(value) -> str:
+    return escape(_ILLEGAL_XML.sub("", str(value)))
+
+
+def _cell(ref: str, value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, datetime):
+        return f'<c r="{ref}" s="{_STYLE_DATETIME}"><v>{excel_serial(value)!r}</v></c>'
+    if isinstance(value, date):
+        return f'<c r="{ref}" s="{_STYLE_DATE}"><v>{excel_serial(value)}</v></c>'
+    if isinstance(value, Decimal):
+        if not value.is_finite():
+            return ""
+        return f'<c r="{ref}" s="{_STYLE_DECIMAL}"><v>{value}</v></c>'
+    if isinstance(value, float):
+        if value != value or value in (float("inf"), float("-inf")):
+            return ""
+        return f'<c r="{ref}" s="{_STYLE_DECIMAL}"><v>{value!r}</v></c>'
+    if isinstance(value, int):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{_text(value)}</t></is></c>'
+
+
+def _sheet_title(title: str, used: set) -> str:
+    """Nombre de hoja válido (≤31 caracteres, sin []:*?/\\) y único en el libro."""
+    base = _ILLEGAL_SHEET_CHARS.sub("_", str(title)).strip("'") or "Hoja"
+    base = base[:31]
+    candidate, n = base, 1
+    while candidate.lower() in used:
+        n += 1
+        suffix = f" ({n})"
+        candidate = base[:31 - len(suffix)] + suffix
+    used.add(candidate.lower())
+    return candidate
+
+
+class XlsxWriter:
+    """
+    Libro XLSX escrito en flujo sobre ``fileobj`` (archivo binario abierto).
+
+        with XlsxWriter(handle) as book:
+            book.write_sheet("Actividades", columnas, filas)
+
+    ``filas`` puede ser cualquier iterable (p. ej. un ``iterator()`` de
+    Django); se consume una sola vez y nunca se guarda completo. ``fileobj``
+    no necesita admitir seek: zipfile usa entonces descriptores de datos.
+    """
+
+    def __init__(self, fileobj, batch_rows: int = XLSX_BATCH_ROWS):
+        self._zip = zipfile.ZipFile(fileobj, mode="w", compression=zipfile.ZIP_DEFLATED)
+        self._sheets = []
+        self._used_titles = set()
+        self._batch_rows = max(1, batch_rows)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write_sheet(self, title: str, columns, rows) -> int:
+        """Escribe una hoja con encabezado ``columns``; devuelve las filas de datos."""
+        count = 0
+        for count in self.iter_sheet(title, columns, rows):
+            pass
+        return count
+
+    def iter_sheet(self, title: str, columns, rows):
+        """
+        Como write_sheet, pero genera las filas escritas hasta el momento
+        tras cada lote volcado a ``fileobj``, para que quien lo recorre pueda
+        entregar esos bytes antes de seguir.
+        """
+        name = _sheet_title(title, self._used_titles)
+        index = len(self._sheets) + 1
+        self._sheets.append(name)
+        letters = [column_letter(i) for i in range(len(columns))]
+        count = 0
+        with self._zip.open(f"xl/worksheets/sheet{index}.xml", mode="w", force_zip64=True) as member:
+            header = "".join(
+                f'<c r="{letter}1" t="inlineStr" s="{_STYLE_HEADER}"><is><t>{_text(column)}</t></is></c>'
+                for letter, column in zip(letters, columns)
+            )
+            member.write(f'{_SHEET_HEAD}<row r="1">{header}</row>'.encode())
+            pending = []
+            for count, row in enumerate(rows, start=1):
+                r = count + 1
+                cells = "".join(_cell(f"{letter}{r}", value) for letter, value in zip(letters, row))
+                pending.append(f'<row r="{r}">{cells}</row>')
+                if len(pending) >= self._batch_rows:
+                    member.write("".join(pending).encode())
+                    pending = []
+                    yield count
+            if pending:
+                member.write("".join(pending).encode())
+            member.write(_SHEET_TAIL.encode())
+        yield count
+
+    def close(self):
+        if self._zip is None:
+            return
+        if not self._sheets:
+            self.write_sheet("Hoja1", (), ())
+        sheets = range(1, len(self._sheets) + 1)
+        overrides = "".join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for i in sheets
+        )
+        self._zip.writestr(
+            "[Content_Types].xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            f'{overrides}</Types>',
+        )
+        self._zip.writestr(
+            "_rels/.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            f'<Relationships xmlns="{_NS_PKG_REL}">'
+            f'<Relationship Id="rId1" Type="{_NS_REL}/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>',
+        )
+        sheet_entries = "".join(
+            f'<sheet name="{escape(name, {chr(34): "&quot;"})}" sheetId="{i}" r:id="rId{i}"/>'
+            for i, name in zip(sheets, self._sheets)
+        )
+        self._zip.writestr(
+            "xl/workbook.xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            f'<workbook xmlns="{_NS_MAIN}" xmlns:r="{_NS_REL}"><sheets>{sheet_entries}</sheets></workbook>',
+        )
+        sheet_rels = "".join(
+            f'<Relationship Id="rId{i}" Type="{_NS_REL}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+            for i in sheets
+        )
+        styles_id = len(self._sheets) + 1
+        self._zip.writestr(
+            "xl/_rels/workbook.xml.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            f'<Relationships xmlns="{_NS_PKG_REL}">{sheet_rels}'
+            f'<Relationship Id="rId{styles_id}" Type="{_NS_REL}/styles" Target="styles.xml"/>'
+            '</Relationships>',
+        )
+        self._zip.writestr("xl/styles.xml", _STYLES)
+        self._zip.close()
+        self._zip = None
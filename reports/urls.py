@@ -6,10 +6,26 @@ app_name = 'reports'
 urlpatterns = [
     path('', views.report_list, name='report_list'),
     path('gantt/<int:project_id>/', views.gantt_chart, name='gantt_chart'),
+    path('gantt/<int:project_id>/data/', views.gantt_data, name='gantt_data'),
     path('progress/<int:project_id>/', views.progress_report, name='progress_report'),
     path('cost/<int:project_id>/', views.cost_report, name='cost_report'),
     path('status/<int:project_id>/', views.status_report, name='status_report'),
     path('calendar/<int:project_id>/', views.calendar_view, name='calendar_view'),
+    path('calendar/<int:project_id>/feed/', views.calendar_feed, name='calendar_feed'),
+    path('calendar/<int:project_id>/feed.ics', views.calendar_feed, {'export_format': 'ics'}, name='calendar_feed_ics'),
+    path(
+        'calendar/<int:project_id>/subscription/<str:token>/feed.ics',
+        views.calendar_subscription,
+        name='calendar_subscription',
+    ),
     path('performance/<int:project_id>/', views.performance_graphs, name='performance_graphs'),
     path('export/<int:project_id>/', views.export_csv, name='export_csv'),
+    path('export/<int:project_id>/xlsx/', views.export_xlsx, name='export_xlsx'),
+    path('export/portfolio/', views.portfolio_export, name='portfolio_export'),
+    path('jobs/', views.report_job_list, name='report_job_list'),
+    path('jobs/new/', views.report_job_create, name='report_job_create'),
+    path('jobs/<int:job_id>/', views.report_job_detail, name='report_job_detail'),
+    path('jobs/<int:job_id>/status/', views.report_job_status, name='report_job_status'),
+    path('jobs/<int:job_id>/download/', views.report_job_download, name='report_job_download'),
+    path('simulation/<int:project_id>/', views.risk_simulation, name='risk_simulation'),
 ]
\ No newline at end of file
@@ -1,13 +1,43 @@
+import hashlib
 import json
-from datetime import date, timedelta
+from datetime import date
 
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
-from django.shortcuts import get_object_or_404, render
-
-from projects.permissions import can_view_project, get_user_projects
-from projects.services import export_project_csv, parse_report_filters
-from projects.models import Project
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_date
+from django.utils.http import http_date
+from django.views.decorators.http import require_GET, require_POST
+
+from projects.permissions import can_edit_project, can_view_project
+from projects.calendar_feed import (
+    CALENDAR_VIEW,
+    calendar_events,
+    parse_feed_date,
+    render_ics,
+    subscription_token,
+    subscription_user,
+)
+from projects.exports import EXPORT_FORMATS, content_type_for, iter_portfolio_export, iter_xlsx
+from projects.jobs import ReportJobError, enqueue_report_job
+from projects.gantt import (
+    GANTT_VIEW,
+    MAX_WINDOW_ROWS,
+    WINDOW_ROWS,
+    gantt_cache_filters,
+    gantt_payload,
+    gantt_window,
+    today_offset,
+)
+from projects.portfolio import oldest_refresh, project_metrics
+from projects.reporting import build_status_report, cost_breakdown, progress_percent, status_histogram
+from projects.services import export_project_csv, filter_report_activities, filter_report_projects, parse_report_filters
+from projects.simulation import DEFAULT_ITERATIONS, MAX_ITERATIONS, simulate_project
+from projects.models import Project, ReportJob
+from projects.versioning import get_project_version_info, project_cache_key
 
 
 def _get_project_for_user(user, project_id):
@@ -17,218 +47,107 @@ def _get_project_for_user(user, project_id):
     return project
 
 
-def _filter_activities(project, filters):
-    activities = project.activity_set.all()
-    if filters.activity_status:
-        activities = activities.filter(status=filters.activity_status)
-    if filters.date_from:
-        activities = activities.filter(start_date__gte=filters.date_from)
-    if filters.date_to:
-        activities = activities.filter(end_date__lte=filters.date_to)
-    if filters.owner_id:
-        activities = activities.filter(assigned_to_id=filters.owner_id)
-    return activities.select_related("assigned_to")
-
-
 @login_required
 def report_list(request):
     filters = parse_report_filters(request.GET)
-    projects = get_user_projects(request.user)
-    if filters.project_status:
-        projects = projects.filter(status=filters.project_status)
-    if filters.owner_id:
-        projects = projects.filter(created_by_id=filters.owner_id)
-    return render(request, "reports/report_list.html", {"projects": projects, "filters": filters})
+    projects = filter_report_projects(request.user, filters)
+    projects_with_status = project_metrics(projects)
+    return render(
+        request,
+        "reports/report_list.html",
+        {
+            "projects": projects,
+            "projects_with_status": projects_with_status,
+            "metrics_refreshed_at": oldest_refresh(projects_with_status),
+            "filters": filters,
+        },
+    )
 
 
 @login_required
 def gantt_chart(request, project_id):
     project = _get_project_for_user(request.user, project_id)
     filters = parse_report_filters(request.GET)
-    activities = _filter_activities(project, filters)
-    milestones = project.milestone_set.all()
-
-    timeline_start = project.start_date
-    timeline_end = project.end_date
-
-    if activities.filter(start_date__isnull=False).exists():
-        activity_start = activities.exclude(start_date__isnull=True).order_by("start_date").first().start_date
-        if timeline_start is None or activity_start < timeline_start:
-            timeline_start = activity_start
-    if activities.filter(end_date__isnull=False).exists():
-        activity_end = activities.exclude(end_date__isnull=True).order_by("-end_date").first().end_date
-        if timeline_end is None or activity_end > timeline_end:
-            timeline_end = activity_end
-
-    total_days = max(((timeline_end - timeline_start).days + 1), 1) if timeline_start and timeline_end else 1
-    gantt_rows = []
-    month_markers = []
-    week_markers = []
-    milestone_markers = []
-    dependency_lines = []
-    today_offset = None
-    timeline_width_px = 960
-    timeline_height_px = 0
-
-    if timeline_start and timeline_end:
-        total_weeks = max((total_days + 6) // 7, 1)
-        timeline_width_px = max(total_weeks * 56, 960)
-        px_per_day = timeline_width_px / total_days
-        row_height = 60
-
-        current = timeline_start.replace(day=1)
-        while current <= timeline_end:
-            next_month = current.replace(year=current.year + (1 if current.month == 12 else 0), month=1 if current.month == 12 else current.month + 1, day=1)
-            marker_start = max(current, timeline_start)
-            marker_end = min(next_month, timeline_end)
-            offset_days = (marker_start - timeline_start).days
-            width_days = max((marker_end - marker_start).days, 1)
-            month_markers.append(
-                {
-                    "label": current.strftime("%b %Y"),
-                    "offset_px": round(offset_days * px_per_day, 2),
-                    "width_px": round(max(width_days * px_per_day, 72), 2),
-                }
-            )
-            current = next_month
-
-        week_cursor = timeline_start
-        week_index = 0
-        label_every = 1 if total_weeks <= 12 else (2 if total_weeks <= 24 else 4)
-        while week_cursor <= timeline_end:
-            offset_days = (week_cursor - timeline_start).days
-            width_days = min(7, (timeline_end - week_cursor).days + 1)
-            week_markers.append(
-                {
-                    "label": week_cursor.strftime("%d %b"),
-                    "offset_px": round(offset_days * px_per_day, 2),
-                    "width_px": round(max(width_days * px_per_day, 28), 2),
-                    "show_label": week_index % label_every == 0,
-                }
-            )
-            week_cursor = week_cursor + timedelta(days=7)
-            week_index += 1
-
-        today = date.today()
-        if timeline_start <= today <= timeline_end:
-            today_offset = round((today - timeline_start).days * px_per_day, 2)
-
-        activity_rows = list(activities)
-        critical_ids = set()
-        if activity_rows:
-            latest_activity = max(
-                (activity for activity in activity_rows if activity.end_date),
-                key=lambda activity: activity.end_date,
-                default=None,
-            )
-            while latest_activity:
-                critical_ids.add(latest_activity.pk)
-                latest_activity = latest_activity.predecessor
-
-        row_lookup = {}
-        for index, activity in enumerate(activity_rows):
-            if not activity.start_date or not activity.end_date:
-                continue
-            duration_days = max((activity.end_date - activity.start_date).days + 1, 1)
-            start_px = round((activity.start_date - timeline_start).days * px_per_day, 2)
-            width_px = round(max(duration_days * px_per_day, 24), 2)
-            finish_px = round(start_px + width_px, 2)
-            progress = 100 if activity.status == "completed" else (55 if activity.status == "in_progress" else 10)
-            row_center_y = round(index * row_height + (row_height / 2), 2)
-            row_lookup[activity.pk] = {
-                "start_px": start_px,
-                "finish_px": finish_px,
-                "center_y": row_center_y,
-            }
-            gantt_rows.append(
-                {
-                    "id": activity.pk,
-                    "row_index": index,
-                    "name": activity.name,
-                    "status": activity.get_status_display(),
-                    "owner": activity.assigned_to.get_full_name() if activity.assigned_to else "Sin responsable",
-                    "start_date": activity.start_date,
-                    "end_date": activity.end_date,
-                    "offset_px": start_px,
-                    "width_px": width_px,
-                    "duration_days": duration_days,
-                    "progress": progress,
-                    "bar_class": (
-                        "is-complete"
-                        if activity.status == "completed"
-                        else ("is-active" if activity.status == "in_progress" else "is-pending")
-                    ),
-                    "predecessor": activity.predecessor.name if activity.predecessor else "",
-                    "predecessor_id": activity.predecessor_id,
-                    "is_critical": activity.pk in critical_ids,
-                }
-            )
-
-        timeline_height_px = max(len(gantt_rows) * row_height, row_height)
-
-        for row in gantt_rows:
-            predecessor_id = row["predecessor_id"]
-            if predecessor_id and predecessor_id in row_lookup and row["id"] in row_lookup:
-                source = row_lookup[predecessor_id]
-                target = row_lookup[row["id"]]
-                dependency_lines.append(
-                    {
-                        "path": (
-                            f"M {source['finish_px']} {source['center_y']} "
-                            f"L {source['finish_px'] + 18} {source['center_y']} "
-                            f"L {source['finish_px'] + 18} {target['center_y']} "
-                            f"L {max(target['start_px'] - 8, source['finish_px'] + 18)} {target['center_y']}"
-                        ),
-                        "is_critical": row["is_critical"] and predecessor_id in critical_ids,
-                    }
-                )
-
-        for milestone in milestones:
-            if not milestone.due_date:
-                continue
-            milestone_markers.append(
-                {
-                    "name": milestone.name,
-                    "date": milestone.due_date,
-                    "offset_px": round((milestone.due_date - timeline_start).days * px_per_day, 2),
-                    "completed": milestone.completed,
-                }
-            )
-
+    payload = gantt_payload(project, filters)
+    # Solo la primera ventana se dibuja en el servidor; el resto lo pide el
+    # renderizador virtualizado a gantt_data a medida que se desplaza
+    window = gantt_window(payload, 0, WINDOW_ROWS)
+    data_query = request.GET.copy()
+    for key in ("offset", "limit", "window_start", "window_end"):
+        data_query.pop(key, None)
     return render(
         request,
         "reports/gantt.html",
         {
             "project": project,
-            "activities": activities,
-            "milestones": milestones,
+            # Querysets perezosos: solo consultan si el template los recorre
+            "activities": filter_report_activities(project, filters),
+            "milestones": project.milestone_set.all(),
             "filters": filters,
-            "gantt_rows": gantt_rows,
-            "month_markers": month_markers,
-            "week_markers": week_markers,
-            "milestone_markers": milestone_markers,
-            "dependency_lines": dependency_lines,
-            "today_offset": today_offset,
-            "timeline_width_px": timeline_width_px,
-            "timeline_height_px": timeline_height_px,
-            "timeline_start": timeline_start,
-            "timeline_end": timeline_end,
+            **payload,
+            "window": window,
+            "window_rows": WINDOW_ROWS,
+            "data_querystring": data_query.urlencode(),
+            "today_offset": today_offset(payload),
         },
     )
 
 
+def _int_param(params, name, default, minimum, maximum):
+    try:
+        value = int(params.get(name, default))
+    except (TypeError, ValueError):
+        value = default
+    return max(minimum, min(value, maximum))
+
+
+@login_required
+def gantt_data(request, project_id):
+    """
+    Geometría del Gantt en JSON por ventanas: ``offset``/``limit`` recortan
+    filas y ``window_start``/``window_end`` (AAAA-MM-DD) el rango de fechas.
+    Responde 304 si el ETag (versión de datos + filtros + ventana) no cambió.
+    """
+    project = _get_project_for_user(request.user, project_id)
+    filters = parse_report_filters(request.GET)
+    offset = _int_param(request.GET, "offset", 0, 0, 10**9)
+    limit = _int_param(request.GET, "limit", WINDOW_ROWS, 1, MAX_WINDOW_ROWS)
+    try:
+        window_start = parse_date(request.GET.get("window_start", ""))
+        window_end = parse_date(request.GET.get("window_end", ""))
+    except ValueError:
+        window_start = window_end = None
+
+    today = date.today()
+    key = project_cache_key(project.pk, GANTT_VIEW, gantt_cache_filters(filters))
+    raw = f"{key}:{offset}:{limit}:{window_start}:{window_end}:{today}"
+    etag = f'"{hashlib.sha1(raw.encode()).hexdigest()}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        payload = gantt_payload(project, filters)
+        data = gantt_window(payload, offset, limit, window_start, window_end)
+        data["today_offset"] = today_offset(payload, today)
+        response = JsonResponse(data)
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
 @login_required
 def progress_report(request, project_id):
     project = _get_project_for_user(request.user, project_id)
     filters = parse_report_filters(request.GET)
-    activities = _filter_activities(project, filters)
-    completed = activities.filter(status="completed").count()
-    total = activities.count()
-    progress = (completed / total * 100) if total > 0 else 0
+    histogram = status_histogram(filter_report_activities(project, filters))
     return render(
         request,
         "reports/progress_report.html",
-        {"project": project, "progress": progress, "completed": completed, "total": total, "filters": filters},
+        {
+            "project": project,
+            "progress": progress_percent(histogram),
+            "completed": histogram["completed"],
+            "total": sum(histogram.values()),
+            "filters": filters,
+        },
     )
 
 
@@ -236,12 +155,17 @@ def progress_report(request, project_id):
 def cost_report(request, project_id):
     project = _get_project_for_user(request.user, project_id)
     filters = parse_report_filters(request.GET)
-    activities = _filter_activities(project, filters)
-    total_cost = sum(activity.cost or 0 for activity in activities)
+    breakdown = cost_breakdown(filter_report_activities(project, filters))
     return render(
         request,
         "reports/cost_report.html",
-        {"project": project, "activities": activities, "total_cost": total_cost, "filters": filters},
+        {
+            "project": project,
+            "activities": breakdown.rows,
+            "owners": breakdown.owners,
+            "total_cost": breakdown.total_cost,
+            "filters": filters,
+        },
     )
 
 
@@ -249,62 +173,57 @@ def cost_report(request, project_id):
 def export_csv(request, project_id):
     project = _get_project_for_user(request.user, project_id)
     filters = parse_report_filters(request.GET)
-    activities = _filter_activities(project, filters)
+    activities = filter_report_activities(project, filters)
     return export_project_csv(project, activities)
 
 
 @login_required
-def status_report(request, project_id):
+def export_xlsx(request, project_id):
+    """Libro XLSX del proyecto: actividades, recursos y seguimientos en hojas tipadas."""
     project = _get_project_for_user(request.user, project_id)
-    filters = parse_report_filters(request.GET)
-    activities = _filter_activities(project, filters)
-    completed = activities.filter(status="completed").count()
-    total = activities.count()
-    progress = (completed / total * 100) if total > 0 else 0
+    response = StreamingHttpResponse(
+        iter_xlsx(Project.objects.filter(pk=project.pk)), content_type=content_type_for("xlsx")
+    )
+    response["Content-Disposition"] = f'attachment; filename="{project.name}_report.xlsx"'
+    return response
 
-    planned_cost = sum(activity.cost or 0 for activity in activities)
-    actual_cost = planned_cost + sum((resource.total_cost or 0) for activity in activities for resource in activity.resource_set.all())
-    cost_difference = actual_cost - planned_cost
 
-    today = date.today()
-    planned_days = (project.end_date - project.start_date).days if project.end_date and project.start_date else 0
-    actual_days = (today - project.start_date).days if project.start_date else 0
-    time_difference = actual_days - planned_days
-
-    activity_data = []
-    for activity in activities:
-        act_planned_days = (activity.end_date - activity.start_date).days if activity.end_date and activity.start_date else 0
-        act_actual_days = (today - activity.start_date).days if activity.start_date else 0
-        act_time_diff = act_actual_days - act_planned_days
-        activity_data.append(
-            {
-                "name": activity.name,
-                "status": activity.status,
-                "progress": 100 if activity.status == "completed" else 0,
-                "planned_cost": activity.cost or 0,
-                "actual_cost": (activity.cost or 0) + sum(resource.total_cost or 0 for resource in activity.resource_set.all()),
-                "cost_diff": sum(resource.total_cost or 0 for resource in activity.resource_set.all()),
-                "planned_days": act_planned_days,
-                "actual_days": act_actual_days,
-                "time_diff": act_time_diff,
-            }
-        )
+@login_required
+def portfolio_export(request):
+    """
+    Exportación de todos los proyectos visibles (con los filtros del listado
+    de reportes) como ZIP de CSV por entidad, NDJSON o XLSX, generada al vuelo.
+    """
+    filters = parse_report_filters(request.GET)
+    export_format = filters.export_format if filters.export_format in EXPORT_FORMATS else "zip"
+    projects = filter_report_projects(request.user, filters)
+    response = StreamingHttpResponse(
+        iter_portfolio_export(projects, export_format), content_type=content_type_for(export_format)
+    )
+    response["Content-Disposition"] = f'attachment; filename="cartera_{date.today():%Y%m%d}.{export_format}"'
+    return response
+
 
+@login_required
+def status_report(request, project_id):
+    project = _get_project_for_user(request.user, project_id)
+    filters = parse_report_filters(request.GET)
+    report = build_status_report(project, filter_report_activities(project, filters))
     return render(
         request,
         "reports/status_report.html",
         {
             "project": project,
-            "progress": progress,
-            "completed": completed,
-            "total": total,
-            "planned_cost": planned_cost,
-            "actual_cost": actual_cost,
-            "cost_difference": cost_difference,
-            "planned_days": planned_days,
-            "actual_days": actual_days,
-            "time_difference": time_difference,
-            "activities": activity_data,
+            "progress": report.progress,
+            "completed": report.completed,
+            "total": report.total,
+            "planned_cost": report.planned_cost,
+            "actual_cost": report.actual_cost,
+            "cost_difference": report.cost_difference,
+            "planned_days": report.planned_days,
+            "actual_days": report.actual_days,
+            "time_difference": report.time_difference,
+            "activities": report.activities,
             "filters": filters,
         },
     )
@@ -314,51 +233,186 @@ def status_report(request, project_id):
 def calendar_view(request, project_id):
     project = _get_project_for_user(request.user, project_id)
     filters = parse_report_filters(request.GET)
-    activities = _filter_activities(project, filters)
-    milestones = project.milestone_set.all()
-
-    events = []
-    for activity in activities:
-        if activity.start_date:
-            events.append(
-                {
-                    "title": f"Actividad: {activity.name}",
-                    "start": activity.start_date.isoformat(),
-                    "end": activity.end_date.isoformat() if activity.end_date else None,
-                    "backgroundColor": "#007bff",
-                    "borderColor": "#0056b3",
-                }
-            )
-    for milestone in milestones:
-        if milestone.due_date:
-            events.append(
-                {
-                    "title": f"Hito: {milestone.name}",
-                    "start": milestone.due_date.isoformat(),
-                    "backgroundColor": "#dc3545",
-                    "borderColor": "#a71d2a",
-                }
-            )
+    return render(
+        request,
+        "reports/calendar.html",
+        {
+            "project": project,
+            "filters": filters,
+            "feed_params": {"activity_status": filters.activity_status, "owner_id": filters.owner_id},
+            "subscription_url": request.build_absolute_uri(
+                reverse("reports:calendar_subscription", args=[project.pk, subscription_token(request.user, project.pk)])
+            ),
+        },
+    )
 
-    return render(request, "reports/calendar.html", {"project": project, "events": json.dumps(events) if events else "[]", "filters": filters})
+
+@login_required
+def calendar_feed(request, project_id, export_format="json"):
+    """
+    Eventos del calendario para la ventana ``start``/``end`` (la envía el
+    widget al navegar) en JSON o, con la URL .ics, en iCalendar. Responde
+    304 según el ETag (versión de datos + filtros + ventana) o la fecha de
+    la última modificación del proyecto.
+    """
+    project = _get_project_for_user(request.user, project_id)
+    return _calendar_response(request, project, export_format)
+
+
+@require_GET
+def calendar_subscription(request, project_id, token):
+    """
+    iCalendar del proyecto para clientes de suscripción, que no tienen
+    sesión: el usuario sale del token firmado de la URL.
+    """
+    user = subscription_user(token, project_id)
+    if user is None:
+        raise Http404
+    project = _get_project_for_user(user, project_id)
+    return _calendar_response(request, project, "ics")
+
+
+def _calendar_response(request, project, export_format):
+    filters = parse_report_filters(request.GET)
+    start = parse_feed_date(request.GET.get("start"))
+    end = parse_feed_date(request.GET.get("end"))
+
+    version, updated_at = get_project_version_info(project.pk)
+    key = project_cache_key(project.pk, CALENDAR_VIEW, filters, version=version)
+    etag = f'"{hashlib.sha1(f"{key}:{export_format}:{start}:{end}".encode()).hexdigest()}"'
+    last_modified = int(updated_at.timestamp()) if updated_at else None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        events = calendar_events(project, filters, start, end)
+        if export_format == "ics":
+            response = HttpResponse(
+                render_ics(project, events, stamp=updated_at, domain=request.get_host()),
+                content_type="text/calendar; charset=utf-8",
+            )
+            response["Content-Disposition"] = f'inline; filename="proyecto_{project.pk}.ics"'
+        else:
+            response = JsonResponse(events, safe=False)
+    response["ETag"] = etag
+    if updated_at:
+        response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
 @login_required
 def performance_graphs(request, project_id):
     project = _get_project_for_user(request.user, project_id)
     filters = parse_report_filters(request.GET)
-    activities = _filter_activities(project, filters)
+    activities = filter_report_activities(project, filters)
+    breakdown = cost_breakdown(activities)
+    return render(
+        request,
+        "reports/performance_graphs.html",
+        {
+            "project": project,
+            "status_data": status_histogram(activities),
+            "cost_data": json.dumps(breakdown.series),
+            "cost_labels": json.dumps(breakdown.labels),
+            "filters": filters,
+        },
+    )
 
-    status_data = {
-        "pending": activities.filter(status="pending").count(),
-        "in_progress": activities.filter(status="in_progress").count(),
-        "completed": activities.filter(status="completed").count(),
-    }
-    cost_data = [float(activity.cost) if activity.cost else 0 for activity in activities]
-    cost_labels = [activity.name for activity in activities]
 
+@login_required
+def risk_simulation(request, project_id):
+    project = _get_project_for_user(request.user, project_id)
+    try:
+        iterations = int(request.GET.get("iterations", DEFAULT_ITERATIONS))
+    except ValueError:
+        iterations = DEFAULT_ITERATIONS
+    iterations = max(1, min(iterations, MAX_ITERATIONS))
+    seed = request.GET.get("seed")
+    seed = int(seed) if seed and seed.isdigit() else None
+    result = simulate_project(project, iterations=iterations, seed=seed)
     return render(
         request,
-        "reports/performance_graphs.html",
-        {"project": project, "status_data": status_data, "cost_data": json.dumps(cost_data), "cost_labels": json.dumps(cost_labels), "filters": filters},
+        "reports/risk_simulation.html",
+        {
+            "project": project,
+            "result": result,
+            "iterations": iterations,
+            "seed": seed,
+            "max_iterations": MAX_ITERATIONS,
+            "finish_histogram": json.dumps([[label.isoformat() if label else "", count] for label, count in result.finish_histogram]),
+            "cost_histogram": json.dumps([[float(label), count] for label, count in result.cost_histogram]),
+        },
     )
+
+
+# ── Trabajos de reportes en segundo plano ────────────────────────────────
+
+JOB_PARAM_NAMES = ("project_status", "activity_status", "owner_id", "date_from", "date_to", "export_format", "from_live")
+
+
+def _get_job_for_user(user, job_id):
+    job = get_object_or_404(ReportJob.objects.select_related("project"), pk=job_id)
+    if job.requested_by_id != user.id:
+        raise PermissionDenied
+    return job
+
+
+def _job_status(job):
+    return {
+        "id": job.pk,
+        "kind": job.kind,
+        "state": job.state,
+        "state_display": job.get_state_display(),
+        "progress": job.progress,
+        "message": job.message,
+        "error": job.error,
+        "finished": job.is_finished,
+        "download_url": reverse("reports:report_job_download", args=[job.pk]) if job.result else None,
+    }
+
+
+@login_required
+def report_job_list(request):
+    jobs = ReportJob.objects.filter(requested_by=request.user).select_related("project")[:50]
+    return render(request, "reports/report_job_list.html", {"jobs": jobs})
+
+
+@login_required
+@require_POST
+def report_job_create(request):
+    """Encola un reporte pesado; lo ejecuta el comando run_report_worker."""
+    kind = request.POST.get("kind", "")
+    project = None
+    if request.POST.get("project_id"):
+        project = _get_project_for_user(request.user, request.POST["project_id"])
+        if kind == "recalculate_seguimientos" and not can_edit_project(request.user, project):
+            raise PermissionDenied
+    params = {name: request.POST[name] for name in JOB_PARAM_NAMES if request.POST.get(name)}
+    try:
+        if kind in ("status_report", "recalculate_seguimientos") and project is None:
+            raise ReportJobError("Este reporte requiere un proyecto.")
+        job = enqueue_report_job(kind, request.user, project=project, params=params)
+    except ReportJobError as exc:
+        return HttpResponseBadRequest(str(exc))
+    return redirect("reports:report_job_detail", job_id=job.pk)
+
+
+@login_required
+def report_job_detail(request, job_id):
+    job = _get_job_for_user(request.user, job_id)
+    return render(request, "reports/report_job_detail.html", {"job": job, "status": _job_status(job)})
+
+
+@login_required
+def report_job_status(request, job_id):
+    job = _get_job_for_user(request.user, job_id)
+    response = JsonResponse(_job_status(job))
+    patch_cache_control(response, private=True, no_store=True)
+    return response
+
+
+@login_required
+def report_job_download(request, job_id):
+    job = _get_job_for_user(request.user, job_id)
+    if job.state != "succeeded" or not job.result:
+        raise Http404("El trabajo no tiene un archivo disponible.")
+    return FileResponse(job.result.open("rb"), as_attachment=True, filename=job.result_name or None)
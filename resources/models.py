@@ -1,7 +1,91 @@
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
 from decimal import Decimal
 from projects.models import Activity
 
+
+def refresh_activity_totals(activity_ids):
+    """
+    Recalcula Activity.resources_total (y sincroniza Activity.cost) para las
+    actividades indicadas con dos UPDATE, sin cargar instancias.
+    """
+    from projects.evm import MONEY_FIELD, resources_sum_subquery
+
+    activity_ids = {pk for pk in activity_ids if pk}
+    if not activity_ids:
+        return 0
+    activities = Activity.objects.filter(pk__in=activity_ids)
+    updated = activities.update(
+        resources_total=Coalesce(resources_sum_subquery(), Value(Decimal('0')), output_field=MONEY_FIELD)
+    )
+    # Mismo criterio que update_cost_from_resources: solo si hay recursos con costo
+    activities.filter(resources_total__gt=0).update(cost=F('resources_total'))
+    # Las operaciones masivas no emiten señales: versión e indicadores se actualizan aquí
+    from projects.gantt import schedule_gantt_prewarm
+    from projects.portfolio import schedule_metrics_refresh
+    from projects.versioning import bump_project_version
+
+    for project_id in set(activities.values_list('project_id', flat=True)):
+        bump_project_version(project_id)
+        schedule_metrics_refresh(project_id)
+        schedule_gantt_prewarm(project_id)
+    return updated
+
+
+class ResourceQuerySet(models.QuerySet):
+    """
+    Mantiene Activity.resources_total también en operaciones masivas, que no
+    pasan por Resource.save()/Resource.delete().
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.total_cost = obj.compute_total_cost()
+        created = super().bulk_create(objs, *args, **kwargs)
+        refresh_activity_totals(obj.activity_id for obj in objs)
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        fields = list(fields)
+        previous = set(
+            self.model.objects.filter(pk__in=[obj.pk for obj in objs]).values_list('activity_id', flat=True)
+        )
+        if {'quantity', 'cost_per_unit'} & set(fields):
+            for obj in objs:
+                obj.total_cost = obj.compute_total_cost()
+            if 'total_cost' not in fields:
+                fields.append('total_cost')
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        refresh_activity_totals(previous | {obj.activity_id for obj in objs})
+        return rows
+
+    def update(self, **kwargs):
+        pks = list(self.values_list('pk', flat=True))
+        affected = set(self.values_list('activity_id', flat=True))
+        rows = super().update(**kwargs)
+        changed = self.model.objects.filter(pk__in=pks)
+        if {'quantity', 'cost_per_unit'} & set(kwargs):
+            models.QuerySet.update(changed, total_cost=F('quantity') * F('cost_per_unit'))
+        if {'activity', 'activity_id'} & set(kwargs):
+            affected |= set(changed.values_list('activity_id', flat=True))
+        refresh_activity_totals(affected)
+        return rows
+
+    update.alters_data = True
+
+    def delete(self):
+        affected = set(self.values_list('activity_id', flat=True))
+        result = super().delete()
+        refresh_activity_totals(affected)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Resource(models.Model):
     TYPE_CHOICES = [
         ('human', 'Humano'),
@@ -18,22 +102,35 @@ class Resource(models.Model):
     total_cost = models.DecimalField(max_digits=10, decimal_places=2, editable=False, verbose_name='Costo Total')
     description = models.TextField(blank=True, verbose_name='Descripción')
 
-    def save(self, *args, **kwargs):
+    objects = ResourceQuerySet.as_manager()
+
+    def compute_total_cost(self):
         # Defensa contra tipos incorrectos (ej. strings de serialize_form_data)
         # Django no convierte field values automáticamente en __init__ con kwargs
         qty = int(self.quantity) if not isinstance(self.quantity, int) else self.quantity
         cpu = Decimal(str(self.cost_per_unit)) if not isinstance(self.cost_per_unit, Decimal) else self.cost_per_unit
-        self.total_cost = qty * cpu
+        return qty * cpu
+
+    def save(self, *args, **kwargs):
+        self.total_cost = self.compute_total_cost()
+        previous_activity_id = None
+        if self.pk:
+            previous_activity_id = (
+                Resource.objects.filter(pk=self.pk).values_list('activity_id', flat=True).first()
+            )
         super().save(*args, **kwargs)
-        # Mantener sincronizado el costo de la actividad padre
+        # Mantener sincronizado el costo de la actividad padre (y la anterior si cambió)
+        if previous_activity_id and previous_activity_id != self.activity_id:
+            refresh_activity_totals([previous_activity_id])
         if self.activity_id:
             self.activity.update_cost_from_resources()
 
     def delete(self, *args, **kwargs):
         act = self.activity
-        super().delete(*args, **kwargs)
+        result = super().delete(*args, **kwargs)
         if act:
             act.update_cost_from_resources()
+        return result
 
     def __str__(self):
         activity_name = self.activity.name if self.activity else "Sin actividad"
@@ -1,13 +1,18 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from projects.pagination import paginate_keyset
 from projects.permissions import can_edit_project, get_user_projects, is_jefe_departamental
 from .models import Resource
 from .forms import ResourceForm
 
 @login_required
 def resource_list(request):
-    resources = Resource.objects.filter(activity__project__in=get_user_projects(request.user)).select_related("activity", "activity__project")
+    resources = paginate_keyset(
+        request,
+        Resource.objects.filter(activity__project__in=get_user_projects(request.user)).select_related("activity", "activity__project"),
+        "name",
+    )
     return render(request, 'resources/resource_list.html', {'resources': resources})
 
 @login_required
@@ -1,13 +1,17 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from projects.pagination import paginate_keyset
 from projects.permissions import can_edit_project, can_view_project, get_user_projects
 from .models import Risk
 from .forms import RiskForm
 
 @login_required
 def risk_list(request):
-    risks = Risk.objects.filter(project__in=get_user_projects(request.user)).select_related("project")
+    risks = paginate_keyset(
+        request, Risk.objects.filter(project__in=get_user_projects(request.user)).select_related("project"),
+        "-identified_date",
+    )
     return render(request, 'risks/risk_list.html', {'risks': risks})
 
 @login_required
@@ -1,6 +1,7 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from projects.pagination import paginate_keyset
 from projects.permissions import can_view_project, can_edit_project, get_user_projects, is_jefe_departamental
 from .models import Stakeholder, Feedback
 from .forms import FeedbackForm, StakeholderForm
@@ -8,7 +9,7 @@ from .forms import FeedbackForm, StakeholderForm
 @login_required
 def stakeholder_list(request):
     projects = get_user_projects(request.user)
-    stakeholders = Stakeholder.objects.filter(projects__in=projects).distinct()
+    stakeholders = paginate_keyset(request, Stakeholder.objects.filter(projects__in=projects).distinct(), "name")
     return render(request, 'stakeholders/stakeholder_list.html', {'stakeholders': stakeholders})
 
 @login_required
@@ -58,7 +59,9 @@ def stakeholder_delete(request, pk):
 @login_required
 def feedback_list(request):
     projects = get_user_projects(request.user)
-    feedbacks = Feedback.objects.filter(project__in=projects).select_related("project", "stakeholder")
+    feedbacks = paginate_keyset(
+        request, Feedback.objects.filter(project__in=projects).select_related("project", "stakeholder"), "-created_at"
+    )
     return render(request, 'stakeholders/feedback_list.html', {'feedbacks': feedbacks})
 
 @login_required
@@ -154,6 +154,33 @@ class EVMCurvesViewTest(TestCase):
         self.assertEqual(response.context['project'], self.project)
         self.assertIn('can_edit', response.context)
 
+    def test_evm_curves_curve_data_is_continuous_daily_series(self):
+        """curve_data_json cubre todo el proyecto día a día (proyecto de 90 días)."""
+        response = self.client.get(self.url)
+        curve = json.loads(response.context['curve_data_json'])
+        self.assertEqual(response.context['granularity'], 'daily')
+        self.assertEqual(curve['labels'][0], self.project.start_date.isoformat())
+        self.assertEqual(curve['labels'][-1], self.project.end_date.isoformat())
+        self.assertEqual(len(curve['labels']), 91)
+        for key in ('pv', 'ev', 'ac', 'snapshot_pv', 'snapshot_ev', 'snapshot_ac'):
+            self.assertEqual(len(curve[key]), 91)
+
+    def test_evm_curves_curve_matches_seguimiento_snapshots(self):
+        """En la fecha de un seguimiento la curva coincide con el valor guardado."""
+        self._create_activity('A1', end_offset=-5, cost=2000,
+                              status='completed', actual_cost=1800,
+                              actual_end_offset=-2)
+        self._create_activity('A2', end_offset=10, cost=1000)
+        self._create_seguimiento(0)
+        response = self.client.get(self.url + '?granularity=weekly')
+        curve = json.loads(response.context['curve_data_json'])
+        index = curve['labels'].index(self.today.isoformat())
+        self.assertEqual(curve['pv'][index], 2000.0)
+        self.assertEqual(curve['ev'][index], 2000.0)
+        self.assertEqual(curve['ac'][index], 1800.0)
+        self.assertEqual(curve['snapshot_ev'][index], 2000.0)
+        self.assertEqual(curve['pv'][-1], 3000.0)
+
     # ── Financial Summary ────────────────────────────────────────────
 
     def test_financial_summary_returns_200(self):
@@ -202,3 +229,17 @@ class EVMCurvesViewTest(TestCase):
         # budget = 30000, activities_cost = 15000
         # variance = 30000 - 15000 = 15000
         self.assertEqual(response.context['variance'], Decimal('15000.00'))
+
+    def test_evm_curves_and_financial_summary_include_forecast(self):
+        self._create_activity('A', -5, 1000, status='completed', actual_cost=1250, actual_end_offset=-5)
+        self._create_activity('B', 30, 1000)
+        self._create_seguimiento(0)
+        response = self.client.get(self.url)
+        forecast = response.context['forecast']
+        self.assertEqual(forecast.eac_cpi, Decimal('2500'))
+        self.assertIs(response.context['seguimientos'][0].forecast, forecast)
+        self.assertContains(response, 'EAC (CPI x SPI)')
+
+        response = self.client.get(reverse('project_financial_summary', args=[self.project.pk]))
+        self.assertEqual(response.context['forecast'].eac_cpi, Decimal('2500'))
+        self.assertContains(response, 'Pronostico EVM')
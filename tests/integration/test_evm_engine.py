@@ -0,0 +1,183 @@
+"""
+Integration tests for the set-based EVM engine (projects.evm).
+
+Compara el motor agregado contra la implementación original (un agregado
+de recursos por actividad) sobre el dataset de populate_test_data.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+
+from projects.evm import (
+    EVMTimeSeries, compute_cut_metrics, compute_project_evm, compute_snapshot_evm, date_grid,
+)
+from projects.models import Project, ProjectMetrics, Seguimiento
+from projects.services import compare_seguimientos, generate_project_cuts, recalculate_project_seguimientos
+from projects.versioning import get_project_version
+from resources.models import Resource
+
+
+def reference_planned_cost(activity):
+    """Costo planificado original: agregado de recursos por actividad, con fallback a cost."""
+    res = Resource.objects.filter(activity=activity).aggregate(total=Sum('total_cost'))['total'] or 0
+    if res:
+        return res
+    return activity.cost or 0
+
+
+def reference_evm(project, fecha):
+    """Implementación original de Seguimiento.calculate_metrics (actividad por actividad)."""
+    activities = project.activity_set.all()
+    pv = Decimal(str(sum(reference_planned_cost(a) for a in activities.filter(end_date__lte=fecha))))
+    ev_set = (
+        activities.filter(status='completed', actual_end_date__lte=fecha)
+        | activities.filter(status='completed', actual_end_date__isnull=True, end_date__lte=fecha)
+    ).distinct()
+    ev = Decimal(str(sum(reference_planned_cost(a) for a in ev_set)))
+    ac = sum((a.total_actual_cost for a in ev_set), Decimal('0'))
+    return pv, ev, ac
+
+
+class EVMEngineDatasetTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('populate_test_data', stdout=StringIO())
+
+    def _cutoff_dates(self, project):
+        fechas = set(project.seguimiento_set.values_list('fecha', flat=True))
+        fechas.update({project.start_date, project.end_date, project.end_date + timedelta(days=30)})
+        for activity in project.activity_set.all():
+            fechas.add(activity.end_date)
+            if activity.actual_end_date:
+                fechas.add(activity.actual_end_date)
+        return sorted(fechas)
+
+    def test_engine_matches_reference_for_every_project_and_cutoff(self):
+        for project in Project.objects.all():
+            for fecha in self._cutoff_dates(project):
+                with self.subTest(project=project.name, fecha=fecha):
+                    metrics = compute_project_evm(project, fecha)
+                    pv, ev, ac = reference_evm(project, fecha)
+                    self.assertEqual(metrics.pv, pv)
+                    self.assertEqual(metrics.ev, ev)
+                    self.assertEqual(metrics.ac, ac)
+
+    def test_stored_seguimientos_are_unchanged_after_recalculation(self):
+        # populate_test_data actualiza fechas reales DESPUÉS de crear los
+        # seguimientos: re-guardarlos no debe recalcular contra el estado vivo
+        for seguimiento in Seguimiento.objects.select_related('proyecto'):
+            with self.subTest(seguimiento=seguimiento.pk):
+                stored = (seguimiento.pv, seguimiento.ev, seguimiento.ac)
+                frozen = compute_snapshot_evm(seguimiento.snapshots.all(), seguimiento.fecha)
+                self.assertEqual(stored, (frozen.pv, frozen.ev, frozen.ac))
+                seguimiento.save()
+                seguimiento.refresh_from_db()
+                self.assertEqual((seguimiento.pv, seguimiento.ev, seguimiento.ac), stored)
+
+    def test_calculate_metrics_uses_a_single_query(self):
+        seguimiento = Seguimiento.objects.select_related('proyecto').first()
+        with self.assertNumQueries(1):
+            seguimiento.calculate_metrics()
+
+    def test_time_series_matches_aggregate_engine(self):
+        for project in Project.objects.all():
+            series = EVMTimeSeries.for_project(project)
+            for fecha in self._cutoff_dates(project):
+                with self.subTest(project=project.name, fecha=fecha):
+                    self.assertEqual(series.at(fecha), compute_project_evm(project, fecha))
+
+    def test_time_series_loads_activities_once(self):
+        project = Project.objects.get(name__startswith='Proyecto Ejemplo B')
+        fechas = date_grid(project.start_date, project.end_date)
+        with self.assertNumQueries(1):
+            points = EVMTimeSeries.for_project(project).series(fechas)
+        self.assertEqual(len(points), len(fechas))
+        self.assertEqual(points[0].pv, Decimal('0'))
+
+    def test_cut_metrics_match_project_cut_properties(self):
+        for project in Project.objects.all():
+            for interval in (7, 90):
+                cuts = generate_project_cuts(project, interval_days=interval)
+                batch = compute_cut_metrics(project, cuts)
+                for cut in cuts:
+                    with self.subTest(project=project.name, interval=interval, cut=cut.name):
+                        metrics = batch[cut.pk]
+                        self.assertEqual(metrics.planned_count, cut.planned_count)
+                        self.assertEqual(metrics.completed_count, cut.completed_count)
+                        self.assertEqual(metrics.pv, cut.pv)
+                        self.assertEqual(metrics.ev, cut.ev)
+                        self.assertEqual(metrics.ac, cut.ac)
+                        self.assertEqual(metrics.spi, cut.spi)
+                        self.assertEqual(metrics.cpi, cut.cpi)
+                        self.assertEqual(metrics.has_any_tracking, cut.has_any_tracking)
+                        self.assertEqual(metrics.progress_percentage, cut.progress_percentage)
+                        self.assertEqual(metrics.status, cut.status)
+                        self.assertEqual(
+                            [a.pk for a in metrics.activities],
+                            list(cut.activities_in_period.order_by('end_date', 'pk').values_list('pk', flat=True)),
+                        )
+
+    def test_cut_metrics_use_a_single_query(self):
+        project = Project.objects.get(name__startswith='Proyecto Ejemplo B')
+        cuts = generate_project_cuts(project, interval_days=7)
+        with self.assertNumQueries(1):
+            compute_cut_metrics(project, cuts)
+
+    def test_recalculate_command_reports_no_drift_on_consistent_data(self):
+        out = StringIO()
+        call_command('recalculate_evm', workers=1, dry_run=True, stdout=out)
+        self.assertIn('Con desvío: 0', out.getvalue())
+        self.assertIn('Sin instantánea (omitidos): 0', out.getvalue())
+
+    def test_recalculate_command_repairs_drift_from_snapshots(self):
+        seguimiento = Seguimiento.objects.filter(ev__gt=0).order_by('proyecto', '-fecha').first()
+        seguimiento = seguimiento.proyecto.seguimiento_set.order_by('-fecha', '-pk').first()
+        expected = (seguimiento.pv, seguimiento.ev, seguimiento.ac, seguimiento.spi)
+        Seguimiento.objects.filter(pk=seguimiento.pk).update(ev=0, spi=0)
+        version = get_project_version(seguimiento.proyecto_id)
+
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('recalculate_evm', workers=1, project=[seguimiento.proyecto_id], stdout=out)
+        self.assertIn('Con desvío: 1', out.getvalue())
+        self.assertIn(f'EV: máximo {expected[1]}', out.getvalue())
+        seguimiento.refresh_from_db()
+        self.assertEqual((seguimiento.pv, seguimiento.ev, seguimiento.ac, seguimiento.spi), expected)
+        # bulk_update no emite señales: versión e indicadores se marcan en el recálculo
+        self.assertGreater(get_project_version(seguimiento.proyecto_id), version)
+        self.assertEqual(ProjectMetrics.objects.get(project_id=seguimiento.proyecto_id).latest_spi, expected[3])
+
+    def test_recalculate_from_live_matches_engine_and_refreezes_latest(self):
+        project = Project.objects.filter(seguimiento__isnull=False).distinct().first()
+        *older, latest = project.seguimiento_set.order_by('fecha', 'pk')
+        frozen = {
+            seguimiento.pk: sorted(seguimiento.snapshots.values_list('activity_id', 'status', 'actual_end_date'))
+            for seguimiento in older
+        }
+        call_command('recalculate_evm', workers=1, project=[project.pk], from_live=True, stdout=StringIO())
+        for seguimiento in project.seguimiento_set.all():
+            with self.subTest(seguimiento=seguimiento.pk):
+                live = compute_project_evm(project, seguimiento.fecha)
+                self.assertEqual(seguimiento.ev, live.ev.quantize(Decimal('0.01')))
+        self.assertEqual(latest.snapshots.count(), project.activity_set.count())
+        # Las instantáneas anteriores conservan la historia por fecha
+        for seguimiento in older:
+            with self.subTest(older=seguimiento.pk):
+                self.assertEqual(
+                    sorted(seguimiento.snapshots.values_list('activity_id', 'status', 'actual_end_date')),
+                    frozen[seguimiento.pk],
+                )
+        if older:
+            self.assertTrue(any(row.changed for row in compare_seguimientos(older[0], latest)))
+
+    def test_recalculate_date_range_filter(self):
+        project = Project.objects.filter(seguimiento__isnull=False).distinct().first()
+        fechas = sorted(project.seguimiento_set.values_list('fecha', flat=True))
+        result = recalculate_project_seguimientos(project.pk, date_from=fechas[1], date_to=fechas[2], dry_run=True)
+        self.assertEqual(result.rows, 2)
+        self.assertEqual(result.changed, 0)
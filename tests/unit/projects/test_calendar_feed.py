@@ -0,0 +1,147 @@
+"""
+Unit tests for the date-windowed calendar feed (projects.calendar_feed).
+"""
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from projects.calendar_feed import _ics_fold, calendar_events, parse_feed_date, render_ics, subscription_token
+from projects.models import Activity, Milestone, Project
+from projects.services import ReportFilters
+
+
+class CalendarFeedTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='gestor', password='pass')
+        self.client.login(username='gestor', password='pass')
+        self.project = Project.objects.create(
+            name='Largo, plazo', description='Desc', start_date=date(2026, 1, 1),
+            end_date=date(2027, 12, 31), budget=Decimal('100000'), created_by=self.user,
+        )
+        Activity.objects.bulk_create([
+            Activity(
+                project=self.project, name=f'Tarea {i}', description='Desc',
+                start_date=date(2026, 1, 1) + timedelta(days=7 * i),
+                end_date=date(2026, 1, 10) + timedelta(days=7 * i),
+                status='completed' if i % 2 else 'pending',
+            )
+            for i in range(100)
+        ])
+        Milestone.objects.create(project=self.project, name='Entrega', description='Desc', due_date=date(2026, 3, 15))
+        Milestone.objects.create(project=self.project, name='Cierre', description='Desc', due_date=date(2027, 11, 30))
+        self.url = reverse('reports:calendar_feed', args=[self.project.pk])
+
+    def test_window_returns_only_overlapping_events(self):
+        with self.assertNumQueries(2):
+            events = calendar_events(self.project, ReportFilters(), date(2026, 3, 1), date(2026, 4, 1))
+        titles = [event['title'] for event in events]
+        self.assertIn('Hito: Entrega', titles)
+        self.assertNotIn('Hito: Cierre', titles)
+        for event in events:
+            if event['id'].startswith('activity-'):
+                self.assertLess(event['start'], '2026-04-01')
+                self.assertGreater(event['end'], '2026-03-01')
+        self.assertLess(len(events), 10)
+
+    def test_all_day_end_is_exclusive(self):
+        event = calendar_events(self.project, ReportFilters(), date(2026, 1, 1), date(2026, 1, 2))[0]
+        self.assertEqual((event['start'], event['end']), ('2026-01-01', '2026-01-11'))
+
+    def test_json_endpoint_filters_and_window(self):
+        response = self.client.get(self.url, {
+            'start': '2026-03-01T00:00:00-05:00', 'end': '2026-04-12T00:00:00-05:00', 'activity_status': 'completed',
+        })
+        events = response.json()
+        activities = [event for event in events if event['id'].startswith('activity-')]
+        self.assertTrue(activities)
+        self.assertTrue(all(event['status'] == 'completed' for event in activities))
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_conditional_get(self):
+        params = {'start': '2026-03-01', 'end': '2026-04-01'}
+        first = self.client.get(self.url, params)
+        self.assertEqual(self.client.get(self.url, params, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+        self.assertEqual(
+            self.client.get(self.url, params, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code, 304
+        )
+        other = self.client.get(self.url, {'start': '2026-05-01', 'end': '2026-06-01'})
+        self.assertNotEqual(other['ETag'], first['ETag'])
+
+        Milestone.objects.create(project=self.project, name='Nuevo', description='Desc', due_date=date(2026, 3, 20))
+        changed = self.client.get(self.url, params, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertIn('Hito: Nuevo', [event['title'] for event in changed.json()])
+
+    def test_ics_feed(self):
+        response = self.client.get(reverse('reports:calendar_feed_ics', args=[self.project.pk]))
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = response.content.decode()
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertEqual(body.count('BEGIN:VEVENT'), 102)
+        self.assertIn('X-WR-CALNAME:Largo\\, plazo', body)
+        self.assertIn('DTSTART;VALUE=DATE:20260101\r\nDTEND;VALUE=DATE:20260111', body)
+        self.assertIn('UID:milestone-', body)
+
+    def test_page_no_longer_embeds_events(self):
+        response = self.client.get(reverse('reports:calendar_view', args=[self.project.pk]))
+        self.assertNotContains(response, 'Tarea 50')
+        self.assertContains(response, self.url)
+
+    def test_subscription_url_works_without_session(self):
+        page = self.client.get(reverse('reports:calendar_view', args=[self.project.pk]))
+        url = reverse('reports:calendar_subscription', args=[self.project.pk, subscription_token(self.user, self.project.pk)])
+        self.assertContains(page, url)
+        self.client.logout()
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        self.assertEqual(response.content.decode().count('BEGIN:VEVENT'), 102)
+
+    def test_subscription_token_is_scoped(self):
+        self.client.logout()
+        other = Project.objects.create(
+            name='Otro', description='Desc', start_date=date(2026, 1, 1),
+            end_date=date(2026, 12, 31), created_by=self.user,
+        )
+        token = subscription_token(self.user, other.pk)
+        for project_id, value in ((self.project.pk, token), (self.project.pk, token + 'x')):
+            url = reverse('reports:calendar_subscription', args=[project_id, value])
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+        stranger = User.objects.create_user(username='ajeno', password='pass')
+        url = reverse('reports:calendar_subscription', args=[self.project.pk, subscription_token(stranger, self.project.pk)])
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.user.is_active = False
+        self.user.save()
+        url = reverse('reports:calendar_subscription', args=[self.project.pk, subscription_token(self.user, self.project.pk)])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class CalendarHelpersTest(SimpleTestCase):
+
+    def test_parse_feed_date(self):
+        self.assertEqual(parse_feed_date('2026-03-01T00:00:00-05:00'), date(2026, 3, 1))
+        self.assertIsNone(parse_feed_date('2026-13-40'))
+        self.assertIsNone(parse_feed_date(''))
+
+    def test_long_lines_are_folded(self):
+        folded = _ics_fold('SUMMARY:' + 'ñ' * 80)
+        self.assertTrue(all(len(line.encode()) <= 75 for line in folded.split('\r\n')))
+        self.assertEqual(folded.replace('\r\n ', ''), 'SUMMARY:' + 'ñ' * 80)
+
+    def test_render_ics_escapes_text(self):
+        project = Project(name='P')
+        body = render_ics(
+            project,
+            [{'id': 'milestone-1', 'title': 'Hito: a;b\nc', 'start': '2026-01-01'}],
+            stamp=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        )
+        self.assertIn('SUMMARY:Hito: a\\;b\\nc', body)
+        self.assertIn('DTEND;VALUE=DATE:20260102', body)
+        self.assertIn('DTSTAMP:20260101T000000Z', body)
@@ -0,0 +1,139 @@
+"""
+Unit tests for the critical path method engine (projects.cpm).
+"""
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from projects.cpm import compute_critical_path, schedule_network
+from projects.models import Activity, Project, ProjectCut
+
+
+def day(n):
+    return date(2026, 1, 1) + timedelta(days=n)
+
+
+class ScheduleNetworkTest(SimpleTestCase):
+
+    def test_forward_and_backward_pass(self):
+        # 1 (días 0-4) → 2 (5-14) → 4 (15-19)
+        # 1 → 3 (5-7, holgura 7 hasta el fin)
+        # 5 suelta (0-2): holgura hasta el fin del proyecto
+        result = schedule_network([
+            (1, day(0), day(4), None),
+            (2, day(5), day(14), 1),
+            (3, day(5), day(7), 1),
+            (4, day(15), day(19), 2),
+            (5, day(0), day(2), None),
+        ])
+        self.assertEqual(result.project_start, day(0))
+        self.assertEqual(result.project_finish, day(19))
+        self.assertEqual(result.duration_days, 20)
+        self.assertEqual(result.critical_path, (1, 2, 4))
+
+        three = result.get(3)
+        self.assertEqual((three.early_start, three.early_finish), (day(5), day(7)))
+        self.assertEqual((three.late_start, three.late_finish), (day(17), day(19)))
+        self.assertEqual((three.total_float, three.free_float), (12, 12))
+        self.assertEqual(result.get(5).total_float, 17)
+        self.assertTrue(result.is_driving(1, 2))
+        self.assertFalse(result.is_driving(2, 3))
+
+    def test_planned_start_delays_successor(self):
+        # 2 está planificada 3 días después del fin de 1: 1 tiene holgura libre
+        result = schedule_network([
+            (1, day(0), day(4), None),
+            (2, day(8), day(9), 1),
+        ])
+        self.assertEqual(result.get(2).early_start, day(8))
+        self.assertEqual(result.get(1).free_float, 3)
+        self.assertEqual(result.get(1).total_float, 3)
+        self.assertEqual(result.critical_path, (2,))
+
+    def test_late_predecessor_pushes_successor(self):
+        # El fin de 1 supera el inicio planificado de 2: el CPM la desplaza
+        result = schedule_network([
+            (1, day(0), day(9), None),
+            (2, day(5), day(6), 1),
+        ])
+        self.assertEqual(result.get(2).early_start, day(10))
+        self.assertEqual(result.project_finish, day(11))
+        self.assertEqual(result.critical_path, (1, 2))
+
+    def test_skips_undated_activities_and_cycles(self):
+        result = schedule_network([
+            (1, day(0), day(1), None),
+            (2, None, day(3), 1),
+            (3, day(2), day(3), 2),
+            (4, day(0), day(1), 5),
+            (5, day(0), day(1), 4),
+        ])
+        self.assertNotIn(2, result)
+        self.assertEqual(result.get(3).early_start, day(2))
+        self.assertEqual(result.cyclic_ids, frozenset({4, 5}))
+        self.assertEqual(schedule_network([]).critical_path, ())
+
+    def test_large_network_is_linear(self):
+        nodes = []
+        for i in range(20000):
+            predecessor = i - 1 if i % 50 else None
+            nodes.append((i, day(i % 50), day(i % 50), predecessor))
+        started = time.perf_counter()
+        result = schedule_network(nodes)
+        self.assertLess(time.perf_counter() - started, 2)
+        self.assertEqual(len(result.activities), 20000)
+        self.assertEqual(len(result.critical_path), 20000)
+
+
+class CriticalPathViewsTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='gestor', password='pass')
+        self.client.login(username='gestor', password='pass')
+        self.project = Project.objects.create(
+            name='CPM', description='Desc', start_date=day(0), end_date=day(60),
+            budget=Decimal('100000'), created_by=self.user,
+        )
+        first = Activity.objects.create(
+            project=self.project, name='Diseno', description='Desc', start_date=day(0), end_date=day(9),
+        )
+        Activity.objects.create(
+            project=self.project, name='Construccion', description='Desc', start_date=day(10), end_date=day(29),
+            predecessor=first,
+        )
+        self.slack = Activity.objects.create(
+            project=self.project, name='Documentacion', description='Desc', start_date=day(10), end_date=day(14),
+            predecessor=first,
+        )
+
+    def test_engine_loads_the_network_in_one_query(self):
+        with self.assertNumQueries(1):
+            result = compute_critical_path(self.project)
+        self.assertEqual(len(result.critical_path), 2)
+        self.assertEqual(result.get(self.slack.pk).total_float, 15)
+
+    def test_project_detail_shows_float(self):
+        response = self.client.get(reverse('project_detail', args=[self.project.pk]))
+        self.assertEqual(response.context['schedule'].project_finish, day(29))
+        activities = {a.name: a for a in response.context['activities']}
+        self.assertTrue(activities['Construccion'].cpm.is_critical)
+        self.assertEqual(activities['Documentacion'].cpm.total_float, 15)
+        self.assertContains(response, 'Ruta critica: 2 actividad(es)')
+
+    def test_gantt_and_cuts_use_the_engine(self):
+        response = self.client.get(reverse('reports:gantt_chart', args=[self.project.pk]))
+        rows = {row['name']: row for row in response.context['gantt_rows']}
+        self.assertFalse(rows['Documentacion']['is_critical'])
+        self.assertEqual(rows['Documentacion']['total_float'], 15)
+        self.assertEqual(response.context['cpm_finish'], day(29))
+
+        ProjectCut.objects.create(project=self.project, name='Q1', start_date=day(0), end_date=day(59))
+        response = self.client.get(reverse('project_cuts', args=[self.project.pk]))
+        self.assertEqual(response.context['cuts'][0].critical_count, 2)
+        self.assertContains(response, '2 en ruta critica')
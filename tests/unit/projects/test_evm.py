@@ -16,7 +16,10 @@ from decimal import Decimal
 from django.test import TestCase
 from django.contrib.auth.models import User
 
-from projects.models import Project, Activity, Seguimiento
+from projects.evm import ActivityContribution, apply_activity_change, compute_snapshot_evm
+from projects.models import Project, Activity, ProjectMetrics, Seguimiento, SeguimientoSnapshot
+from projects.services import recalculate_project_seguimientos
+from projects.versioning import get_project_version
 
 
 class EVMMetricsCalculationTest(TestCase):
@@ -277,3 +280,124 @@ class EVMMetricsCalculationTest(TestCase):
 
         # CPI: 5000 / 4600 ≈ 1.09 (campo DecimalField places=2)
         self.assertAlmostEqual(float(s.cpi), 1.09, places=2)
+
+
+class IncrementalEVMUpdateTest(TestCase):
+    """apply_activity_change mantiene los seguimientos guardados sin recálculo completo."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gestor', password='pass')
+        self.start = date(2026, 1, 1)
+        self.project = Project.objects.create(
+            name='Proyecto Incremental', description='Desc',
+            start_date=self.start, end_date=self.start + timedelta(days=120),
+            budget=Decimal('50000.00'), created_by=self.user,
+        )
+        self.a1 = Activity.objects.create(
+            project=self.project, name='A1', description='Desc',
+            start_date=self.start, end_date=self.start + timedelta(days=20), cost=Decimal('1000'),
+        )
+        self.a2 = Activity.objects.create(
+            project=self.project, name='A2', description='Desc', status='completed',
+            start_date=self.start, end_date=self.start + timedelta(days=40), cost=Decimal('3000'),
+            actual_end_date=self.start + timedelta(days=45), actual_cost=Decimal('3300'),
+        )
+        self.seguimientos = [
+            Seguimiento.objects.create(proyecto=self.project, fecha=self.start + timedelta(days=offset))
+            for offset in (10, 25, 50, 90)
+        ]
+
+    def _assert_matches_full_recompute(self):
+        for seguimiento in Seguimiento.objects.filter(proyecto=self.project):
+            expected = Seguimiento(proyecto=self.project, fecha=seguimiento.fecha)
+            expected.calculate_metrics()
+            with self.subTest(fecha=seguimiento.fecha):
+                for field in ('pv', 'ev', 'ac', 'sv', 'cv', 'spi', 'cpi'):
+                    self.assertEqual(
+                        getattr(seguimiento, field),
+                        Decimal(getattr(expected, field)).quantize(Decimal('0.01')),
+                        field,
+                    )
+
+    def _change(self, activity, **fields):
+        before = ActivityContribution.of(activity)
+        for name, value in fields.items():
+            setattr(activity, name, value)
+        activity.save()
+        return apply_activity_change(activity, before)
+
+    def test_completing_an_activity_updates_later_seguimientos(self):
+        updated = self._change(
+            self.a1, status='completed',
+            actual_end_date=self.start + timedelta(days=22), actual_cost=Decimal('900'),
+        )
+        self.assertEqual(updated, 3)  # fechas ≥ día 20 (PV ya incluía A1 desde ahí)
+        self._assert_matches_full_recompute()
+
+    def test_moving_actual_end_date_and_cost(self):
+        self._change(self.a2, actual_end_date=self.start + timedelta(days=60), actual_cost=Decimal('2500'))
+        self._assert_matches_full_recompute()
+        self._change(self.a2, actual_end_date=self.start + timedelta(days=30))
+        self._assert_matches_full_recompute()
+
+    def test_reopening_an_activity_removes_earned_value(self):
+        self._change(self.a2, status='in_progress', actual_end_date=None)
+        self._assert_matches_full_recompute()
+
+    def test_single_update_per_change(self):
+        before = ActivityContribution.of(self.a2)
+        self.a2.actual_cost = Decimal('3100')
+        Activity.objects.filter(pk=self.a2.pk).update(actual_cost=Decimal('3100'))
+        # UPDATE de seguimientos + UPDATE de la instantánea + versión del proyecto
+        with self.assertNumQueries(3):
+            apply_activity_change(self.a2, before)
+        self._assert_matches_full_recompute()
+
+    def test_unchanged_contribution_issues_no_queries(self):
+        before = ActivityContribution.of(self.a1)
+        self.a1.name = 'Renombrada'
+        with self.assertNumQueries(0):
+            self.assertEqual(apply_activity_change(self.a1, before), 0)
+
+    def test_snapshots_stay_consistent_with_stored_metrics(self):
+        self._change(self.a2, actual_end_date=self.start + timedelta(days=60), actual_cost=Decimal('2500'))
+        for seguimiento in Seguimiento.objects.filter(proyecto=self.project):
+            frozen = compute_snapshot_evm(seguimiento.snapshots.all(), seguimiento.fecha)
+            with self.subTest(fecha=seguimiento.fecha):
+                self.assertEqual((seguimiento.pv, seguimiento.ev, seguimiento.ac), (frozen.pv, frozen.ev, frozen.ac))
+
+    def test_moved_activity_survives_snapshot_recalculation(self):
+        other = Project.objects.create(
+            name='Destino', description='Desc', start_date=self.start, end_date=self.start + timedelta(days=120),
+            budget=Decimal('50000.00'), created_by=self.user,
+        )
+        destino = [
+            Seguimiento.objects.create(proyecto=other, fecha=self.start + timedelta(days=offset))
+            for offset in (30, 60)
+        ]
+        self._change(self.a2, project=other)
+        self._assert_matches_full_recompute()
+        self.assertFalse(destino[0].snapshots.filter(activity=self.a2).exists())
+        self.assertEqual(Seguimiento.objects.get(pk=destino[1].pk).ev, Decimal('3000'))
+        self.assertEqual(SeguimientoSnapshot.objects.filter(seguimiento=destino[1], activity=self.a2).count(), 1)
+        self.assertFalse(SeguimientoSnapshot.objects.filter(
+            seguimiento__proyecto=self.project, seguimiento__fecha__gte=self.start + timedelta(days=40), activity=self.a2,
+        ).exists())
+        for project in (self.project, other):
+            with self.subTest(project=project.name):
+                result = recalculate_project_seguimientos(project.pk, dry_run=True)
+                self.assertEqual(result.changed, 0)
+
+    def test_change_refreshes_project_metrics_and_version(self):
+        # Cada paso confirma por separado, como la vista en autocommit
+        with self.captureOnCommitCallbacks(execute=True):
+            before = ActivityContribution.of(self.a2)
+            self.a2.actual_cost = Decimal('9900')
+            self.a2.save()
+        version = get_project_version(self.project.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_activity_change(self.a2, before)
+        self.assertGreater(get_project_version(self.project.pk), version)
+        latest = Seguimiento.objects.filter(proyecto=self.project).latest('fecha')
+        self.assertEqual(ProjectMetrics.objects.get(project=self.project).latest_cpi, latest.cpi)
+        self.assertLess(latest.cpi, Decimal('1'))
@@ -0,0 +1,116 @@
+"""
+Unit tests for the streamed portfolio export (projects.exports).
+"""
+import csv
+import io
+import json
+import os
+import tempfile
+import zipfile
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from projects.exports import ENTITIES, iter_ndjson, iter_zip
+from projects.models import Activity, Project, Seguimiento, UserProfile
+from resources.models import Resource
+from risks.models import Risk
+from stakeholders.models import Stakeholder
+
+
+class PortfolioExportTest(TestCase):
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='tecnico', password='pass')
+        self.other = User.objects.create_user(username='otro', password='pass')
+        self.project = self._project('Visible', self.owner)
+        self.hidden = self._project('Ajeno', self.other)
+
+    def _project(self, name, user):
+        project = Project.objects.create(
+            name=name, description='Desc', start_date=date(2026, 1, 1),
+            end_date=date(2026, 12, 31), budget=Decimal('10000'), created_by=user,
+        )
+        activity = Activity.objects.create(
+            project=project, name=f'{name} A1', description='Desc',
+            start_date=date(2026, 1, 1), end_date=date(2026, 1, 31), assigned_to=user,
+        )
+        Activity.objects.create(
+            project=project, name=f'{name} A2', description='Desc',
+            start_date=date(2026, 2, 1), end_date=date(2026, 2, 28), predecessor=activity,
+        )
+        Resource.objects.create(activity=activity, name='Cemento', type='material', quantity=3, cost_per_unit=Decimal('10'))
+        Seguimiento.objects.create(proyecto=project, fecha=date(2026, 1, 15))
+        Risk.objects.create(project=project, description='Lluvias', identified_by='Ana')
+        stakeholder = Stakeholder.objects.create(name=f'{name} S', email='s@example.com', role='sponsor')
+        stakeholder.projects.add(project)
+        return project
+
+    def _zip_tables(self, chunks):
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+        return {
+            name[:-4]: list(csv.DictReader(io.TextIOWrapper(archive.open(name), encoding='utf-8')))
+            for name in archive.namelist()
+        }
+
+    def test_zip_has_one_csv_per_entity(self):
+        projects = Project.objects.filter(pk=self.project.pk)
+        tables = self._zip_tables(iter_zip(projects, chunk_size=1))
+        self.assertEqual(list(tables), [entity.name for entity in ENTITIES])
+        self.assertEqual([row['name'] for row in tables['projects']], ['Visible'])
+        self.assertEqual(len(tables['activities']), 2)
+        self.assertEqual(tables['activities'][0]['assigned_to_username'], 'tecnico')
+        self.assertEqual(tables['resources'][0]['total_cost'], '30.00')
+        self.assertEqual(tables['resources'][0]['activity_project_id'], str(self.project.pk))
+        self.assertEqual(len(tables['seguimientos']), 1)
+        self.assertEqual(tables['risks'][0]['description'], 'Lluvias')
+        self.assertEqual(tables['stakeholders'][0]['stakeholder_name'], 'Visible S')
+
+    def test_ndjson_lines_are_typed(self):
+        lines = b''.join(iter_ndjson(Project.objects.all(), chunk_size=2)).decode().splitlines()
+        records = [json.loads(line) for line in lines]
+        counts = {}
+        for record in records:
+            counts[record['entity']] = counts.get(record['entity'], 0) + 1
+        self.assertEqual(counts, {
+            'projects': 2, 'activities': 4, 'resources': 2, 'seguimientos': 2, 'risks': 2, 'stakeholders': 2,
+        })
+
+    def test_zip_is_streamed_in_pieces(self):
+        chunks = [chunk for chunk in iter_zip(Project.objects.all(), chunk_size=1) if chunk]
+        self.assertGreater(len(chunks), len(ENTITIES))
+
+    def test_endpoint_respects_visible_projects(self):
+        self.client.login(username='tecnico', password='pass')
+        response = self.client.get(reverse('reports:portfolio_export'))
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        tables = self._zip_tables(response.streaming_content)
+        self.assertEqual([row['name'] for row in tables['projects']], ['Visible'])
+        self.assertTrue(all(row['project_id'] == str(self.project.pk) for row in tables['activities']))
+
+        response = self.client.get(reverse('reports:portfolio_export'), {'export_format': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        names = [json.loads(line).get('name') for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertNotIn('Ajeno', names)
+
+    def test_jefe_exports_every_project(self):
+        UserProfile.objects.filter(user=self.other).update(role='jefe_departamental')
+        self.client.login(username='otro', password='pass')
+        tables = self._zip_tables(self.client.get(reverse('reports:portfolio_export')).streaming_content)
+        self.assertEqual(len(tables['projects']), 2)
+
+    def test_management_command(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cartera.ndjson')
+            out = StringIO()
+            call_command('export_portfolio', path, '--format', 'ndjson', '--user', 'tecnico', stdout=out)
+            with open(path, encoding='utf-8') as handle:
+                records = [json.loads(line) for line in handle]
+        self.assertIn('Cartera exportada', out.getvalue())
+        self.assertEqual({r['id'] for r in records if r['entity'] == 'projects'}, {self.project.pk})
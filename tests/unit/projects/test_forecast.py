@@ -0,0 +1,112 @@
+"""
+Unit tests for EVM forecasting (projects.forecast).
+
+Escenario: BAC = 10000 en cuatro actividades que terminan cada 10 días.
+  - A1 (2000, fin día 10) completada el día 12 con costo real 2500
+  - A2 (3000, fin día 20) completada el día 20 con costo real 3000
+  - A3 (1000, fin día 30) en curso, costo real registrado 1500
+  - A4 (4000, fin día 40) pendiente
+Seguimiento al día 25: PV = 5000, EV = 5000, AC = 5500.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from projects.evm import EVMTimeSeries
+from projects.forecast import earned_schedule_days, project_forecasts
+from projects.models import Activity, Project, Seguimiento
+
+
+class EVMForecastTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gestor', password='pass')
+        self.start = date(2026, 1, 1)
+        self.project = Project.objects.create(
+            name='Proyecto Pronóstico', description='Desc',
+            start_date=self.start, end_date=self.start + timedelta(days=40),
+            budget=Decimal('20000.00'), created_by=self.user,
+        )
+        self._activity('A1', 10, '2000', status='completed', actual_end=12, actual_cost='2500')
+        self._activity('A2', 20, '3000', status='completed', actual_end=20, actual_cost='3000')
+        self._activity('A3', 30, '1000', status='in_progress', actual_cost='1500')
+        self._activity('A4', 40, '4000')
+
+    def _activity(self, name, end, cost, status='pending', actual_end=None, actual_cost=None):
+        return Activity.objects.create(
+            project=self.project, name=name, description='Desc', status=status,
+            start_date=self.start, end_date=self.start + timedelta(days=end), cost=Decimal(cost),
+            actual_end_date=self.start + timedelta(days=actual_end) if actual_end else None,
+            actual_cost=Decimal(actual_cost) if actual_cost else None,
+        )
+
+    def _seguimiento(self, day):
+        return Seguimiento.objects.create(proyecto=self.project, fecha=self.start + timedelta(days=day))
+
+    def test_cost_forecasts(self):
+        self._seguimiento(25)
+        forecast, = project_forecasts(self.project)
+        self.assertEqual(forecast.bac, Decimal('10000'))
+        cpi = Decimal('5000') / Decimal('5500')
+        self.assertEqual(forecast.eac_cpi, Decimal('10000') / cpi)
+        # SPI = 1: CPI x SPI coincide con CPI en lo pendiente
+        self.assertEqual(forecast.eac_cpi_spi, Decimal('5500') + Decimal('5000') / cpi)
+        # Bottom-up: real de A1, A2 + estimación vigente de A3 (1500) y A4 (4000)
+        self.assertEqual(forecast.eac_bottom_up, Decimal('11000'))
+        self.assertEqual(forecast.etc, forecast.eac_cpi - Decimal('5500'))
+        self.assertEqual(forecast.vac, Decimal('10000') - forecast.eac_cpi)
+        self.assertEqual(forecast.tcpi, Decimal('5000') / Decimal('4500'))
+
+    def test_earned_schedule(self):
+        self._seguimiento(25)
+        forecast, = project_forecasts(self.project)
+        # EV = 5000 = PV acumulado al día 20
+        self.assertEqual(forecast.es_days, Decimal('20'))
+        self.assertEqual(forecast.at_days, 25)
+        self.assertEqual(forecast.spi_t, Decimal('0.8'))
+        self.assertEqual(forecast.forecast_end_date, self.start + timedelta(days=50))
+
+    def test_earned_schedule_interpolates_between_steps(self):
+        baseline = EVMTimeSeries.for_project(self.project)
+        # 2000 + 1500 de los 3000 de A2 → mitad del tramo día 10 → día 20
+        self.assertEqual(
+            earned_schedule_days(baseline.pv_dates, baseline.pv_cumulative, Decimal('3500'), self.start),
+            Decimal('15'),
+        )
+        self.assertEqual(
+            earned_schedule_days(baseline.pv_dates, baseline.pv_cumulative, Decimal('0'), self.start),
+            Decimal('0'),
+        )
+
+    def test_undefined_indexes_without_actual_cost(self):
+        self._seguimiento(5)
+        forecast, = project_forecasts(self.project)
+        self.assertIsNone(forecast.eac_cpi)
+        self.assertIsNone(forecast.eac_cpi_spi)
+        self.assertEqual(forecast.spi_t, Decimal('0'))
+        self.assertIsNone(forecast.forecast_end_date)
+        self.assertEqual(forecast.eac, forecast.eac_bottom_up)
+
+    def test_forecasts_use_constant_queries(self):
+        for day in range(5, 40, 5):
+            self._seguimiento(day)
+        with self.assertNumQueries(2):
+            forecasts = project_forecasts(self.project)
+        self.assertEqual([f.fecha for f in forecasts], sorted(f.fecha for f in forecasts))
+        self.assertEqual(len(forecasts), 7)
+
+    def test_legacy_seguimiento_falls_back_to_baseline_bac(self):
+        seguimiento = self._seguimiento(25)
+        seguimiento.snapshots.all().delete()
+        forecast, = project_forecasts(self.project)
+        self.assertEqual(forecast.bac, Decimal('10000'))
+        self.assertEqual(forecast.eac_bottom_up, Decimal('5500') + Decimal('5000'))
+
+    def test_bottom_up_counts_remaining_work_of_partial_activities(self):
+        # A5 en curso con 200 gastados de 1000: aporta 1000, no solo lo gastado
+        self._activity('A5', 35, '1000', status='in_progress', actual_cost='200')
+        self._seguimiento(25)
+        forecast, = project_forecasts(self.project)
+        self.assertEqual(forecast.eac_bottom_up, Decimal('11000') + Decimal('1000'))
@@ -0,0 +1,155 @@
+"""
+Unit tests for the cached gantt context (projects.gantt).
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from projects.gantt import build_gantt_payload, gantt_payload, schedule_gantt_prewarm, today_offset
+from projects.models import Activity, Milestone, Project
+from projects.services import ReportFilters, parse_report_filters
+from resources.models import Resource
+
+
+class GanttPayloadTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='gestor', password='pass')
+        self.client.login(username='gestor', password='pass')
+        self.project = Project.objects.create(
+            name='Gantt', description='Desc', start_date=date(2026, 1, 1),
+            end_date=date(2026, 6, 30), budget=Decimal('100000'), created_by=self.user,
+        )
+        previous = None
+        self.activities = []
+        for i in range(12):
+            previous = Activity.objects.create(
+                project=self.project, name=f'A{i:02d}', description='Desc',
+                start_date=date(2026, 1, 1) + timedelta(days=10 * i),
+                end_date=date(2026, 1, 10) + timedelta(days=10 * i),
+                status='completed' if i < 4 else 'pending', predecessor=previous,
+            )
+            self.activities.append(previous)
+        Milestone.objects.create(project=self.project, name='H1', description='Desc', due_date=date(2026, 3, 1))
+
+    def test_payload_uses_constant_queries(self):
+        with self.assertNumQueries(3):
+            payload = build_gantt_payload(self.project, ReportFilters())
+        self.assertTrue(all(row['is_critical'] for row in payload['gantt_rows']))
+        self.assertEqual(len(payload['dependency_lines']), 11)
+        self.assertEqual(payload['activity_count'], 12)
+        self.assertEqual(payload['milestone_count'], 1)
+        self.assertEqual(payload['gantt_rows'][1]['predecessor'], 'A00')
+
+    def test_critical_path_crosses_filtered_activities(self):
+        payload = build_gantt_payload(self.project, ReportFilters(activity_status='completed'))
+        self.assertEqual([row['name'] for row in payload['gantt_rows']], ['A00', 'A01', 'A02', 'A03'])
+        self.assertTrue(all(row['is_critical'] for row in payload['gantt_rows']))
+
+    def test_repeat_view_skips_computation(self):
+        url = reverse('reports:gantt_chart', args=[self.project.pk])
+        with patch('projects.gantt.build_gantt_payload', wraps=build_gantt_payload) as build:
+            first = self.client.get(url)
+            second = self.client.get(url)
+            self.assertEqual(build.call_count, 1)
+            self.assertEqual(first.context['gantt_rows'], second.context['gantt_rows'])
+
+            # Otros filtros: otra entrada; parámetros ajenos al Gantt no cuentan
+            self.client.get(url + '?activity_status=pending')
+            self.client.get(url + '?export_format=csv')
+            self.assertEqual(build.call_count, 2)
+
+            Activity.objects.filter(pk=self.activities[0].pk).first().save()
+            self.client.get(url)
+            self.assertEqual(build.call_count, 3)
+
+    def test_today_offset_is_computed_per_request(self):
+        payload = gantt_payload(self.project, parse_report_filters({}))
+        self.assertEqual(today_offset(payload, date(2026, 1, 1)), 0)
+        self.assertIsNone(today_offset(payload, date(2027, 1, 1)))
+        self.assertGreater(today_offset(payload, date(2026, 2, 1)), 0)
+
+    @override_settings(PROJECT_CACHE_PREWARM='sync')
+    def test_bulk_resource_edit_prewarms_the_gantt(self):
+        gantt_payload(self.project, ReportFilters())
+        with self.captureOnCommitCallbacks(execute=True):
+            Resource.objects.bulk_create([
+                Resource(activity=self.activities[0], name='R', type='material', quantity=1, cost_per_unit=Decimal('5')),
+            ])
+        with patch('projects.gantt.build_gantt_payload') as build:
+            gantt_payload(self.project, ReportFilters())
+        build.assert_not_called()
+
+    @override_settings(PROJECT_CACHE_PREWARM='off')
+    def test_prewarm_can_be_disabled(self):
+        with patch('projects.gantt.prewarm_gantt_cache') as prewarm:
+            with self.captureOnCommitCallbacks(execute=True):
+                schedule_gantt_prewarm(self.project.pk)
+        prewarm.assert_not_called()
+
+
+class GanttDataEndpointTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='gestor', password='pass')
+        self.client.login(username='gestor', password='pass')
+        self.project = Project.objects.create(
+            name='Grande', description='Desc', start_date=date(2026, 1, 1),
+            end_date=date(2026, 12, 31), budget=Decimal('1000000'), created_by=self.user,
+        )
+        Activity.objects.bulk_create([
+            Activity(
+                project=self.project, name=f'T{i:03d}', description='Desc',
+                start_date=date(2026, 1, 1) + timedelta(days=i), end_date=date(2026, 1, 5) + timedelta(days=i),
+            )
+            for i in range(250)
+        ])
+        self.url = reverse('reports:gantt_data', args=[self.project.pk])
+
+    def test_returns_a_row_window(self):
+        data = self.client.get(self.url, {'offset': 100, 'limit': 50}).json()
+        self.assertEqual(data['total_rows'], 250)
+        self.assertEqual([row['row_index'] for row in data['rows']], list(range(100, 150)))
+        self.assertEqual(data['rows'][0]['name'], 'T100')
+        self.assertEqual(data['row_height'], 60)
+        self.assertIn('month_markers', data)
+
+    def test_date_window_trims_rows_and_markers(self):
+        data = self.client.get(self.url, {
+            'limit': 500, 'window_start': '2026-03-01', 'window_end': '2026-03-31',
+        }).json()
+        self.assertTrue(data['rows'])
+        for row in data['rows']:
+            self.assertLessEqual(row['start_date'], '2026-03-31')
+            self.assertGreaterEqual(row['end_date'], '2026-03-01')
+        self.assertEqual([m['label'] for m in data['month_markers']], ['Mar 2026'])
+
+    def test_etag_revalidation(self):
+        first = self.client.get(self.url, {'offset': 0})
+        etag = first['ETag']
+        again = self.client.get(self.url, {'offset': 0}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+        self.assertNotEqual(self.client.get(self.url, {'offset': 100})['ETag'], etag)
+
+        Activity.objects.filter(project=self.project).first().save()
+        changed = self.client.get(self.url, {'offset': 0}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+
+    def test_invalid_window_params_fall_back(self):
+        data = self.client.get(self.url, {'offset': 'x', 'limit': '100000', 'window_start': '2026-13-40'}).json()
+        self.assertEqual(data['offset'], 0)
+        self.assertEqual(len(data['rows']), 250)
+
+    def test_page_renders_only_the_first_window(self):
+        response = self.client.get(reverse('reports:gantt_chart', args=[self.project.pk]))
+        self.assertContains(response, 'T099')
+        self.assertNotContains(response, 'T100')
+        self.assertContains(response, 'id="ganttViewport"')
+        self.assertEqual(response.context['window']['total_rows'], 250)
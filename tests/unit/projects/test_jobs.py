@@ -0,0 +1,192 @@
+"""
+Unit tests for the DB-backed report job queue (projects.jobs).
+"""
+import io
+import json
+import shutil
+import tempfile
+import zipfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from projects.jobs import (
+    JobOutput, claim_report_jobs, enqueue_report_job, recover_stale_report_jobs, run_report_job,
+    update_report_job_progress,
+)
+from projects.models import Activity, Project, ReportJob, Seguimiento
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ReportJobTest(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gestor', password='pass')
+        self.other = User.objects.create_user(username='otro', password='pass')
+        self.client.login(username='gestor', password='pass')
+        self.project = self._project('Planta', self.user)
+        self.hidden = self._project('Ajeno', self.other)
+
+    def _project(self, name, user):
+        project = Project.objects.create(
+            name=name, description='Desc', start_date=date(2026, 1, 1),
+            end_date=date(2026, 12, 31), budget=Decimal('10000'), created_by=user,
+        )
+        Activity.objects.create(
+            project=project, name=f'{name} A1', description='Desc', status='completed',
+            start_date=date(2026, 1, 1), end_date=date(2026, 1, 31), cost=Decimal('100'),
+        )
+        return project
+
+    def _work(self):
+        out = StringIO()
+        call_command('run_report_worker', '--once', '--workers', '1', stdout=out)
+        return out.getvalue()
+
+    def test_enqueue_run_and_download(self):
+        response = self.client.post(reverse('reports:report_job_create'), {'kind': 'status_report', 'project_id': self.project.pk})
+        job = ReportJob.objects.get()
+        self.assertRedirects(response, reverse('reports:report_job_detail', args=[job.pk]))
+        self.assertEqual(job.state, 'queued')
+        status = self.client.get(reverse('reports:report_job_status', args=[job.pk])).json()
+        self.assertEqual((status['state'], status['download_url']), ('queued', None))
+
+        output = self._work()
+        self.assertIn(f'Trabajo #{job.pk}: succeeded', output)
+        self.assertIn('Trabajos ejecutados: 1', output)
+
+        status = self.client.get(reverse('reports:report_job_status', args=[job.pk])).json()
+        self.assertEqual((status['state'], status['progress']), ('succeeded', 100))
+        self.assertEqual(status['download_url'], reverse('reports:report_job_download', args=[job.pk]))
+        response = self.client.get(status['download_url'])
+        self.assertIn('.xlsx', response['Content-Disposition'])
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertIn('Planta A1', archive.read('xl/worksheets/sheet2.xml').decode())
+
+        detail = self.client.get(reverse('reports:report_job_detail', args=[job.pk]))
+        self.assertContains(detail, 'Completado')
+
+    def test_portfolio_export_job_respects_visibility(self):
+        job = enqueue_report_job('portfolio_export', self.user, params={'export_format': 'ndjson'})
+        self._work()
+        job.refresh_from_db()
+        with job.result.open('rb') as handle:
+            records = [json.loads(line) for line in handle.read().decode().splitlines()]
+        self.assertEqual({r['name'] for r in records if r['entity'] == 'projects'}, {'Planta'})
+        self.assertTrue(job.result_name.endswith('.ndjson'))
+
+    def test_recalculation_job_has_no_file(self):
+        Seguimiento.objects.create(proyecto=self.project, fecha=date(2026, 1, 15))
+        job = enqueue_report_job('recalculate_seguimientos', self.user, project=self.project, params={'from_live': '1'})
+        self.assertEqual(run_report_job(claim_report_jobs('w', 1)[0]), 'succeeded')
+        job.refresh_from_db()
+        self.assertIn('Seguimientos: 1', job.message)
+        self.assertFalse(job.result)
+        self.assertEqual(self.client.get(reverse('reports:report_job_download', args=[job.pk])).status_code, 404)
+
+    def test_failed_job_records_the_error(self):
+        job = ReportJob.objects.create(kind='status_report', requested_by=self.user)
+        self._work()
+        job.refresh_from_db()
+        self.assertEqual(job.state, 'failed')
+        self.assertIn('requiere un proyecto', job.error)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_claims_are_exclusive_and_ordered(self):
+        first = enqueue_report_job('status_report', self.user, project=self.project)
+        second = enqueue_report_job('status_report', self.user, project=self.project)
+        self.assertEqual(claim_report_jobs('w1', 1), [first.pk])
+        self.assertEqual(claim_report_jobs('w2', 5), [second.pk])
+        self.assertEqual(claim_report_jobs('w3', 5), [])
+        first.refresh_from_db()
+        self.assertEqual((first.state, first.worker, first.attempts), ('running', 'w1', 1))
+
+    @override_settings(REPORT_JOB_MAX_ATTEMPTS=2)
+    def test_stale_jobs_are_requeued_then_failed(self):
+        job = enqueue_report_job('status_report', self.user, project=self.project)
+        claim_report_jobs('caido', 1)
+        ReportJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(recover_stale_report_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.state, 'queued')
+
+        claim_report_jobs('caido', 1)
+        ReportJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=2))
+        recover_stale_report_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.state, job.attempts), ('failed', 2))
+
+    def test_access_is_limited_to_the_requester(self):
+        response = self.client.post(reverse('reports:report_job_create'), {'kind': 'status_report', 'project_id': self.hidden.pk})
+        self.assertEqual(response.status_code, 403)
+        response = self.client.post(reverse('reports:report_job_create'), {'kind': 'desconocido'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(reverse('reports:report_job_create'), {'kind': 'status_report'})
+        self.assertEqual(response.status_code, 400)
+
+        job = enqueue_report_job('portfolio_export', self.other)
+        self.assertEqual(self.client.get(reverse('reports:report_job_status', args=[job.pk])).status_code, 403)
+        self.assertNotContains(self.client.get(reverse('reports:report_job_list')), 'Cartera')
+
+    def _stall(self, job):
+        ReportJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=2))
+
+    def test_progress_keeps_long_jobs_alive(self):
+        job = enqueue_report_job('status_report', self.user, project=self.project)
+        claim_report_jobs('w1', 1)
+        ReportJob.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(hours=2))
+        self._stall(job)
+        update_report_job_progress(job.pk, 'w1', 40, 'Escribiendo')
+        self.assertEqual(recover_stale_report_jobs(), 0)
+        job.refresh_from_db()
+        self.assertEqual((job.state, job.progress), ('running', 40))
+
+        update_report_job_progress(job.pk, 'otro', 90)
+        job.refresh_from_db()
+        self.assertEqual(job.progress, 40)
+
+    def test_requeued_job_finishing_late_is_discarded(self):
+        job = enqueue_report_job('status_report', self.user, project=self.project)
+        claim_report_jobs('w1', 1)
+
+        def slow_handler(job, handle, progress):
+            # Mientras w1 trabaja, su trabajo se da por caído y lo toma w2
+            self._stall(job)
+            recover_stale_report_jobs()
+            claim_report_jobs('w2', 1)
+            handle.write(b'tarde')
+            return JobOutput(filename='tarde.txt', message='Terminado por w1')
+
+        with patch.dict('projects.jobs.JOB_HANDLERS', {'status_report': slow_handler}):
+            self.assertEqual(run_report_job(job.pk), 'lost')
+        job.refresh_from_db()
+        self.assertEqual((job.state, job.worker, job.attempts), ('running', 'w2', 2))
+        self.assertEqual((job.message, job.result_name), ('', ''))
+        self.assertFalse(job.result)
+
+    def test_failed_job_finishing_late_keeps_its_state(self):
+        job = enqueue_report_job('status_report', self.user, project=self.project)
+        claim_report_jobs('w1', 1)
+
+        def broken_handler(job, handle, progress):
+            ReportJob.objects.filter(pk=job.pk).update(state='failed', error='Cancelado')
+            raise RuntimeError('demasiado tarde')
+
+        with patch.dict('projects.jobs.JOB_HANDLERS', {'status_report': broken_handler}):
+            self.assertEqual(run_report_job(job.pk), 'lost')
+        job.refresh_from_db()
+        self.assertEqual((job.state, job.error), ('failed', 'Cancelado'))
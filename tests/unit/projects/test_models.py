@@ -2,9 +2,11 @@ from django.test import TestCase
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from datetime import date, timedelta
+from decimal import Decimal
 from projects.models import (
     Project, Activity, Milestone, UserProfile, Seguimiento,
-    Cronograma, Presupuesto, Alcance, Comunicacion, AutoCertificacion
+    Cronograma, Presupuesto, Alcance, Comunicacion, AutoCertificacion,
+    ProjectCut, SeguimientoSnapshot,
 )
 
 class TestUserProfile(TestCase):
@@ -251,4 +253,135 @@ class TestAutoCertificacion(TestCase):
             descripcion='Test Cert',
             aprobado=True
         )
-        self.assertTrue(autocert.aprobado)
\ No newline at end of file
+        self.assertTrue(autocert.aprobado)
+
+class TestProjectCutMetrics(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='pass')
+        self.project = Project.objects.create(
+            name='Test Project', description='Desc',
+            start_date=date(2026, 1, 1), end_date=date(2026, 3, 31), created_by=self.user,
+        )
+        Activity.objects.create(
+            project=self.project, name='A1', description='Desc',
+            start_date=date(2026, 1, 1), end_date=date(2026, 1, 20),
+            status='completed', cost=Decimal('1000'), actual_cost=Decimal('1200'),
+            actual_end_date=date(2026, 1, 22),
+        )
+        Activity.objects.create(
+            project=self.project, name='A2', description='Desc',
+            start_date=date(2026, 1, 1), end_date=date(2026, 2, 10), cost=Decimal('500'),
+        )
+        self.cut = ProjectCut.objects.create(
+            project=self.project, name='Mes 1', sort_order=1,
+            start_date=date(2026, 1, 1), end_date=date(2026, 1, 31),
+        )
+
+    def test_all_derived_properties_share_one_query(self):
+        cut = ProjectCut.objects.get(pk=self.cut.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(cut.status, 'red')
+            self.assertEqual(cut.status_label, 'Crítico')
+            self.assertEqual(cut.planned_count, 1)
+            self.assertEqual(cut.completed_count, 1)
+            self.assertEqual(cut.pv, Decimal('1000'))
+            self.assertEqual(cut.ev, Decimal('1000'))
+            self.assertEqual(cut.ac, Decimal('1200'))
+            self.assertEqual(cut.sv, Decimal('0'))
+            self.assertEqual(cut.cv, Decimal('-200'))
+            self.assertEqual(cut.spi, Decimal('1'))
+            self.assertTrue(cut.has_any_tracking)
+            self.assertEqual(cut.progress_percentage, 100.0)
+
+    def test_invalidate_metrics_after_editing_dates(self):
+        cut = ProjectCut.objects.get(pk=self.cut.pk)
+        self.assertEqual(cut.planned_count, 1)
+        cut.end_date = date(2026, 2, 28)
+        cut.save()
+        self.assertEqual(cut.planned_count, 1)  # memoizado
+        cut.invalidate_metrics()
+        self.assertEqual(cut.planned_count, 2)
+        self.assertEqual(cut.pv, Decimal('1500'))
+        self.assertEqual(cut.completed_count, 1)
+
+
+class TestSeguimientoSnapshot(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='pass')
+        self.project = Project.objects.create(
+            name='Test Project', description='Desc',
+            start_date=date(2026, 1, 1), end_date=date(2026, 3, 31), created_by=self.user,
+        )
+        self.a1 = Activity.objects.create(
+            project=self.project, name='A1', description='Desc',
+            start_date=date(2026, 1, 1), end_date=date(2026, 1, 20),
+            status='completed', cost=Decimal('1000'), actual_cost=Decimal('1200'),
+            actual_start_date=date(2026, 1, 2), actual_end_date=date(2026, 1, 22),
+        )
+        self.a2 = Activity.objects.create(
+            project=self.project, name='A2', description='Desc', predecessor=self.a1,
+            start_date=date(2026, 1, 21), end_date=date(2026, 2, 10), cost=Decimal('500'),
+            status='in_progress', actual_start_date=date(2026, 1, 25),
+        )
+
+    def test_snapshot_is_taken_on_create(self):
+        seguimiento = Seguimiento.objects.create(proyecto=self.project, fecha=date(2026, 2, 15))
+        snapshots = {s.name: s for s in seguimiento.snapshots.all()}
+        self.assertEqual(set(snapshots), {'A1', 'A2'})
+        self.assertEqual(snapshots['A1'].planned_cost, Decimal('1000'))
+        self.assertEqual(snapshots['A1'].accrued_cost, Decimal('1200'))
+        self.assertEqual(snapshots['A1'].actual_end_date, date(2026, 1, 22))
+        self.assertEqual(snapshots['A2'].status, 'in_progress')
+        self.assertEqual(snapshots['A2'].predecessor_name, 'A1')
+        self.assertEqual(snapshots['A2'].accrued_cost, Decimal('500'))
+
+    def test_snapshot_is_written_with_one_insert(self):
+        seguimiento = Seguimiento(proyecto=self.project, fecha=date(2026, 2, 15))
+        # EVM agregado + INSERT seguimiento + UPDATE de la versión del proyecto (señal)
+        # + SELECT actividades + DELETE previas + bulk INSERT
+        # (más SAVEPOINT/RELEASE de transaction.atomic)
+        with self.assertNumQueries(8):
+            seguimiento.save()
+        self.assertEqual(seguimiento.snapshots.count(), 2)
+
+    def test_edit_does_not_recompute_against_live_activities(self):
+        seguimiento = Seguimiento.objects.create(proyecto=self.project, fecha=date(2026, 2, 15))
+        self.assertEqual(seguimiento.ev, Decimal('1000'))
+        self.a2.status = 'completed'
+        self.a2.actual_end_date = date(2026, 2, 12)
+        self.a2.actual_cost = Decimal('450')
+        self.a2.save()
+
+        seguimiento = Seguimiento.objects.get(pk=seguimiento.pk)
+        seguimiento.observacion = 'Editado'
+        seguimiento.save()
+        seguimiento.refresh_from_db()
+        self.assertEqual(seguimiento.pv, Decimal('1500'))
+        self.assertEqual(seguimiento.ev, Decimal('1000'))
+        self.assertEqual(seguimiento.ac, Decimal('1200'))
+        self.assertEqual(seguimiento.snapshots.get(name='A2').status, 'in_progress')
+
+    def test_changing_fecha_recomputes_from_snapshot(self):
+        seguimiento = Seguimiento.objects.create(proyecto=self.project, fecha=date(2026, 2, 15))
+        self.a1.delete()
+        seguimiento.fecha = date(2026, 1, 21)
+        seguimiento.save()
+        self.assertEqual(seguimiento.pv, Decimal('1000'))
+        self.assertEqual(seguimiento.ev, Decimal('0'))
+        self.assertIsNone(seguimiento.snapshots.get(name='A1').activity_id)
+
+    def test_legacy_seguimiento_without_snapshot_keeps_stored_values(self):
+        seguimiento = Seguimiento.objects.create(proyecto=self.project, fecha=date(2026, 2, 15))
+        seguimiento.snapshots.all().delete()
+        Seguimiento.objects.filter(pk=seguimiento.pk).update(pv=Decimal('42'))
+        seguimiento.refresh_from_db()
+        seguimiento.save()
+        seguimiento.refresh_from_db()
+        self.assertEqual(seguimiento.pv, Decimal('42'))
+
+    def test_tracking_scenario_uses_seguimiento_date(self):
+        seguimiento = Seguimiento.objects.create(proyecto=self.project, fecha=date(2026, 2, 15))
+        snapshot = seguimiento.snapshots.get(name='A2')
+        self.assertEqual(snapshot.tracking_scenario['code'], 'en_curso_atrasado')
+        self.assertEqual(snapshot.schedule_variance_days, -5)
+        self.assertEqual(snapshot.cost_variance, Decimal('0'))
@@ -0,0 +1,137 @@
+"""
+Unit tests for the notification email outbox (projects.outbox).
+"""
+from datetime import date, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail import get_connection
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from projects.models import Notification, Project
+from projects.outbox import backoff_seconds, claim_outbox_batch, deliver_outbox_batch
+from projects.services import create_notification
+
+
+class FlakyBackend(EmailBackend):
+    """Backend en memoria que rechaza los mensajes a bad@example.com."""
+
+    def send_messages(self, messages):
+        if any('bad@example.com' in message.to for message in messages):
+            raise ConnectionError('Buzón no disponible')
+        return super().send_messages(messages)
+
+
+class UnreachableBackend(EmailBackend):
+
+    def open(self):
+        raise ConnectionRefusedError('SMTP caído')
+
+
+class NotificationOutboxTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gestor', password='pass', email='gestor@example.com')
+        self.project = Project.objects.create(
+            name='Alertas', description='Desc', start_date=date(2026, 1, 1),
+            end_date=date(2026, 12, 31), created_by=self.user,
+        )
+
+    def _notify(self, count, recipient=None):
+        return [
+            create_notification(project=self.project, alert_type='cost', message=f'Alerta {i}', recipient=recipient)
+            for i in range(count)
+        ]
+
+    def _expire(self):
+        Notification.objects.filter(delivery_status='pending').update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+
+    def test_creating_notifications_never_sends_mail(self):
+        with patch('projects.services.send_mail') as send_mail, patch('projects.outbox.get_connection') as connection:
+            self._notify(50)
+        send_mail.assert_not_called()
+        connection.assert_not_called()
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Notification.objects.filter(delivery_status='pending').count(), 50)
+
+    def test_batches_reuse_one_connection(self):
+        self._notify(5)
+        nobody = User.objects.create_user(username='sin_correo', password='pass', email='')
+        self._notify(1, recipient=nobody)
+        with patch('projects.outbox.get_connection', wraps=get_connection) as connection:
+            result = deliver_outbox_batch(batch_size=10)
+        connection.assert_called_once()
+        self.assertEqual((result.claimed, result.sent, result.skipped), (6, 5, 1))
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[0].subject, 'Alerta de Proyecto: Costo')
+        self.assertEqual(mail.outbox[0].to, ['gestor@example.com'])
+        sent = Notification.objects.filter(delivery_status='sent')
+        self.assertEqual(sent.count(), 5)
+        self.assertTrue(all(n.sent and n.sent_at for n in sent))
+        self.assertEqual(Notification.objects.get(recipient=nobody).delivery_status, 'skipped')
+        self.assertEqual(deliver_outbox_batch().claimed, 0)
+
+    @override_settings(
+        EMAIL_BACKEND='tests.unit.projects.test_outbox.FlakyBackend', NOTIFICATION_OUTBOX_MAX_ATTEMPTS=3,
+    )
+    def test_failures_back_off_then_go_dead(self):
+        bad = User.objects.create_user(username='malo', password='pass', email='bad@example.com')
+        self._notify(2)
+        failing = self._notify(1, recipient=bad)[0]
+
+        before = timezone.now()
+        result = deliver_outbox_batch()
+        self.assertEqual((result.sent, result.retried, result.dead), (2, 1, 0))
+        failing.refresh_from_db()
+        self.assertEqual((failing.delivery_status, failing.delivery_attempts), ('pending', 1))
+        self.assertIn('Buzón no disponible', failing.last_error)
+        self.assertGreaterEqual(failing.next_attempt_at, before + timedelta(seconds=backoff_seconds(1)))
+        self.assertEqual(deliver_outbox_batch().claimed, 0)
+
+        for expected in ((0, 1, 0), (0, 0, 1)):
+            self._expire()
+            result = deliver_outbox_batch()
+            self.assertEqual((result.sent, result.retried, result.dead), expected)
+        failing.refresh_from_db()
+        self.assertEqual((failing.delivery_status, failing.delivery_attempts), ('dead', 3))
+
+        out = StringIO()
+        call_command('send_notifications', '--retry-dead', stdout=out)
+        self.assertIn('Notificaciones reencoladas: 1', out.getvalue())
+        failing.refresh_from_db()
+        self.assertEqual((failing.delivery_status, failing.delivery_attempts), ('pending', 1))
+
+    @override_settings(EMAIL_BACKEND='tests.unit.projects.test_outbox.UnreachableBackend')
+    def test_connection_failure_retries_the_whole_batch(self):
+        self._notify(3)
+        result = deliver_outbox_batch()
+        self.assertEqual((result.sent, result.retried), (0, 3))
+        self.assertTrue(all(n.delivery_attempts == 1 for n in Notification.objects.all()))
+
+    def test_backoff_is_exponential_and_capped(self):
+        self.assertEqual([backoff_seconds(n) for n in (1, 2, 3)], [60, 120, 240])
+        self.assertEqual(backoff_seconds(50), 6 * 3600)
+
+    def test_claimed_rows_are_leased(self):
+        self._notify(4)
+        first = claim_outbox_batch(3)
+        second = claim_outbox_batch(3)
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 1)
+        self.assertFalse({n.pk for n in first} & {n.pk for n in second})
+        self.assertEqual(claim_outbox_batch(3), [])
+
+    def test_command_reports_per_batch_metrics(self):
+        self._notify(5)
+        out = StringIO()
+        call_command('send_notifications', '--batch-size', '2', stdout=out)
+        output = out.getvalue()
+        self.assertIn('Lote 1: tomadas 2 | enviadas 2', output)
+        self.assertIn('Lote 3: tomadas 1 | enviadas 1', output)
+        self.assertIn('Lotes: 3 | Enviadas: 5', output)
+        self.assertEqual(len(mail.outbox), 5)
@@ -0,0 +1,106 @@
+"""
+Unit tests for keyset pagination (projects.pagination).
+"""
+from datetime import date, timedelta
+from urllib.parse import parse_qs
+
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from projects.models import Notification, Project, Seguimiento
+from projects.pagination import decode_cursor, encode_cursor, estimate_count, paginate_keyset
+
+
+class KeysetPaginationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='gestor', password='pass')
+        cls.project = Project.objects.create(
+            name='Paginado', description='Desc', start_date=date(2026, 1, 1),
+            end_date=date(2026, 12, 31), created_by=cls.user,
+        )
+        # Fechas repetidas: el desempate por id debe mantener el orden estable
+        Seguimiento.objects.bulk_create([
+            Seguimiento(proyecto=cls.project, fecha=date(2026, 1, 1) + timedelta(days=i // 3))
+            for i in range(23)
+        ])
+        cls.expected = list(Seguimiento.objects.order_by('-fecha', '-pk').values_list('pk', flat=True))
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def _page(self, querystring='', **kwargs):
+        request = self.factory.get('/lista/', parse_qs(querystring))
+        return paginate_keyset(request, Seguimiento.objects.all(), '-fecha', page_sizes=(5, 10), default_size=5, **kwargs)
+
+    def test_walks_every_row_once_in_order(self):
+        seen, querystring = [], ''
+        while True:
+            page = self._page(querystring)
+            seen.extend(obj.pk for obj in page)
+            if not page.has_next:
+                break
+            querystring = page.next_querystring
+        self.assertEqual(seen, self.expected)
+
+    def test_previous_page_returns_the_same_rows(self):
+        first = self._page()
+        second = self._page(first.next_querystring)
+        back = self._page(second.previous_querystring)
+        self.assertEqual([o.pk for o in back], [o.pk for o in first])
+        self.assertFalse(back.has_previous)
+        self.assertTrue(back.has_next)
+
+    def test_page_size_and_total(self):
+        page = self._page('page_size=10')
+        self.assertEqual(len(page), 10)
+        self.assertEqual(page.total, 23)
+        self.assertFalse(page.total_is_estimate)
+        self.assertIn('page_size=10', page.next_querystring)
+        self.assertEqual(len(self._page('page_size=999')), 5)
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        for cursor in ('basura', encode_cursor(['no-es-fecha', 1]), encode_cursor([1])):
+            with self.subTest(cursor=cursor):
+                page = self._page(f'after={cursor}')
+                self.assertEqual([o.pk for o in page], self.expected[:5])
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor(['2026-01-01', 7])), ['2026-01-01', 7])
+
+    def test_total_is_estimated_above_the_limit(self):
+        self.assertEqual(estimate_count(Seguimiento.objects.all(), limit=10), (10, True))
+        self.assertEqual(estimate_count(Seguimiento.objects.all(), limit=100), (23, False))
+
+    def test_page_query_cost_does_not_depend_on_position(self):
+        page = self._page()
+        with self.assertNumQueries(1):
+            self._page(page.next_querystring, with_total=False)
+
+
+class PaginatedListViewTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gestor', password='pass')
+        self.client.login(username='gestor', password='pass')
+        project = Project.objects.create(
+            name='Alertas', description='Desc', start_date=date(2026, 1, 1),
+            end_date=date(2026, 12, 31), created_by=self.user,
+        )
+        Notification.objects.bulk_create([
+            Notification(project=project, recipient=self.user, alert_type='general', message=f'Aviso {i}')
+            for i in range(30)
+        ])
+
+    def test_notification_list_is_paginated(self):
+        response = self.client.get(reverse('notification_list'))
+        page = response.context['notifications']
+        self.assertEqual(len(page), 25)
+        self.assertEqual(page.total, 30)
+        self.assertContains(response, 'Siguiente')
+
+        response = self.client.get(reverse('notification_list') + '?' + page.next_querystring)
+        self.assertEqual(len(response.context['notifications']), 5)
+        self.assertContains(response, 'Anterior')
@@ -0,0 +1,171 @@
+"""
+Unit tests for the annotated portfolio query and the materialized
+ProjectMetrics read model (projects.portfolio).
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from projects.models import Activity, Notification, Project, ProjectMetrics, Seguimiento, UserProfile
+from projects.portfolio import ProjectStatus, portfolio_status, refresh_project_metrics
+from resources.models import Resource
+from risks.models import Risk
+
+
+class PortfolioStatusTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='jefe', password='pass')
+        UserProfile.objects.update_or_create(user=self.user, defaults={'role': 'jefe_departamental'})
+        self.start = date.today() - timedelta(days=30)
+
+    def _project(self, name, budget=None, activities=(), seguimientos=()):
+        project = Project.objects.create(
+            name=name, description='Desc', start_date=self.start,
+            end_date=self.start + timedelta(days=60), budget=budget, created_by=self.user,
+        )
+        for i, (status, cost, actual) in enumerate(activities):
+            Activity.objects.create(
+                project=project, name=f'{name}-{i}', description='Desc', status=status,
+                start_date=self.start, end_date=self.start + timedelta(days=10 * (i + 1)),
+                cost=Decimal(cost), actual_cost=Decimal(actual) if actual else None,
+            )
+        for offset in seguimientos:
+            Seguimiento.objects.create(proyecto=project, fecha=self.start + timedelta(days=offset))
+        return project
+
+    def _portfolio(self):
+        self._project('Sin datos')
+        self._project('Con presupuesto', budget=Decimal('5000'), activities=[
+            ('completed', '1000', '1500'), ('completed', '2000', '1800'), ('pending', '500', None),
+        ], seguimientos=[5, 25])
+        self._project('Atrasado', budget=Decimal('2000'), activities=[
+            ('in_progress', '800', '900'), ('pending', '400', None),
+        ], seguimientos=[25])
+
+    def test_matches_project_methods(self):
+        self._portfolio()
+        for status in portfolio_status(Project.objects.all()):
+            project = Project.objects.get(pk=status.project.pk)
+            with self.subTest(project=project.name):
+                self.assertEqual(status.traffic_light, project.get_traffic_light_status())
+                self.assertEqual(status.progress, project.get_progress_percentage())
+                self.assertEqual(status.budget_utilization, project.budget_utilization_percentage)
+
+    def test_single_query_for_the_whole_portfolio(self):
+        self._portfolio()
+        with self.assertNumQueries(1):
+            statuses = portfolio_status(Project.objects.all())
+        self.assertEqual(len(statuses), 3)
+        self.assertIsInstance(statuses[0], ProjectStatus)
+
+    def _count_queries(self, url_name):
+        self.client.login(username='jefe', password='pass')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_dashboard_and_project_list_queries_do_not_grow_with_portfolio(self):
+        self._portfolio()
+        small = {name: self._count_queries(name) for name in ('dashboard', 'project_list')}
+        for i in range(5):
+            self._project(f'Extra {i}', budget=Decimal('100'), activities=[('pending', '10', None)], seguimientos=[1])
+        for name, queries in small.items():
+            with self.subTest(view=name):
+                self.assertEqual(self._count_queries(name), queries)
+
+
+class ProjectMetricsTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gestor', password='pass')
+        self.start = date.today() - timedelta(days=30)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project = Project.objects.create(
+                name='Materializado', description='Desc', start_date=self.start,
+                end_date=self.start + timedelta(days=60), budget=Decimal('5000'), created_by=self.user,
+            )
+
+    def _activity(self, name, status='pending', cost='1000', actual=None):
+        return Activity.objects.create(
+            project=self.project, name=name, description='Desc', status=status,
+            start_date=self.start, end_date=self.start + timedelta(days=10),
+            cost=Decimal(cost), actual_cost=Decimal(actual) if actual else None,
+        )
+
+    def test_project_creation_creates_the_row(self):
+        metrics = ProjectMetrics.objects.get(project=self.project)
+        self.assertEqual(metrics.total_activities, 0)
+        self.assertEqual(metrics.traffic_light, 'gray')
+
+    def test_signals_refresh_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._activity('A', status='completed', actual='1200')
+            self._activity('B')
+            Seguimiento.objects.create(proyecto=self.project, fecha=self.start + timedelta(days=20))
+            Risk.objects.create(project=self.project, description='Clima', probability='low', impact='low',
+                                identified_by='PM')
+        metrics = ProjectMetrics.objects.get(project=self.project)
+        expected = Project.objects.get(pk=self.project.pk)
+        self.assertEqual(metrics.total_activities, 2)
+        self.assertEqual(metrics.completed_activities, 1)
+        self.assertEqual(metrics.progress, Decimal('50.0'))
+        self.assertEqual(metrics.planned_cost, Decimal('2000.00'))
+        self.assertEqual(metrics.actual_cost, Decimal('1200.00'))
+        self.assertEqual(metrics.budget_variance, Decimal('3000.00'))
+        self.assertEqual(metrics.budget_utilization, Decimal(str(expected.budget_utilization_percentage)))
+        self.assertEqual(metrics.traffic_light, expected.get_traffic_light_status())
+        self.assertEqual(metrics.open_risks, 1)
+
+    def test_resource_writes_refresh_resource_cost(self):
+        activity = self._activity('A')
+        with self.captureOnCommitCallbacks(execute=True):
+            Resource.objects.create(activity=activity, name='Cuadrilla', type='human', quantity=3,
+                                    cost_per_unit=Decimal('100'))
+        self.assertEqual(ProjectMetrics.objects.get(project=self.project).resource_cost, Decimal('300.00'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Resource.objects.filter(activity=activity).update(quantity=5)
+        self.assertEqual(ProjectMetrics.objects.get(project=self.project).resource_cost, Decimal('500.00'))
+
+    def test_writes_in_one_transaction_refresh_once(self):
+        with patch('projects.portfolio.refresh_project_metrics', wraps=refresh_project_metrics) as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                for i in range(5):
+                    self._activity(f'A{i}')
+        self.assertEqual(refresh.call_count, 1)
+        self.assertEqual(ProjectMetrics.objects.get(project=self.project).total_activities, 5)
+
+    def test_unread_notifications_are_counted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(project=self.project, alert_type='general', message='Hola')
+            Notification.objects.create(project=self.project, alert_type='general', message='Leída',
+                                        read_at=timezone.now())
+        self.assertEqual(ProjectMetrics.objects.get(project=self.project).unread_notifications, 1)
+
+    def test_command_repairs_stale_rows(self):
+        self._activity('A')  # sin ejecutar on_commit: la fila queda desactualizada
+        self.assertEqual(ProjectMetrics.objects.get(project=self.project).total_activities, 0)
+        out = StringIO()
+        call_command('refresh_project_metrics', stdout=out)
+        self.assertIn('Proyectos actualizados: 1', out.getvalue())
+        self.assertEqual(ProjectMetrics.objects.get(project=self.project).total_activities, 1)
+
+    def test_views_read_the_materialized_row_and_show_staleness(self):
+        ProjectMetrics.objects.filter(project=self.project).update(progress=Decimal('42.0'))
+        self.client.login(username='gestor', password='pass')
+        for name in ('dashboard', 'project_list', 'reports:report_list'):
+            with self.subTest(view=name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.context['projects_with_status'][0].progress, Decimal('42.0'))
+                self.assertIsNotNone(response.context['metrics_refreshed_at'])
+                self.assertContains(response, 'Indicadores actualizados')
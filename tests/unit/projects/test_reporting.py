@@ -0,0 +1,145 @@
+"""
+Unit tests for the aggregated report builders (projects.reporting).
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from projects.models import Activity, Project
+from projects.reporting import UNASSIGNED_LABEL, build_status_report, cost_breakdown, status_histogram
+from resources.models import Resource
+
+
+class StatusReportTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gestor', password='pass')
+        self.client.login(username='gestor', password='pass')
+        self.project = Project.objects.create(
+            name='Estado', description='Desc', start_date=date(2026, 1, 1),
+            end_date=date(2026, 3, 2), budget=Decimal('100000'), created_by=self.user,
+        )
+        self.done = Activity.objects.create(
+            project=self.project, name='Diseno', description='Desc', status='completed',
+            start_date=date(2026, 1, 1), end_date=date(2026, 1, 11), cost=Decimal('500'),
+        )
+        self.open = Activity.objects.create(
+            project=self.project, name='Obra', description='Desc',
+            start_date=date(2026, 1, 12), end_date=date(2026, 2, 11),
+        )
+        Resource.objects.create(activity=self.open, name='Cemento', type='material', quantity=4, cost_per_unit=Decimal('25'))
+
+    def test_totals_and_rows(self):
+        activities = self.project.activity_set.all()
+        with self.assertNumQueries(2):
+            report = build_status_report(self.project, activities, today=date(2026, 1, 21))
+        self.assertEqual((report.completed, report.total), (1, 2))
+        self.assertAlmostEqual(report.progress, 50)
+        self.assertEqual(report.planned_days, 60)
+        self.assertEqual(report.actual_days, 20)
+        self.assertEqual(report.time_difference, -40)
+
+        rows = {row['name']: row for row in report.activities}
+        self.assertEqual(rows['Diseno']['progress'], 100)
+        self.assertEqual((rows['Diseno']['planned_days'], rows['Diseno']['actual_days']), (10, 20))
+        self.assertEqual(rows['Obra']['cost_diff'], Decimal('100'))
+        self.assertEqual(rows['Obra']['actual_cost'], rows['Obra']['planned_cost'] + Decimal('100'))
+        self.assertEqual(report.actual_cost, report.planned_cost + Decimal('100'))
+
+    def test_view_query_count_does_not_depend_on_size(self):
+        url = reverse('reports:status_report', args=[self.project.pk])
+        with CaptureQueriesContext(connection) as small:
+            response = self.client.get(url)
+        self.assertContains(response, 'Obra')
+
+        activities = Activity.objects.bulk_create([
+            Activity(
+                project=self.project, name=f'Extra {i}', description='Desc',
+                start_date=date(2026, 1, 1) + timedelta(days=i), end_date=date(2026, 1, 3) + timedelta(days=i),
+            )
+            for i in range(40)
+        ])
+        Resource.objects.bulk_create([
+            Resource(activity=activity, name='R', type='material', quantity=1, cost_per_unit=Decimal('5'))
+            for activity in activities
+        ])
+        with self.assertNumQueries(len(small)):
+            response = self.client.get(url)
+        self.assertEqual(response.context['total'], 42)
+        self.assertEqual(len(response.context['activities']), 42)
+
+    def test_filters_apply_to_totals(self):
+        response = self.client.get(reverse('reports:status_report', args=[self.project.pk]), {'activity_status': 'completed'})
+        self.assertEqual(response.context['total'], 1)
+        self.assertEqual(response.context['progress'], 100)
+        self.assertEqual([row['name'] for row in response.context['activities']], ['Diseno'])
+
+
+class ReportAggregationTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gestor', password='pass', first_name='Ana', last_name='Rojas')
+        self.client.login(username='gestor', password='pass')
+        self.project = Project.objects.create(
+            name='Suite', description='Desc', start_date=date(2026, 1, 1),
+            end_date=date(2026, 12, 31), budget=Decimal('100000'), created_by=self.user,
+        )
+        self._activities(3)
+
+    def _activities(self, count):
+        statuses = ['pending', 'in_progress', 'completed']
+        Activity.objects.bulk_create([
+            Activity(
+                project=self.project, name=f'Act {i}', description='Desc', status=statuses[i % 3],
+                start_date=date(2026, 1, 1), end_date=date(2026, 1, 10), cost=Decimal('100'),
+                assigned_to=self.user if i % 2 else None,
+            )
+            for i in range(count)
+        ])
+
+    def test_histogram_is_one_group_by(self):
+        with self.assertNumQueries(1):
+            histogram = status_histogram(self.project.activity_set.all())
+        self.assertEqual(histogram['pending'], 1)
+        self.assertEqual(histogram['in_progress'], 1)
+        self.assertEqual(histogram['completed'], 1)
+        self.assertEqual(sum(histogram.values()), 3)
+
+    def test_cost_series_and_owners_in_one_query(self):
+        with self.assertNumQueries(1):
+            breakdown = cost_breakdown(self.project.activity_set.order_by('pk'))
+        self.assertEqual(breakdown.labels, ['Act 0', 'Act 1', 'Act 2'])
+        self.assertEqual(breakdown.series, [100.0, 100.0, 100.0])
+        self.assertEqual(breakdown.total_cost, Decimal('300'))
+        owners = {owner.label: owner for owner in breakdown.owners}
+        self.assertEqual(owners['Ana Rojas'].activities, 1)
+        self.assertEqual(owners[UNASSIGNED_LABEL].activities, 2)
+        self.assertEqual(owners[UNASSIGNED_LABEL].completed, 1)
+        self.assertEqual(owners[UNASSIGNED_LABEL].planned_cost, Decimal('200'))
+
+    def test_report_suite_queries_do_not_grow(self):
+        names = ['progress_report', 'cost_report', 'status_report', 'performance_graphs']
+        urls = [reverse(f'reports:{name}', args=[self.project.pk]) for name in names]
+
+        def suite_queries():
+            total = 0
+            for url in urls:
+                with CaptureQueriesContext(connection) as queries:
+                    self.assertEqual(self.client.get(url).status_code, 200)
+                total += len(queries)
+            return total
+
+        small = suite_queries()
+        self._activities(60)
+        self.assertEqual(suite_queries(), small)
+
+        response = self.client.get(urls[1])
+        self.assertContains(response, 'Ana Rojas')
+        self.assertEqual(response.context['total_cost'], Decimal('6300'))
+        response = self.client.get(urls[0])
+        self.assertEqual((response.context['completed'], response.context['total']), (21, 63))
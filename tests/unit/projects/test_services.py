@@ -1,3 +1,5 @@
+import csv
+
 from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
 from datetime import date, timedelta
@@ -15,6 +17,7 @@ from projects.services import (
     deliver_notification,
     send_automated_project_report,
     export_project_csv,
+    iter_project_csv,
 )
 
 
@@ -386,13 +389,28 @@ class TestExportProjectCsv(TestCase):
         self.assertIn('attachment', response['Content-Disposition'])
         self.assertIn('Test Project', response['Content-Disposition'])
 
-        content = response.content.decode('utf-8')
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8')
         self.assertIn('Activity', content)
         self.assertIn('Activity 1', content)
         self.assertIn('Activity 2', content)
         self.assertIn('completed', content)
         self.assertIn('pending', content)
 
+    def test_export_includes_actuals_resources_and_assignee_in_one_query(self):
+        self.user.first_name, self.user.last_name = 'Ana', 'Paz'
+        self.user.save()
+        Activity.objects.filter(pk=self.activity1.pk).update(
+            assigned_to=self.user, actual_start_date=date(2026, 1, 2),
+            actual_end_date=date(2026, 1, 9), actual_cost=Decimal('120.00'),
+        )
+        activities = self.project.activity_set.select_related('assigned_to').order_by('name')
+        with self.assertNumQueries(1):
+            rows = list(csv.reader(iter_project_csv(activities, chunk_size=1)))
+        self.assertEqual(rows[0][5:], ['Actual Start Date', 'Actual End Date', 'Actual Cost', 'Resources Total', 'Assigned To'])
+        self.assertEqual(rows[1][5:], ['2026-01-02', '2026-01-09', '120.00', '0.00', 'Ana Paz'])
+        self.assertEqual(rows[2][5:], ['', '', '', '0.00', ''])
+
 
 class TestTrafficLightStatus(TestCase):
     def setUp(self):
@@ -0,0 +1,140 @@
+"""
+Unit tests for the Monte Carlo schedule/cost simulation (projects.simulation).
+"""
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from projects.models import Activity, Project
+from projects.simulation import _levels, simulate_project, triangular
+from risks.models import Risk
+
+
+class TriangularSamplingTest(TestCase):
+
+    def test_degenerate_range_returns_the_mode(self):
+        rng = np.random.default_rng(1)
+        zeros = np.zeros(3)
+        samples = triangular(rng, zeros + 5, zeros + 5, zeros + 5, (100, 3))
+        self.assertTrue(np.all(samples == 5))
+
+    def test_samples_stay_within_bounds(self):
+        rng = np.random.default_rng(1)
+        samples = triangular(rng, np.array([8.0]), np.array([10.0]), np.array([15.0]), (10_000, 1))
+        self.assertGreaterEqual(samples.min(), 8.0)
+        self.assertLessEqual(samples.max(), 15.0)
+        self.assertAlmostEqual(samples.mean(), 11.0, delta=0.1)  # (8 + 10 + 15) / 3
+
+
+class NetworkLevelsTest(TestCase):
+
+    def test_levels_follow_predecessor_depth(self):
+        # 3 <- 1 <- 2, 4 sin predecesora
+        levels = _levels([1, 2, 3, 4], [3, 1, None, None])
+        members = [sorted(m.tolist()) for m, _ in levels]
+        self.assertEqual(members, [[2, 3], [0], [1]])
+        self.assertEqual(levels[1][1].tolist(), [2])
+
+    def test_cycles_and_foreign_predecessors_are_cut(self):
+        levels = _levels([1, 2, 3], [2, 1, 99])
+        seen = sorted(i for m, _ in levels for i in m.tolist())
+        self.assertEqual(seen, [0, 1, 2])
+        self.assertEqual(levels[0][1].tolist(), [3, 3])  # centinela: sin predecesora
+
+
+class SimulateProjectTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gestor', password='pass')
+        self.start = date(2026, 1, 1)
+        self.project = Project.objects.create(
+            name='Proyecto Simulado', description='Desc',
+            start_date=self.start, end_date=self.start + timedelta(days=20),
+            created_by=self.user,
+        )
+
+    def _activity(self, name, start, end, cost, predecessor=None, **extra):
+        return Activity.objects.create(
+            project=self.project, name=name, description='Desc',
+            start_date=self.start + timedelta(days=start), end_date=self.start + timedelta(days=end),
+            cost=Decimal(cost), predecessor=predecessor, **extra,
+        )
+
+    def test_completed_activities_are_deterministic(self):
+        self._activity(
+            'Hecha', 0, 10, '1000', status='completed',
+            actual_end_date=self.start + timedelta(days=12), actual_cost=Decimal('1200'),
+        )
+        result = simulate_project(self.project, iterations=500, seed=3)
+        for row in result.percentiles:
+            self.assertEqual(row.finish_date, self.start + timedelta(days=12))
+            self.assertEqual(row.cost, Decimal('1200.00'))
+        self.assertEqual(result.on_time_probability, 1.0)
+        self.assertEqual(result.on_budget_probability, 0.0)
+
+    def test_predecessors_push_the_finish_date(self):
+        first = self._activity('A', 0, 10, '1000')
+        self._activity('B', 0, 10, '1000', predecessor=first)
+        result = simulate_project(self.project, iterations=5_000, seed=7)
+        p50, p80, p90 = result.percentiles
+        # Cadena de 2 x 10 días con duraciones en [8, 15]
+        self.assertGreaterEqual(p50.finish_date, self.start + timedelta(days=16))
+        self.assertLessEqual(p50.finish_date, p80.finish_date)
+        self.assertLessEqual(p80.finish_date, p90.finish_date)
+        self.assertLessEqual(p50.cost, p90.cost)
+        self.assertLess(result.on_time_probability, 0.5)
+
+    def test_seed_makes_the_run_reproducible(self):
+        self._activity('A', 0, 10, '1000')
+        self._activity('B', 5, 15, '500')
+        self.assertEqual(
+            simulate_project(self.project, iterations=1_000, seed=11),
+            simulate_project(self.project, iterations=1_000, seed=11),
+        )
+
+    def test_open_risks_raise_the_cost_tail(self):
+        self._activity('A', 0, 10, '1000')
+        baseline = simulate_project(self.project, iterations=5_000, seed=5)
+        Risk.objects.create(project=self.project, description='Ocurrido', probability='high', impact='high',
+                            status='occurred', identified_by='PM')
+        self.assertEqual(simulate_project(self.project, iterations=5_000, seed=5).risk_count, 0)
+
+        Risk.objects.create(project=self.project, description='Clima', probability='high', impact='high',
+                            identified_by='PM')
+        with_risk = simulate_project(self.project, iterations=5_000, seed=5)
+        self.assertEqual(with_risk.risk_count, 1)
+        self.assertGreater(with_risk.percentile(90).cost, baseline.percentile(90).cost)
+        self.assertGreaterEqual(with_risk.percentile(90).finish_date, baseline.percentile(90).finish_date)
+
+    def test_simulation_uses_two_queries(self):
+        self._activity('A', 0, 10, '1000')
+        with self.assertNumQueries(2):
+            simulate_project(self.project, iterations=100)
+
+    def test_empty_project(self):
+        result = simulate_project(self.project, iterations=100, seed=1)
+        self.assertEqual(result.activity_count, 0)
+        self.assertEqual(result.percentile(50).cost, Decimal('0.00'))
+
+    def test_large_network_runs_in_about_a_second(self):
+        activities = Activity.objects.bulk_create([
+            Activity(
+                project=self.project, name=f'A{i}', description='Desc',
+                start_date=self.start + timedelta(days=i // 5), end_date=self.start + timedelta(days=i // 5 + 5),
+                cost=Decimal('100'),
+            )
+            for i in range(500)
+        ])
+        for i, activity in enumerate(activities[1:], start=1):
+            activity.predecessor = activities[i - 1] if i % 3 else None
+        Activity.objects.bulk_update(activities, ['predecessor'])
+
+        started = time.perf_counter()
+        result = simulate_project(self.project, iterations=10_000, seed=1)
+        elapsed = time.perf_counter() - started
+        self.assertEqual(result.activity_count, 500)
+        self.assertLess(elapsed, 3.0)
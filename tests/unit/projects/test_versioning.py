@@ -0,0 +1,149 @@
+"""
+Unit tests for the per-project data version and the versioned cache
+helper (projects.versioning).
+"""
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from projects.models import Activity, Comunicacion, Milestone, Project, ProjectCut, ProjectVersion, Seguimiento
+from projects.evm import ActivityContribution, apply_activity_change, compute_cut_metrics
+from projects.versioning import (
+    bump_project_version,
+    cached_project_value,
+    get_project_version,
+    project_cache_key,
+)
+from resources.models import Resource
+from risks.models import Risk
+from stakeholders.models import Stakeholder
+
+
+class ProjectVersionTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='gestor', password='pass')
+        self.project = Project.objects.create(
+            name='Versionado', description='Desc', start_date=date(2026, 1, 1),
+            end_date=date(2026, 12, 31), budget=Decimal('10000'), created_by=self.user,
+        )
+        self.activity = Activity.objects.create(
+            project=self.project, name='A1', description='Desc',
+            start_date=date(2026, 1, 1), end_date=date(2026, 1, 31), cost=Decimal('100'),
+        )
+
+    def assertBumps(self, action):
+        before = get_project_version(self.project.pk)
+        action()
+        self.assertGreater(get_project_version(self.project.pk), before)
+
+    def test_version_row_is_created_with_the_project(self):
+        self.assertTrue(ProjectVersion.objects.filter(project=self.project).exists())
+
+    def test_writes_bump_the_version(self):
+        stakeholder = Stakeholder.objects.create(name='Ana', email='ana@example.com', role='sponsor')
+        milestone = Milestone.objects.create(
+            project=self.project, name='H1', description='Desc', due_date=date(2026, 3, 1),
+        )
+        actions = {
+            'activity': lambda: Activity.objects.filter(pk=self.activity.pk).first().save(),
+            'resource': lambda: Resource.objects.create(
+                activity=self.activity, name='R', type='material', quantity=2, cost_per_unit=Decimal('10'),
+            ),
+            'resource_bulk_delete': lambda: Resource.objects.filter(activity=self.activity).delete(),
+            'milestone': lambda: Milestone.objects.create(
+                project=self.project, name='H2', description='Desc', due_date=date(2026, 4, 1),
+            ),
+            'milestone_activities': lambda: milestone.activities.add(self.activity),
+            'seguimiento': lambda: Seguimiento.objects.create(proyecto=self.project, fecha=date(2026, 2, 1)),
+            'risk': lambda: Risk.objects.create(project=self.project, description='R', identified_by='Ana'),
+            'stakeholder_projects': lambda: stakeholder.projects.add(self.project),
+            'stakeholder_delete': lambda: stakeholder.delete(),
+            'cut': lambda: ProjectCut.objects.create(
+                project=self.project, name='Q1', start_date=date(2026, 1, 1), end_date=date(2026, 3, 31),
+            ),
+            'comunicacion': lambda: Comunicacion.objects.create(proyecto=self.project, mensaje='Hola', tipo='email'),
+            'project': lambda: self.project.save(),
+        }
+        for name, action in actions.items():
+            with self.subTest(write=name):
+                self.assertBumps(action)
+
+    def test_activity_moved_bumps_both_projects(self):
+        other = Project.objects.create(
+            name='Destino', description='Desc', start_date=date(2026, 1, 1),
+            end_date=date(2026, 12, 31), budget=Decimal('10000'), created_by=self.user,
+        )
+        versions = (get_project_version(self.project.pk), get_project_version(other.pk))
+        before = ActivityContribution.of(self.activity)
+        self.activity.project = other
+        self.activity.save()
+        apply_activity_change(self.activity, before)
+        self.assertGreater(get_project_version(self.project.pk), versions[0])
+        self.assertGreater(get_project_version(other.pk), versions[1])
+
+    def test_bump_recreates_missing_row(self):
+        ProjectVersion.objects.filter(project=self.project).delete()
+        self.assertEqual(get_project_version(self.project.pk), 0)
+        bump_project_version(self.project.pk)
+        self.assertGreater(get_project_version(self.project.pk), 0)
+
+    def test_cache_key_depends_on_version_and_filters(self):
+        key = project_cache_key(self.project.pk, 'gantt', {'status': 'pending'})
+        self.assertEqual(key, project_cache_key(self.project.pk, 'gantt', {'status': 'pending'}))
+        self.assertNotEqual(key, project_cache_key(self.project.pk, 'gantt', {'status': 'completed'}))
+        self.assertNotEqual(key, project_cache_key(self.project.pk, 'cuts', {'status': 'pending'}))
+        bump_project_version(self.project.pk)
+        self.assertNotEqual(key, project_cache_key(self.project.pk, 'gantt', {'status': 'pending'}))
+
+    def test_cached_value_is_built_once_per_version(self):
+        calls = []
+
+        def builder():
+            calls.append(1)
+            return {'total': len(calls)}
+
+        first = cached_project_value(self.project.pk, 'vista', builder)
+        second = cached_project_value(self.project.pk, 'vista', builder)
+        self.assertEqual(first, second)
+        self.assertEqual(len(calls), 1)
+
+        Activity.objects.create(
+            project=self.project, name='A2', description='Desc',
+            start_date=date(2026, 2, 1), end_date=date(2026, 2, 28), cost=Decimal('50'),
+        )
+        self.assertEqual(cached_project_value(self.project.pk, 'vista', builder), {'total': 2})
+
+
+class CachedProjectCutsViewTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_superuser(username='admin', password='pass', email='a@example.com')
+        self.client.login(username='admin', password='pass')
+        self.project = Project.objects.create(
+            name='Cortes', description='Desc', start_date=date(2026, 1, 1),
+            end_date=date(2026, 12, 31), budget=Decimal('10000'), created_by=self.user,
+        )
+        ProjectCut.objects.create(
+            project=self.project, name='Q1', start_date=date(2026, 1, 1), end_date=date(2026, 3, 31),
+        )
+
+    def test_cut_metrics_are_reused_until_the_project_changes(self):
+        url = reverse('project_cuts', args=[self.project.pk])
+        with patch('projects.views.compute_cut_metrics', wraps=compute_cut_metrics) as compute:
+            self.client.get(url)
+            self.client.get(url)
+            self.assertEqual(compute.call_count, 1)
+            Activity.objects.create(
+                project=self.project, name='A1', description='Desc',
+                start_date=date(2026, 1, 1), end_date=date(2026, 1, 31), cost=Decimal('100'),
+            )
+            self.client.get(url)
+            self.assertEqual(compute.call_count, 2)
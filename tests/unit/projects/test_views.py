@@ -39,6 +39,51 @@ class TestProjectViews(TestCase):
         self.assertTemplateUsed(response, 'projects/project_detail.html')
         self.assertEqual(response.context['project'], self.project)
 
+    def _add_activities_with_resources(self, count):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from resources.models import Resource
+        previous = None
+        for index in range(count):
+            previous = Activity.objects.create(
+                project=self.project, name=f'A{index}', description='Desc',
+                start_date=date.today(), end_date=date.today(), predecessor=previous,
+            )
+            Resource.objects.create(activity=previous, name='R', type='human', quantity=1, cost_per_unit=10)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('project_detail', args=[self.project.pk]))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_project_detail_query_count_is_constant(self):
+        small = self._add_activities_with_resources(3)
+        large = self._add_activities_with_resources(30)
+        self.assertEqual(small, large)
+
+    def test_project_cuts_query_count_is_constant(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from datetime import timedelta
+        from projects.services import generate_project_cuts
+        self.project.end_date = self.project.start_date + timedelta(days=279)
+        self.project.save()
+        for index in range(20):
+            Activity.objects.create(
+                project=self.project, name=f'A{index}', description='Desc',
+                start_date=self.project.start_date,
+                end_date=self.project.start_date + timedelta(days=index * 14),
+                status='completed' if index % 2 else 'pending', cost=100,
+            )
+        counts = []
+        for interval in (90, 7):
+            generate_project_cuts(self.project, interval_days=interval)
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(reverse('project_cuts', args=[self.project.pk]))
+            self.assertEqual(response.status_code, 200)
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(len(response.context['cuts']), 40)
+        self.assertEqual(counts[0], counts[1])
+
     def test_project_create_get(self):
         response = self.client.get(reverse('project_create'))
         self.assertEqual(response.status_code, 200)
@@ -243,3 +288,85 @@ class TestSeguimientoViews(TestCase):
         response = self.client.post(reverse('seguimiento_create', args=[self.project.pk]), data)
         self.assertRedirects(response, reverse('project_detail', args=[self.project.pk]))
         self.assertEqual(Seguimiento.objects.count(), 1)
+
+    def _seguimiento_with_progress(self):
+        activity = Activity.objects.create(
+            project=self.project, name='Actividad', description='Desc',
+            start_date=date.today(), end_date=date.today(), cost=100,
+        )
+        first = Seguimiento.objects.create(proyecto=self.project, fecha=date.today())
+        activity.status = 'completed'
+        activity.actual_end_date = date.today()
+        activity.actual_cost = 80
+        activity.save()
+        second = Seguimiento.objects.create(proyecto=self.project, fecha=date.today())
+        return activity, first, second
+
+    def test_linea_base_historic_view_reads_snapshot(self):
+        activity, first, _ = self._seguimiento_with_progress()
+        activity.name = 'Renombrada'
+        activity.save()
+        response = self.client.get(
+            reverse('linea_base_seguimiento', args=[self.project.pk]), {'seguimiento': first.pk}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['historic_seguimiento'], first)
+        self.assertFalse(response.context['can_edit'])
+        self.assertContains(response, 'Actividad')
+        self.assertNotContains(response, 'Renombrada')
+        self.assertEqual(response.context['completed_count'], 0)
+
+    def test_seguimiento_compare(self):
+        _, first, second = self._seguimiento_with_progress()
+        response = self.client.get(reverse('seguimiento_compare', args=[second.pk, first.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['before'], first)
+        self.assertEqual(response.context['after'], second)
+        self.assertEqual(response.context['changed_count'], 1)
+        row = response.context['rows'][0]
+        self.assertTrue(row.status_changed)
+        self.assertEqual(row.actual_cost_delta, -20)
+
+    def test_linea_base_post_updates_existing_seguimientos_incrementally(self):
+        activity = Activity.objects.create(
+            project=self.project, name='Actividad', description='Desc',
+            start_date=date.today(), end_date=date.today(), cost=100,
+        )
+        existing = Seguimiento.objects.create(proyecto=self.project, fecha=date.today())
+        self.assertEqual(existing.ev, 0)
+        self.client.post(reverse('linea_base_seguimiento', args=[self.project.pk]), {
+            'fecha': date.today().isoformat(),
+            f'actual_end_{activity.pk}': date.today().isoformat(),
+            f'actual_cost_{activity.pk}': '120',
+        })
+        existing.refresh_from_db()
+        self.assertEqual(existing.ev, 100)
+        self.assertEqual(existing.ac, 120)
+        self.assertEqual(existing.cv, -20)
+
+    def test_linea_base_post_rolls_back_failed_activity(self):
+        ok, broken = [
+            Activity.objects.create(
+                project=self.project, name=name, description='Desc',
+                start_date=date.today(), end_date=date.today(), cost=100,
+            )
+            for name in ('Correcta', 'Con error')
+        ]
+
+        def apply_or_fail(activity, before):
+            if activity.pk == broken.pk:
+                raise ValueError('delta invalido')
+            return 0
+
+        with patch('projects.views.apply_activity_change', side_effect=apply_or_fail), \
+                patch('projects.views.schedule_gantt_prewarm'):
+            self.client.post(reverse('linea_base_seguimiento', args=[self.project.pk]), {
+                'fecha': date.today().isoformat(),
+                f'actual_cost_{ok.pk}': '90',
+                f'actual_cost_{broken.pk}': '90',
+            })
+        ok.refresh_from_db()
+        broken.refresh_from_db()
+        self.assertEqual(ok.actual_cost, 90)
+        self.assertIsNone(broken.actual_cost)
+        self.assertEqual(Seguimiento.objects.filter(proyecto=self.project).count(), 1)
@@ -0,0 +1,166 @@
+"""
+Unit tests for the streaming XLSX writer (projects.xlsx) and the XLSX exports.
+"""
+import io
+import tempfile
+import tracemalloc
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from io import StringIO
+from xml.etree import ElementTree
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from projects.exports import iter_xlsx, write_xlsx
+from projects.management.commands.benchmark_xlsx import synthetic_activity_rows
+from projects.models import Activity, Project, Seguimiento
+from projects.xlsx import XLSX_CONTENT_TYPE, XlsxWriter, column_letter
+from resources.models import Resource
+
+NS = {'s': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+
+def read_workbook(data):
+    """{hoja: [[(valor, tipo, estilo), ...], ...]} leyendo el XML del libro."""
+    archive = zipfile.ZipFile(io.BytesIO(data))
+    workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+    names = [sheet.get('name') for sheet in workbook.iter(f"{{{NS['s']}}}sheet")]
+    sheets = {}
+    for index, name in enumerate(names, start=1):
+        root = ElementTree.fromstring(archive.read(f'xl/worksheets/sheet{index}.xml'))
+        rows = []
+        for row in root.iter(f"{{{NS['s']}}}row"):
+            cells = {}
+            for cell in row.findall('s:c', NS):
+                text = cell.find('s:is/s:t', NS)
+                value = cell.find('s:v', NS)
+                raw = text.text if text is not None else value.text
+                cells[cell.get('r').rstrip('0123456789')] = (raw, cell.get('t'), cell.get('s'))
+            rows.append(cells)
+        sheets[name] = rows
+    return sheets
+
+
+class XlsxWriterTest(SimpleTestCase):
+
+    def _book(self, *sheets):
+        handle = io.BytesIO()
+        with XlsxWriter(handle, batch_rows=2) as book:
+            for title, columns, rows in sheets:
+                book.write_sheet(title, columns, rows)
+        return handle.getvalue()
+
+    def test_cells_are_typed(self):
+        data = self._book(('Datos', ('fecha', 'hora', 'monto', 'n', 'texto', 'vacio'), [
+            (date(2026, 1, 1), datetime(2026, 1, 1, 12, 0), Decimal('1234.50'), 7, 'a < b & "c"', None),
+        ]))
+        header, row = read_workbook(data)['Datos']
+        self.assertEqual(header['A'], ('fecha', 'inlineStr', '4'))
+        self.assertEqual(row['A'], ('46023', None, '1'))
+        self.assertEqual(row['B'], ('46023.5', None, '2'))
+        self.assertEqual(row['C'], ('1234.50', None, '3'))
+        self.assertEqual(row['D'], ('7', None, None))
+        self.assertEqual(row['E'], ('a < b & "c"', 'inlineStr', None))
+        self.assertNotIn('F', row)
+
+    def test_package_parts_and_sheet_names(self):
+        data = self._book(('Costos/Q1', ('a',), [(1,)]), ('costos_q1', ('a',), []), ('Costos_Q1', ('a',), []))
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        self.assertIsNone(archive.testzip())
+        for part in ('[Content_Types].xml', '_rels/.rels', 'xl/workbook.xml', 'xl/_rels/workbook.xml.rels', 'xl/styles.xml'):
+            self.assertIn(part, archive.namelist())
+        self.assertEqual(list(read_workbook(data)), ['Costos_Q1', 'costos_q1 (2)', 'Costos_Q1 (3)'])
+
+    def test_strips_illegal_xml_characters(self):
+        data = self._book(('Hoja', ('t',), [('fin\x00\x0bde linea',)]))
+        self.assertEqual(read_workbook(data)['Hoja'][1]['A'][0], 'finde linea')
+
+    def test_column_letters(self):
+        self.assertEqual([column_letter(i) for i in (0, 25, 26, 701, 702)], ['A', 'Z', 'AA', 'ZZ', 'AAA'])
+
+    def test_memory_does_not_grow_with_rows(self):
+        def peak(rows):
+            tracemalloc.start()
+            with tempfile.TemporaryFile() as handle:
+                with XlsxWriter(handle) as book:
+                    book.write_sheet('Actividades', [str(i) for i in range(13)], synthetic_activity_rows(rows))
+            _, value = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return value
+
+        small, large = peak(2000), peak(20000)
+        self.assertLess(large, 8 * 1024 * 1024)
+        self.assertLess(large, small * 1.5)
+
+
+class XlsxExportTest(TestCase):
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='tecnico', password='pass')
+        self.client.login(username='tecnico', password='pass')
+        self.project = Project.objects.create(
+            name='Planta', description='Desc', start_date=date(2026, 1, 1),
+            end_date=date(2026, 12, 31), budget=Decimal('10000'), created_by=self.owner,
+        )
+        activity = Activity.objects.create(
+            project=self.project, name='Obra', description='Desc',
+            start_date=date(2026, 1, 1), end_date=date(2026, 1, 31), assigned_to=self.owner,
+        )
+        Resource.objects.create(activity=activity, name='Cemento', type='material', quantity=3, cost_per_unit=Decimal('10'))
+        Seguimiento.objects.create(proyecto=self.project, fecha=date(2026, 1, 15))
+        other = User.objects.create_user(username='otro', password='pass')
+        Project.objects.create(
+            name='Ajeno', description='Desc', start_date=date(2026, 1, 1),
+            end_date=date(2026, 12, 31), budget=Decimal('10000'), created_by=other,
+        )
+
+    def test_one_sheet_per_entity(self):
+        handle = io.BytesIO()
+        written = write_xlsx(Project.objects.filter(pk=self.project.pk), handle, chunk_size=1)
+        self.assertEqual(written, {'activities': 1, 'resources': 1, 'seguimientos': 1})
+        sheets = read_workbook(handle.getvalue())
+        self.assertEqual(list(sheets), ['Actividades', 'Recursos', 'Seguimientos'])
+        header, row = sheets['Actividades']
+        columns = {value[0]: letter for letter, value in header.items()}
+        self.assertEqual(row[columns['start_date']][2], '1')
+        self.assertEqual(row[columns['name']][0], 'Obra')
+        resource = sheets['Recursos'][1]
+        self.assertEqual(resource['H'], ('30.00', None, '3'))
+
+    def test_iter_xlsx_streams_before_the_end(self):
+        Activity.objects.bulk_create([
+            Activity(
+                project=self.project, name=f'Tarea {i}', description='Desc',
+                start_date=date(2026, 2, 1), end_date=date(2026, 2, 10),
+            )
+            for i in range(5)
+        ])
+        stream = iter_xlsx(Project.objects.filter(pk=self.project.pk), chunk_size=2)
+        first = next(stream)
+        self.assertTrue(first.startswith(b'PK'))
+        sheets = read_workbook(first + b''.join(stream))
+        self.assertEqual(len(sheets['Actividades']), 7)
+        self.assertEqual(list(sheets), ['Actividades', 'Recursos', 'Seguimientos'])
+
+    def test_project_endpoint(self):
+        response = self.client.get(reverse('reports:export_xlsx', args=[self.project.pk]))
+        self.assertEqual(response['Content-Type'], XLSX_CONTENT_TYPE)
+        self.assertIn('Planta_report.xlsx', response['Content-Disposition'])
+        sheets = read_workbook(b''.join(response.streaming_content))
+        self.assertEqual(len(sheets['Actividades']), 2)
+
+    def test_portfolio_endpoint_respects_visible_projects(self):
+        response = self.client.get(reverse('reports:portfolio_export'), {'export_format': 'xlsx'})
+        self.assertEqual(response['Content-Type'], XLSX_CONTENT_TYPE)
+        sheets = read_workbook(b''.join(response.streaming_content))
+        self.assertEqual([row['C'][0] for row in sheets['Actividades'][1:]], ['Obra'])
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_xlsx', '--rows', '500', stdout=out)
+        self.assertIn('por 100k filas', out.getvalue())
+        self.assertIn('memoria pico', out.getvalue())
@@ -36,4 +36,11 @@ class TestReportViews(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'reports/gantt.html')
         self.assertEqual(response.context['project'], self.project)
-        self.assertIn(self.activity, response.context['activities'])
\ No newline at end of file
+        self.assertIn(self.activity, response.context['activities'])
+
+    def test_risk_simulation(self):
+        response = self.client.get(reverse('reports:risk_simulation', args=[self.project.pk]), {'iterations': 500, 'seed': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'reports/risk_simulation.html')
+        self.assertEqual(response.context['result'].iterations, 500)
+        self.assertEqual([p.percentile for p in response.context['result'].percentiles], [50, 80, 90])
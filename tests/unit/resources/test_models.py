@@ -1,6 +1,9 @@
 from django.test import TestCase
 from django.contrib.auth.models import User
+from django.core.management import call_command
 from datetime import date
+from decimal import Decimal
+from io import StringIO
 from resources.models import Resource
 from projects.models import Project, Activity
 
@@ -43,4 +46,94 @@ class TestResource(TestCase):
             quantity=10,
             cost_per_unit=20.00
         )
-        self.assertEqual(resource.activity, self.activity)
\ No newline at end of file
+        self.assertEqual(resource.activity, self.activity)
+
+class TestResourcesTotalRollup(TestCase):
+    """Activity.resources_total se mantiene en escrituras individuales y masivas."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='pass')
+        self.project = Project.objects.create(
+            name='Test Project', description='Desc',
+            start_date=date.today(), end_date=date.today(), created_by=self.user,
+        )
+        self.activity = Activity.objects.create(
+            project=self.project, name='A1', description='Desc',
+            start_date=date.today(), end_date=date.today(), cost=Decimal('500'),
+        )
+        self.other = Activity.objects.create(
+            project=self.project, name='A2', description='Desc',
+            start_date=date.today(), end_date=date.today(),
+        )
+
+    def _resource(self, activity, quantity, cost_per_unit, name='R'):
+        return Resource.objects.create(
+            activity=activity, name=name, type='material',
+            quantity=quantity, cost_per_unit=Decimal(str(cost_per_unit)),
+        )
+
+    def _totals(self, activity):
+        activity.refresh_from_db()
+        return activity.resources_total, activity.cost
+
+    def test_save_and_delete_keep_rollup(self):
+        first = self._resource(self.activity, 2, 50)
+        self._resource(self.activity, 1, 30)
+        self.assertEqual(self._totals(self.activity), (Decimal('130'), Decimal('130')))
+        first.delete()
+        self.assertEqual(self._totals(self.activity)[0], Decimal('30'))
+
+    def test_moving_resource_updates_both_activities(self):
+        resource = self._resource(self.activity, 2, 50)
+        resource.activity = self.other
+        resource.save()
+        self.assertEqual(self._totals(self.activity)[0], Decimal('0'))
+        self.assertEqual(self._totals(self.other)[0], Decimal('100'))
+
+    def test_bulk_operations_keep_rollup(self):
+        Resource.objects.bulk_create([
+            Resource(activity=self.activity, name='B1', type='human', quantity=3, cost_per_unit=Decimal('10')),
+            Resource(activity=self.other, name='B2', type='human', quantity=1, cost_per_unit=Decimal('7')),
+        ])
+        self.assertEqual(self._totals(self.activity), (Decimal('30'), Decimal('30')))
+        self.assertEqual(self._totals(self.other)[0], Decimal('7'))
+
+        Resource.objects.filter(activity=self.activity).update(quantity=5)
+        self.assertEqual(self._totals(self.activity)[0], Decimal('50'))
+
+        self.other.resource_set.all().delete()
+        self.assertEqual(self._totals(self.other)[0], Decimal('0'))
+
+    def test_stale_activity_save_does_not_restore_rollup(self):
+        self._resource(self.activity, 2, 50)
+        activity = Activity.objects.get(pk=self.activity.pk)
+        self.assertEqual(activity.resources_total, Decimal('100'))
+        activity.resource_set.all().delete()
+        activity.name = 'A1 editada'
+        activity.save()
+        self.assertEqual(self._totals(activity)[0], Decimal('0'))
+        self.assertEqual(activity.name, 'A1 editada')
+
+    def test_total_planned_cost_reads_column_without_queries(self):
+        self._resource(self.activity, 4, 25)
+        activity = Activity.objects.get(pk=self.activity.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(activity.total_planned_cost, Decimal('100'))
+            self.assertEqual(activity.cost_variance, Decimal('0'))
+        self.assertEqual(self.other.total_planned_cost, 0)
+
+    def test_check_command_reports_and_repairs_drift(self):
+        self._resource(self.activity, 2, 50)
+        Activity.objects.filter(pk=self.activity.pk).update(resources_total=Decimal('1'))
+
+        out = StringIO()
+        call_command('check_resource_totals', stdout=out)
+        self.assertIn('Actividades con total desviado: 1', out.getvalue())
+        self.assertEqual(self._totals(self.activity)[0], Decimal('1'))
+
+        call_command('check_resource_totals', '--repair', stdout=StringIO())
+        self.assertEqual(self._totals(self.activity)[0], Decimal('100'))
+
+        out = StringIO()
+        call_command('check_resource_totals', stdout=out)
+        self.assertIn('Sin desvíos', out.getvalue())